@@ -16,8 +16,9 @@ from database import DATABASE_URL
 config = context.config
 
 # Interpret the config file for Python logging.
-# This line sets up loggers basically.
-if config.config_file_name is not None:
+# This line sets up loggers basically. When the application runs migrations
+# in-process it hands over its own connection and keeps its logging setup.
+if config.config_file_name is not None and "connection" not in config.attributes:
     fileConfig(config.config_file_name)
 
 # add your model's MetaData object here
@@ -58,6 +59,17 @@ def run_migrations_offline() -> None:
         context.run_migrations()
 
 
+def configure_online(connection) -> None:
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        # Each revision commits on its own so CREATE INDEX CONCURRENTLY can leave
+        # the transaction through autocommit_block().
+        transaction_per_migration=True,
+        render_as_batch=connection.dialect.name == "sqlite",
+    )
+
+
 def run_migrations_online() -> None:
     """Run migrations in 'online' mode.
 
@@ -65,6 +77,13 @@ def run_migrations_online() -> None:
     and associate a connection with the context.
 
     """
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        configure_online(connection)
+        with context.begin_transaction():
+            context.run_migrations()
+        return
+
     configuration = config.get_section(config.config_ini_section)
     configuration["sqlalchemy.url"] = get_url()
     connectable = engine_from_config(
@@ -74,9 +93,7 @@ def run_migrations_online() -> None:
     )
 
     with connectable.connect() as connection:
-        context.configure(
-            connection=connection, target_metadata=target_metadata
-        )
+        configure_online(connection)
 
         with context.begin_transaction():
             context.run_migrations()
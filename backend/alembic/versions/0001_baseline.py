@@ -0,0 +1,126 @@
+"""baseline schema
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19 10:00:00.000000
+
+Creates every table that does not exist yet. Databases built by the old
+``create_all`` startup path already have these tables, so on them this revision
+only records the starting point and the following revisions repair what the
+legacy runtime fix-ups used to patch on every boot.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if "users" not in existing:
+        op.create_table(
+            "users",
+            sa.Column("id", sa.String(), primary_key=True),
+            sa.Column("username", sa.String(), nullable=False),
+            sa.Column("email", sa.String(), nullable=False),
+            sa.Column("name", sa.String(), nullable=False),
+            sa.Column("role", sa.String(), nullable=False),
+            sa.Column("password_hash", sa.String(), nullable=False),
+            sa.Column("created_at", sa.DateTime(), nullable=True),
+            sa.Column("avatar_url", sa.String(), nullable=True),
+            sa.UniqueConstraint("username"),
+            sa.UniqueConstraint("email"),
+        )
+
+    if "polls" not in existing:
+        op.create_table(
+            "polls",
+            sa.Column("id", sa.String(), primary_key=True),
+            sa.Column("title", sa.String(), nullable=False),
+            sa.Column("description", sa.Text(), nullable=True),
+            sa.Column("deadline_iso", sa.DateTime(), nullable=True),
+            sa.Column("type", sa.String(), nullable=False),
+            sa.Column("max_selections", sa.Integer(), nullable=True),
+            sa.Column("is_anonymous", sa.Boolean(), nullable=True),
+            sa.Column("created_at", sa.DateTime(), nullable=True),
+            sa.Column("owner_user_id", sa.String(), sa.ForeignKey("users.id"), nullable=True),
+        )
+
+    if "poll_variants" not in existing:
+        op.create_table(
+            "poll_variants",
+            sa.Column("id", sa.String(), primary_key=True),
+            sa.Column("poll_id", sa.String(), sa.ForeignKey("polls.id"), nullable=False),
+            sa.Column("label", sa.String(), nullable=False),
+            sa.Column("created_at", sa.DateTime(), nullable=True),
+        )
+
+    if "votes" not in existing:
+        op.create_table(
+            "votes",
+            sa.Column("id", sa.String(), primary_key=True),
+            sa.Column("poll_id", sa.String(), sa.ForeignKey("polls.id"), nullable=False),
+            sa.Column("variant_id", sa.String(), sa.ForeignKey("poll_variants.id"), nullable=False),
+            sa.Column("user_id", sa.String(), nullable=False),
+            sa.Column("created_at", sa.DateTime(), nullable=True),
+            sa.UniqueConstraint("poll_id", "user_id", "variant_id", name="unique_user_poll_variant"),
+        )
+
+    if "refresh_token_sessions" not in existing:
+        op.create_table(
+            "refresh_token_sessions",
+            sa.Column("id", sa.String(), primary_key=True),
+            sa.Column("user_id", sa.String(), sa.ForeignKey("users.id"), nullable=False),
+            sa.Column("token_hash", sa.String(), nullable=False),
+            sa.Column("user_agent", sa.String(), nullable=True),
+            sa.Column("ip_address", sa.String(), nullable=True),
+            sa.Column("created_at", sa.DateTime(), nullable=False),
+            sa.Column("expires_at", sa.DateTime(), nullable=False),
+            sa.Column("revoked_at", sa.DateTime(), nullable=True),
+            sa.Column("replaced_by_id", sa.String(), nullable=True),
+            sa.UniqueConstraint("token_hash"),
+        )
+        op.create_index("ix_refresh_token_sessions_user_id", "refresh_token_sessions", ["user_id"])
+
+    if "poll_attachments" not in existing:
+        op.create_table(
+            "poll_attachments",
+            sa.Column("id", sa.String(), primary_key=True),
+            sa.Column("poll_id", sa.String(), sa.ForeignKey("polls.id"), nullable=False),
+            sa.Column("uploader_user_id", sa.String(), sa.ForeignKey("users.id"), nullable=False),
+            sa.Column("original_name", sa.String(), nullable=False),
+            sa.Column("content_type", sa.String(), nullable=False),
+            sa.Column("size_bytes", sa.Integer(), nullable=False),
+            sa.Column("object_name", sa.String(), nullable=False),
+            sa.Column("created_at", sa.DateTime(), nullable=False),
+            sa.UniqueConstraint("object_name"),
+        )
+        op.create_index("ix_poll_attachments_poll_id", "poll_attachments", ["poll_id"])
+        op.create_index("ix_poll_attachments_uploader_user_id", "poll_attachments", ["uploader_user_id"])
+
+    if "runtime_settings" not in existing:
+        op.create_table(
+            "runtime_settings",
+            sa.Column("key", sa.String(), primary_key=True),
+            sa.Column("value", sa.String(), nullable=False),
+            sa.Column("updated_at", sa.DateTime(), nullable=False),
+        )
+
+
+def downgrade() -> None:
+    for table in (
+        "runtime_settings",
+        "poll_attachments",
+        "refresh_token_sessions",
+        "votes",
+        "poll_variants",
+        "polls",
+        "users",
+    ):
+        op.drop_table(table)
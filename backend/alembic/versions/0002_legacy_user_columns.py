@@ -0,0 +1,159 @@
+"""legacy users auth columns, username backfill and unique indexes
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 10:05:00.000000
+
+Replaces the old ``runtime.ensure_user_columns`` startup fix-up.
+"""
+from alembic import op
+import sqlalchemy as sa
+from passlib.context import CryptContext
+
+from services.online_indexes import create_index
+from services.password_service import pbkdf2_context_config
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    columns = {col["name"] for col in inspector.get_columns("users")}
+
+    if "username" not in columns:
+        op.add_column("users", sa.Column("username", sa.String(), nullable=True))
+    if "password_hash" not in columns:
+        op.add_column("users", sa.Column("password_hash", sa.String(), nullable=True))
+    if "created_at" not in columns:
+        if bind.dialect.name == "postgresql":
+            op.add_column("users", sa.Column("created_at", sa.DateTime(), server_default=sa.text("TIMEZONE('utc', NOW())")))
+        else:
+            # SQLite refuses ADD COLUMN with a non-constant default, so backfill instead.
+            op.add_column("users", sa.Column("created_at", sa.DateTime(), nullable=True))
+            op.execute("UPDATE users SET created_at = CURRENT_TIMESTAMP WHERE created_at IS NULL")
+    if "avatar_url" not in columns:
+        op.add_column("users", sa.Column("avatar_url", sa.String(), nullable=True))
+
+    _backfill_and_dedupe_usernames(bind)
+
+    # Every placeholder account gets the same known password anyway, so hash it once
+    # instead of once per row. These rows therefore share one salt and hash until the
+    # password is changed: login only rehashes when the pbkdf2 cost changes.
+    missing_hash = sa.text("SELECT 1 FROM users WHERE password_hash IS NULL OR password_hash = '' LIMIT 1")
+    if bind.execute(missing_hash).scalar():
+        placeholder = CryptContext(**pbkdf2_context_config()).hash("changeme")
+        bind.execute(
+            sa.text("UPDATE users SET password_hash = :password WHERE password_hash IS NULL OR password_hash = ''"),
+            {"password": placeholder},
+        )
+
+    bind.execute(sa.text("UPDATE users SET role = 'admin' WHERE role = 'owner'"))
+
+    unique_columns = {tuple(uc.get("column_names", [])) for uc in inspector.get_unique_constraints("users")}
+    unique_columns |= {tuple(idx.get("column_names", [])) for idx in inspector.get_indexes("users") if idx.get("unique")}
+    if ("username",) not in unique_columns:
+        create_index("uq_users_username", "users (username)", unique=True)
+    if ("email",) not in unique_columns:
+        create_index("uq_users_email", "users (email)", unique=True)
+
+
+MAX_DEDUPE_PASSES = 32
+
+
+def _username_base_expr(dialect_name: str) -> str:
+    # Mirrors the old Python rule: lower(local part of the email), or user_<id prefix>
+    # when there is no usable local part.
+    position = "strpos(email, '@')" if dialect_name == "postgresql" else "instr(email, '@')"
+    return (
+        "lower(CASE "
+        f"WHEN email IS NULL OR email = '' OR {position} = 1 THEN 'user_' || substr(id, 1, 8) "
+        f"WHEN {position} = 0 THEN email "
+        f"ELSE substr(email, 1, {position} - 1) END)"
+    )
+
+
+def _backfill_and_dedupe_usernames(bind) -> None:
+    """Fill and deduplicate usernames with a handful of set-based statements.
+
+    Missing usernames are derived in one UPDATE. Each dedupe pass then ranks every
+    duplicate group with ROW_NUMBER(): untouched usernames and lower ids win, the
+    rest get ``<name><rank - 1>``. A suffix can collide with a name that already
+    exists, so passes repeat until no duplicates remain (one or two in practice).
+    """
+    bind.execute(sa.text("CREATE TEMPORARY TABLE legacy_username_touched (id VARCHAR PRIMARY KEY)"))
+    bind.execute(
+        sa.text(
+            "INSERT INTO legacy_username_touched (id) "
+            "SELECT id FROM users WHERE username IS NULL OR username = ''"
+        )
+    )
+    bind.execute(
+        sa.text(
+            f"UPDATE users SET username = {_username_base_expr(bind.dialect.name)} "
+            "WHERE username IS NULL OR username = ''"
+        )
+    )
+
+    for _ in range(MAX_DEDUPE_PASSES):
+        bind.execute(
+            sa.text("CREATE TEMPORARY TABLE legacy_username_renames (id VARCHAR PRIMARY KEY, new_username VARCHAR)")
+        )
+        bind.execute(
+            sa.text(
+                """
+                INSERT INTO legacy_username_renames (id, new_username)
+                SELECT id, username || CAST(rn - 1 AS VARCHAR)
+                FROM (
+                    SELECT u.id, u.username, ROW_NUMBER() OVER (
+                        PARTITION BY u.username
+                        ORDER BY CASE WHEN t.id IS NULL THEN 0 ELSE 1 END, u.id
+                    ) AS rn
+                    FROM users u
+                    LEFT JOIN legacy_username_touched t ON t.id = u.id
+                    WHERE u.username IN (
+                        SELECT username FROM users GROUP BY username HAVING COUNT(*) > 1
+                    )
+                ) ranked
+                WHERE rn > 1
+                """
+            )
+        )
+        renamed = bind.execute(sa.text("SELECT COUNT(*) FROM legacy_username_renames")).scalar()
+        if renamed:
+            bind.execute(
+                sa.text(
+                    """
+                    UPDATE users SET username = (
+                        SELECT r.new_username FROM legacy_username_renames r WHERE r.id = users.id
+                    )
+                    WHERE id IN (SELECT id FROM legacy_username_renames)
+                    """
+                )
+            )
+            bind.execute(
+                sa.text(
+                    """
+                    INSERT INTO legacy_username_touched (id)
+                    SELECT r.id FROM legacy_username_renames r
+                    WHERE NOT EXISTS (SELECT 1 FROM legacy_username_touched t WHERE t.id = r.id)
+                    """
+                )
+            )
+        bind.execute(sa.text("DROP TABLE legacy_username_renames"))
+        if not renamed:
+            break
+    else:
+        raise RuntimeError("Could not resolve duplicate usernames")
+
+    bind.execute(sa.text("DROP TABLE legacy_username_touched"))
+
+
+def downgrade() -> None:
+    # The backfilled data cannot be told apart from user data; nothing to undo.
+    pass
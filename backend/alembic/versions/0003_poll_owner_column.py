@@ -0,0 +1,27 @@
+"""polls.owner_user_id for legacy databases
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 10:10:00.000000
+
+Replaces the old ``runtime.ensure_poll_columns`` startup fix-up.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    columns = {col["name"] for col in sa.inspect(op.get_bind()).get_columns("polls")}
+    if "owner_user_id" not in columns:
+        op.add_column("polls", sa.Column("owner_user_id", sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    pass
@@ -0,0 +1,33 @@
+"""allow several variants per user and poll
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19 10:15:00.000000
+
+Replaces the old ``runtime.ensure_vote_constraints`` startup fix-up. SQLite
+tables are rebuilt through batch mode instead of being skipped.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    constraints = {uc.get("name") for uc in sa.inspect(op.get_bind()).get_unique_constraints("votes")}
+    if "unique_user_poll_vote" not in constraints and "unique_user_poll_variant" in constraints:
+        return
+    with op.batch_alter_table("votes") as batch_op:
+        if "unique_user_poll_vote" in constraints:
+            batch_op.drop_constraint("unique_user_poll_vote", type_="unique")
+        if "unique_user_poll_variant" not in constraints:
+            batch_op.create_unique_constraint("unique_user_poll_variant", ["poll_id", "user_id", "variant_id"])
+
+
+def downgrade() -> None:
+    pass
@@ -0,0 +1,33 @@
+"""refresh session lookup and pruning indexes
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19 10:20:00.000000
+
+Replaces the old ``runtime.ensure_refresh_session_indexes`` startup fix-up.
+On Postgres the indexes are built with CREATE INDEX CONCURRENTLY so logins and
+refreshes keep writing to the table while the index builds.
+"""
+from services.online_indexes import create_index, drop_index
+
+
+# revision identifiers, used by Alembic.
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+INDEXES = {
+    "ix_refresh_token_sessions_user_active": "refresh_token_sessions (user_id, revoked_at) WHERE revoked_at IS NULL",
+    "ix_refresh_token_sessions_expires_at": "refresh_token_sessions (expires_at)",
+}
+
+
+def upgrade() -> None:
+    for name, definition in INDEXES.items():
+        create_index(name, definition)
+
+
+def downgrade() -> None:
+    for name in INDEXES:
+        drop_index(name)
@@ -0,0 +1,39 @@
+"""users prefix-search and role listing indexes
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19 10:25:00.000000
+
+Replaces the old ``runtime.ensure_user_search_indexes`` startup fix-up.
+text_pattern_ops lets Postgres serve ``LIKE 'prefix%'`` whatever the database
+collation; SQLite has no operator classes and gets plain expression indexes.
+"""
+from alembic import op
+
+from services.online_indexes import create_index, drop_index
+
+
+# revision identifiers, used by Alembic.
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+SEARCH_COLUMNS = ("username", "email", "name")
+
+
+def _indexes() -> dict:
+    opclass = " text_pattern_ops" if op.get_bind().dialect.name == "postgresql" else ""
+    indexes = {f"ix_users_{column}_lower": f"users (lower({column}){opclass})" for column in SEARCH_COLUMNS}
+    indexes["ix_users_role_username"] = "users (role, username)"
+    return indexes
+
+
+def upgrade() -> None:
+    for name, definition in _indexes().items():
+        create_index(name, definition)
+
+
+def downgrade() -> None:
+    for name in _indexes():
+        drop_index(name)
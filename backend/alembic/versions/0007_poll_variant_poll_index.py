@@ -0,0 +1,27 @@
+"""index poll_variants.poll_id
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19 11:00:00.000000
+
+Every poll read loads its variants by poll_id; without this index each load
+scanned the whole poll_variants table (caught by the query-plan suite).
+"""
+from services.online_indexes import create_index, drop_index
+
+
+# revision identifiers, used by Alembic.
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+INDEX_NAME = "ix_poll_variants_poll_id"
+
+
+def upgrade() -> None:
+    create_index(INDEX_NAME, "poll_variants (poll_id)")
+
+
+def downgrade() -> None:
+    drop_index(INDEX_NAME)
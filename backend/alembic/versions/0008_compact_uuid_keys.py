@@ -0,0 +1,304 @@
+"""compact UUID keys
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19 12:00:00.000000
+
+Ids and the columns that reference them move from 36-character text to native
+``uuid`` on Postgres and 16-byte BLOBs on SQLite. Canonical UUID text converts
+as is; any other legacy text id becomes ``md5(text)`` read as a UUID, the same
+rule ``models.uuid_key`` applies to ids coming from clients, so every reference
+stays consistent and old ids keep resolving.
+
+Postgres converts online: shadow ``<column>__uuid`` columns are kept in sync by
+a trigger, backfilled in small autocommitted batches, indexed CONCURRENTLY and
+then swapped in one short transaction guarded by ``lock_timeout``. Foreign keys
+come back NOT VALID and are validated afterwards without blocking writes.
+SQLite has no online ALTER TABLE: values are converted in place and each table
+is rebuilt.
+"""
+import hashlib
+import re
+import uuid
+
+from alembic import op
+import sqlalchemy as sa
+
+from services.online_indexes import batch_alter_table, build_index_concurrently
+
+
+# revision identifiers, used by Alembic.
+revision = '0008'
+down_revision = '0007'
+branch_labels = None
+depends_on = None
+
+KEY_COLUMNS = {
+    "users": ("id",),
+    "polls": ("id", "owner_user_id"),
+    "poll_variants": ("id", "poll_id"),
+    "votes": ("id", "poll_id", "variant_id", "user_id"),
+    "refresh_token_sessions": ("id", "user_id", "replaced_by_id"),
+    "poll_attachments": ("id", "poll_id", "uploader_user_id"),
+}
+SHADOW_SUFFIX = "__uuid"
+BACKFILL_BATCH_SIZE = 5000
+SWAP_LOCK_TIMEOUT = "5s"
+CANONICAL_UUID_PATTERN = "^[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}$"
+_CANONICAL_UUID = re.compile(CANONICAL_UUID_PATTERN)
+
+
+def _is_converted(column_type) -> bool:
+    return isinstance(column_type, (sa.Uuid, sa.LargeBinary))
+
+
+def _pending(inspector) -> dict:
+    """Key columns still stored as text, per table; empty once converted."""
+    pending = {}
+    for table, columns in KEY_COLUMNS.items():
+        types = {column["name"]: column["type"] for column in inspector.get_columns(table)}
+        remaining = tuple(column for column in columns if column in types and not _is_converted(types[column]))
+        if remaining:
+            pending[table] = remaining
+    return pending
+
+
+# --- SQLite -----------------------------------------------------------------
+
+
+def _key_blob(value):
+    if value is None or (isinstance(value, bytes) and len(value) == 16):
+        return value
+    if isinstance(value, bytes):
+        value = value.decode("utf-8")
+    if _CANONICAL_UUID.match(value):
+        return uuid.UUID(value).bytes
+    return hashlib.md5(value.encode("utf-8")).digest()
+
+
+def _key_text(value):
+    if isinstance(value, bytes) and len(value) == 16:
+        return str(uuid.UUID(bytes=value))
+    return value
+
+
+def _sqlite_rebuild(tables: dict, function, column_type, existing_type) -> None:
+    bind = op.get_bind()
+    bind.connection.dbapi_connection.create_function("survey_uuid_convert", 1, function, deterministic=True)
+    for table, columns in tables.items():
+        # The batch rebuild reflects the table, and SQLite cannot reflect
+        # expression indexes such as lower(username); keep their DDL to replay.
+        index_sql = bind.execute(
+            sa.text("SELECT name, sql FROM sqlite_master WHERE type = 'index' AND tbl_name = :table AND sql IS NOT NULL"),
+            {"table": table},
+        ).fetchall()
+        assignments = ", ".join(f"{column} = survey_uuid_convert({column})" for column in columns)
+        op.execute(f"UPDATE {table} SET {assignments}")
+        with batch_alter_table(table, recreate="always") as batch_op:
+            for column in columns:
+                batch_op.alter_column(column, type_=column_type, existing_type=existing_type)
+        for name, sql in index_sql:
+            exists = bind.execute(
+                sa.text("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = :name"), {"name": name}
+            ).scalar()
+            if not exists:
+                op.execute(sql)
+
+
+# --- Postgres -----------------------------------------------------------------
+
+
+def _shadow(column: str) -> str:
+    return f"{column}{SHADOW_SUFFIX}"
+
+
+def _sync_function(table: str) -> str:
+    return f"survey_uuid_sync_{table}"
+
+
+def _shadow_indexes(inspector, table: str, columns: tuple) -> list:
+    """(name, unique, is_constraint, definition) copies of the indexes on key columns."""
+
+    def on_shadows(column_names) -> str:
+        return ", ".join(_shadow(column) if column in columns else column for column in column_names)
+
+    copies = []
+    for constraint in inspector.get_unique_constraints(table):
+        if set(constraint["column_names"]) & set(columns):
+            copies.append((constraint["name"], True, True, f"{table} ({on_shadows(constraint['column_names'])})"))
+    for index in inspector.get_indexes(table):
+        names = index["column_names"]
+        if index.get("duplicates_constraint") or None in names or not set(names) & set(columns):
+            continue
+        definition = f"{table} ({on_shadows(names)})"
+        where = index.get("dialect_options", {}).get("postgresql_where")
+        if where is not None:
+            definition += f" WHERE {where}"
+        copies.append((index["name"], index["unique"], False, definition))
+    return copies
+
+
+def _referencing_foreign_keys(inspector, pending: dict) -> list:
+    foreign_keys = []
+    for table in KEY_COLUMNS:
+        for foreign_key in inspector.get_foreign_keys(table):
+            referred = foreign_key["referred_table"]
+            touches_key = set(foreign_key["constrained_columns"]) & set(pending.get(table, ())) or set(
+                foreign_key["referred_columns"]
+            ) & set(pending.get(referred, ()))
+            if touches_key:
+                foreign_keys.append((table, foreign_key))
+    return foreign_keys
+
+
+def _add_foreign_key(table: str, foreign_key: dict, *, validate: bool) -> None:
+    op.execute(
+        f"ALTER TABLE {table} ADD CONSTRAINT {foreign_key['name']} "
+        f"FOREIGN KEY ({', '.join(foreign_key['constrained_columns'])}) "
+        f"REFERENCES {foreign_key['referred_table']} ({', '.join(foreign_key['referred_columns'])})"
+        f"{'' if validate else ' NOT VALID'}"
+    )
+
+
+def _postgres_upgrade(pending: dict) -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    nullable = {
+        table: {column["name"]: column["nullable"] for column in inspector.get_columns(table)} for table in pending
+    }
+    primary_keys = {table: inspector.get_pk_constraint(table)["name"] for table in pending}
+    indexes = {table: _shadow_indexes(inspector, table, columns) for table, columns in pending.items()}
+    foreign_keys = _referencing_foreign_keys(inspector, pending)
+
+    # 1. Shadow columns, kept current by triggers from here on. Cheap: adding a
+    #    nullable column without a default only touches the catalog.
+    op.execute(
+        f"""
+        CREATE OR REPLACE FUNCTION survey_uuid_key(value text) RETURNS uuid
+        LANGUAGE sql IMMUTABLE AS $$
+            SELECT CASE
+                WHEN value IS NULL THEN NULL
+                WHEN value ~ '{CANONICAL_UUID_PATTERN}' THEN value::uuid
+                ELSE md5(value)::uuid
+            END
+        $$
+        """
+    )
+    for table, columns in pending.items():
+        for column in columns:
+            op.execute(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS {_shadow(column)} uuid")
+        assignments = " ".join(f"NEW.{_shadow(column)} := survey_uuid_key(NEW.{column});" for column in columns)
+        op.execute(
+            f"CREATE OR REPLACE FUNCTION {_sync_function(table)}() RETURNS trigger "
+            f"LANGUAGE plpgsql AS $$ BEGIN {assignments} RETURN NEW; END $$"
+        )
+        op.execute(f"DROP TRIGGER IF EXISTS survey_uuid_sync ON {table}")
+        op.execute(
+            f"CREATE TRIGGER survey_uuid_sync BEFORE INSERT OR UPDATE ON {table} "
+            f"FOR EACH ROW EXECUTE FUNCTION {_sync_function(table)}()"
+        )
+
+    # 2. Backfill, indexes and NOT NULL proofs outside any long transaction.
+    with op.get_context().autocommit_block():
+        for table, columns in pending.items():
+            assignments = ", ".join(f"{_shadow(column)} = survey_uuid_key({column})" for column in columns)
+            # Keyset batches in the id column's own collation; each one commits
+            # on its own, so locks are held for one batch at a time.
+            last_id = ""
+            while last_id is not None:
+                last_id = bind.execute(
+                    sa.text(
+                        f"WITH batch AS (SELECT id FROM {table} WHERE id > :last_id ORDER BY id LIMIT :size), "
+                        f"updated AS (UPDATE {table} SET {assignments} FROM batch "
+                        f"WHERE {table}.id = batch.id RETURNING {table}.id) "
+                        "SELECT max(id) FROM updated"
+                    ),
+                    {"last_id": last_id, "size": BACKFILL_BATCH_SIZE},
+                ).scalar()
+            build_index_concurrently(f"{table}{SHADOW_SUFFIX}_pkey", f"{table} ({_shadow('id')})", unique=True)
+            for name, unique, _, definition in indexes[table]:
+                build_index_concurrently(_shadow(name), definition, unique=unique)
+            for column in columns:
+                if nullable[table][column]:
+                    continue
+                check = f"{table}_{_shadow(column)}_not_null"
+                exists = bind.execute(sa.text("SELECT 1 FROM pg_constraint WHERE conname = :name"), {"name": check}).scalar()
+                if not exists:
+                    op.execute(f"ALTER TABLE {table} ADD CONSTRAINT {check} CHECK ({_shadow(column)} IS NOT NULL) NOT VALID")
+                op.execute(f"ALTER TABLE {table} VALIDATE CONSTRAINT {check}")
+
+    # 3. The swap: catalog-only changes under a short lock. If the lock cannot be
+    #    taken within lock_timeout the migration fails and can simply be rerun.
+    op.execute(f"SET LOCAL lock_timeout = '{SWAP_LOCK_TIMEOUT}'")
+    op.execute(f"LOCK TABLE {', '.join(pending)} IN ACCESS EXCLUSIVE MODE")
+    for table, foreign_key in foreign_keys:
+        op.execute(f"ALTER TABLE {table} DROP CONSTRAINT {foreign_key['name']}")
+    for table, columns in pending.items():
+        op.execute(f"DROP TRIGGER survey_uuid_sync ON {table}")
+        op.execute(f"DROP FUNCTION {_sync_function(table)}()")
+        op.execute(f"ALTER TABLE {table} DROP CONSTRAINT {primary_keys[table]}")
+        for column in columns:
+            op.execute(f"ALTER TABLE {table} DROP COLUMN {column}")
+            op.execute(f"ALTER TABLE {table} RENAME COLUMN {_shadow(column)} TO {column}")
+            if not nullable[table][column]:
+                # SET NOT NULL skips the table scan thanks to the validated check.
+                op.execute(f"ALTER TABLE {table} ALTER COLUMN {column} SET NOT NULL")
+                op.execute(f"ALTER TABLE {table} DROP CONSTRAINT {table}_{_shadow(column)}_not_null")
+        op.execute(
+            f"ALTER TABLE {table} ADD CONSTRAINT {primary_keys[table]} PRIMARY KEY USING INDEX {table}{SHADOW_SUFFIX}_pkey"
+        )
+        for name, _, is_constraint, _ in indexes[table]:
+            if is_constraint:
+                op.execute(f"ALTER TABLE {table} ADD CONSTRAINT {name} UNIQUE USING INDEX {_shadow(name)}")
+            else:
+                op.execute(f"ALTER INDEX {_shadow(name)} RENAME TO {name}")
+    op.execute("DROP FUNCTION survey_uuid_key(text)")
+    for table, foreign_key in foreign_keys:
+        _add_foreign_key(table, foreign_key, validate=False)
+
+    # 4. Validation scans the tables but only takes SHARE UPDATE EXCLUSIVE locks.
+    with op.get_context().autocommit_block():
+        for table, foreign_key in foreign_keys:
+            op.execute(f"ALTER TABLE {table} VALIDATE CONSTRAINT {foreign_key['name']}")
+
+
+def _postgres_downgrade(converted: dict) -> None:
+    inspector = sa.inspect(op.get_bind())
+    foreign_keys = _referencing_foreign_keys(inspector, converted)
+    for table, foreign_key in foreign_keys:
+        op.execute(f"ALTER TABLE {table} DROP CONSTRAINT {foreign_key['name']}")
+    for table, columns in converted.items():
+        retype = ", ".join(f"ALTER COLUMN {column} TYPE varchar USING {column}::text" for column in columns)
+        op.execute(f"ALTER TABLE {table} {retype}")
+    for table, foreign_key in foreign_keys:
+        _add_foreign_key(table, foreign_key, validate=True)
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    pending = _pending(sa.inspect(bind))
+    if not pending:
+        return
+    if bind.dialect.name == "postgresql":
+        _postgres_upgrade(pending)
+    else:
+        _sqlite_rebuild(pending, _key_blob, sa.LargeBinary(16), sa.String())
+
+
+def downgrade() -> None:
+    # Legacy non-UUID ids are not restored: they come back as the UUID text of
+    # their md5, which is still what models.uuid_key maps them to.
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    converted = {}
+    for table, columns in KEY_COLUMNS.items():
+        types = {column["name"]: column["type"] for column in inspector.get_columns(table)}
+        done = tuple(column for column in columns if column in types and _is_converted(types[column]))
+        if done:
+            converted[table] = done
+    if not converted:
+        return
+    if bind.dialect.name == "postgresql":
+        _postgres_downgrade(converted)
+    else:
+        _sqlite_rebuild(converted, _key_text, sa.String(), sa.LargeBinary(16))
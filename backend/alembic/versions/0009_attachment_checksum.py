@@ -0,0 +1,32 @@
+"""poll_attachments.checksum_sha256
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-19 16:00:00.000000
+
+Attachments are now streamed to object storage and hashed on the way; the
+digest is kept next to the size. Rows uploaded before this revision stay NULL.
+"""
+import sqlalchemy as sa
+from alembic import op
+
+from services.online_indexes import batch_alter_table
+
+
+# revision identifiers, used by Alembic.
+revision = '0009'
+down_revision = '0008'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Nullable without a default: a catalog-only change on Postgres.
+    op.add_column("poll_attachments", sa.Column("checksum_sha256", sa.String(64), nullable=True))
+
+
+def downgrade() -> None:
+    # The rebuild reflects users through the foreign key; its expression indexes
+    # stay untouched, only their reflection is skipped.
+    with batch_alter_table("poll_attachments") as batch_op:
+        batch_op.drop_column("checksum_sha256")
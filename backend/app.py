@@ -2,18 +2,26 @@ import os
 
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.responses import JSONResponse
 from fastapi.staticfiles import StaticFiles
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.exc import OperationalError
 
-from database import get_db
+from database import SessionLocal, dispose_async_engines, get_db, replica_set, sql_instrumentation
+from dependencies import token_service
+from metrics import register_metrics_source
+from routers.admin import router as admin_router
 from routers.auth import router as auth_router
 from routers.core import router as core_router
 from routers.external import router as external_router
 from routers.polls import router as polls_router
 from routers.users import router as users_router
-from runtime import STATIC_DIR, ensure_minio_bucket, ensure_runtime_schema, logger
+from runtime import STATIC_DIR, ensure_minio_bucket, ensure_schema_ready, load_password_hash_rounds, logger
+from services.byte_ranges import RangeAwareGZipMiddleware
+from services.password_service import PasswordHashingBusyError
+from services.read_replicas import ReplicaRoutingMiddleware
+from services.session_pruner import RefreshSessionPruner, load_session_prune_settings
+from services.sql_instrumentation import SqlInstrumentationMiddleware
 
 app = FastAPI(title="MTUCI Backend", version="0.1.0")
 app.mount("/static", StaticFiles(directory=str(STATIC_DIR)), name="static")
@@ -38,7 +46,14 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
-app.add_middleware(GZipMiddleware, minimum_size=700)
+app.add_middleware(RangeAwareGZipMiddleware, identity_suffixes=("/download",), minimum_size=700)
+app.add_middleware(ReplicaRoutingMiddleware, replicas=replica_set, identify=token_service.access_token_subject)
+if sql_instrumentation.settings.enabled:
+    # Added last, so it wraps every other middleware.
+    app.add_middleware(SqlInstrumentationMiddleware, instrumentation=sql_instrumentation)
+
+refresh_session_pruner = RefreshSessionPruner(load_session_prune_settings(), SessionLocal)
+register_metrics_source("refreshSessionPruner", refresh_session_pruner.stats)
 
 
 @app.exception_handler(Exception)
@@ -56,11 +71,22 @@ async def global_exception_handler(request: Request, exc: Exception):
     )
 
 
+@app.exception_handler(PasswordHashingBusyError)
+async def password_hashing_busy_handler(request: Request, exc: PasswordHashingBusyError):
+    logger.warning("Password hashing queue is full, shedding %s %s", request.method, request.url.path)
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={"detail": exc.detail},
+        headers={"Retry-After": str(exc.retry_after_seconds)},
+    )
+
+
 app.include_router(core_router)
 app.include_router(auth_router)
 app.include_router(users_router)
 app.include_router(polls_router)
 app.include_router(external_router)
+app.include_router(admin_router)
 
 
 @app.on_event("startup")
@@ -71,7 +97,8 @@ def startup_event():
     try:
         db_gen = get_db()
         db = next(db_gen)
-        ensure_runtime_schema(db, include_vote_constraints=True)
+        ensure_schema_ready(db)
+        load_password_hash_rounds(db)
     except OperationalError:
         logger.exception("Database initialization failed: database unavailable")
     except Exception:
@@ -92,3 +119,13 @@ def startup_event():
         ensure_minio_bucket()
     except Exception:
         logger.exception("Object storage initialization failed")
+
+    refresh_session_pruner.start()
+    replica_set.start()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await run_in_threadpool(refresh_session_pruner.stop)
+    await run_in_threadpool(replica_set.stop)
+    await dispose_async_engines()
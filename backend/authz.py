@@ -14,6 +14,8 @@ PERM_POLLS_ASSIGN_OWNER = "polls:assign_owner"
 PERM_POLLS_VOTE = "polls:vote"
 PERM_POLLS_DELETE_ANY = "polls:delete:any"
 PERM_POLLS_DELETE_OWN = "polls:delete:own"
+PERM_SYSTEM_METRICS_READ = "system:metrics:read"
+PERM_SYSTEM_SCHEMA_MANAGE = "system:schema:manage"
 
 ROLE_PERMISSIONS: Dict[str, Set[str]] = {
     "admin": {
@@ -28,6 +30,8 @@ ROLE_PERMISSIONS: Dict[str, Set[str]] = {
         PERM_POLLS_VOTE,
         PERM_POLLS_DELETE_ANY,
         PERM_POLLS_DELETE_OWN,
+        PERM_SYSTEM_METRICS_READ,
+        PERM_SYSTEM_SCHEMA_MANAGE,
     },
     "user": {
         PERM_USERS_READ_SELF,
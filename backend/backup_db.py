@@ -0,0 +1,55 @@
+import argparse
+from dataclasses import replace
+from pathlib import Path
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from database import DATABASE_URL
+from runtime import logger, upgrade_schema
+from services.backup import export_tables, load_backup_settings, restore_tables
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Logical backup of users, polls, variants, votes and attachment metadata (gzip JSONL), "
+        "and parallel restore into SQLite or Postgres.",
+    )
+    parser.add_argument("--database-url", default=DATABASE_URL, help="Database to read from / restore into (default: DATABASE_URL)")
+    parser.add_argument("--batch-size", type=int, default=None, help="Rows per fetch / insert chunk")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    export_parser = subcommands.add_parser("export", help="Stream every table to <directory>/<table>.jsonl.gz")
+    export_parser.add_argument("directory", type=Path)
+    restore_parser = subcommands.add_parser("restore", help="Load a backup directory, migrating the target schema first")
+    restore_parser.add_argument("directory", type=Path)
+    restore_parser.add_argument("--workers", type=int, default=None, help="Parallel insert workers (Postgres only)")
+    restore_parser.add_argument("--replace", action="store_true", help="Delete existing rows of the backed-up tables (and the refresh sessions referencing them) first")
+    args = parser.parse_args()
+
+    settings = load_backup_settings()
+    if args.batch_size:
+        settings = replace(settings, batch_size=args.batch_size)
+    if getattr(args, "workers", None):
+        settings = replace(settings, workers=args.workers)
+
+    connect_args = {"check_same_thread": False} if args.database_url.startswith("sqlite") else {}
+    engine = create_engine(args.database_url, connect_args=connect_args, pool_size=settings.workers + 1)
+    try:
+        if args.command == "export":
+            manifest = export_tables(engine, args.directory, settings)
+            logger.info(
+                "Backup written to %s: %s",
+                args.directory,
+                ", ".join(f"{table['rows']} {name}" for name, table in manifest["tables"].items()),
+            )
+            return
+        with Session(engine) as db:
+            upgrade_schema(db)
+        restored = restore_tables(engine, args.directory, settings, replace=args.replace)
+        logger.info("Restore from %s finished: %s", args.directory, ", ".join(f"{rows} {name}" for name, rows in restored.items()))
+    finally:
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
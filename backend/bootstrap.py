@@ -1,10 +1,10 @@
 from database import SessionLocal
-from runtime import ensure_runtime_schema, logger
+from runtime import ensure_schema_ready, logger
 
 
 def main() -> None:
     with SessionLocal() as db:
-        ensure_runtime_schema(db, include_vote_constraints=True)
+        ensure_schema_ready(db, force=True)
     logger.info("Database bootstrap completed successfully")
 
 
@@ -1,174 +1,31 @@
 import os
-import sqlite3
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
 from sqlalchemy.orm import Session
 
 from database import SessionLocal
-from models import Poll, PollVariant, User, Vote
-from runtime import ensure_runtime_schema, hash_password, logger
+from models import Poll, PollVariant, User
+from runtime import ensure_schema_ready, hash_password, logger
+from services.sqlite_import import SqliteImportSettings, SqliteImporter, load_sqlite_import_settings
 
 
-def _to_datetime(value: str | None):
-    if not value:
-        return None
-    try:
-        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
-        if parsed.tzinfo is not None:
-            return parsed.astimezone(timezone.utc).replace(tzinfo=None)
-        return parsed
-    except ValueError:
-        return None
-
-
-def import_sqlite_data(db: Session, source_path: Path) -> int:
+def import_sqlite_data(db: Session, source_path: Path, settings: SqliteImportSettings | None = None) -> int:
     if not source_path.exists():
         logger.info("SQLite import skipped: %s does not exist", source_path)
         return 0
 
-    connection = sqlite3.connect(source_path)
-    connection.row_factory = sqlite3.Row
-    imported_polls = 0
-
-    try:
-        table_columns: dict[str, set[str]] = {}
-        for table_name in ("users", "polls", "poll_variants", "votes"):
-            table_columns[table_name] = {
-                row["name"]
-                for row in connection.execute(f"PRAGMA table_info({table_name})").fetchall()
-            }
-
-        def column_or_null(table_name: str, column_name: str) -> str:
-            return column_name if column_name in table_columns.get(table_name, set()) else f"NULL AS {column_name}"
-
-        users = connection.execute(
-            f"""
-            SELECT
-                id,
-                username,
-                email,
-                name,
-                role,
-                password_hash,
-                {column_or_null("users", "created_at")},
-                {column_or_null("users", "avatar_url")}
-            FROM users
-            """
-        ).fetchall()
-        for row in users:
-            existing = db.query(User).filter(User.id == row["id"]).first()
-            if existing:
-                continue
-            db.add(
-                User(
-                    id=row["id"],
-                    username=row["username"] or f"user-{row['id'][:8]}",
-                    email=row["email"] or f"{row['id']}@example.local",
-                    name=row["name"] or row["username"] or "Пользователь",
-                    role=row["role"] or "user",
-                    password_hash=row["password_hash"] or hash_password("changeme"),
-                    created_at=_to_datetime(row["created_at"]),
-                    avatar_url=row["avatar_url"],
-                )
-            )
-        db.flush()
-
-        polls = connection.execute(
-            f"""
-            SELECT
-                id,
-                title,
-                description,
-                {column_or_null("polls", "deadline_iso")},
-                type,
-                {column_or_null("polls", "max_selections")},
-                {column_or_null("polls", "is_anonymous")},
-                {column_or_null("polls", "created_at")},
-                {column_or_null("polls", "owner_user_id")}
-            FROM polls
-            """
-        ).fetchall()
-        for row in polls:
-            existing = db.query(Poll).filter(Poll.id == row["id"]).first()
-            if existing:
-                continue
-            db.add(
-                Poll(
-                    id=row["id"],
-                    title=row["title"],
-                    description=row["description"],
-                    deadline_iso=_to_datetime(row["deadline_iso"]),
-                    type=row["type"],
-                    max_selections=row["max_selections"] or 1,
-                    is_anonymous=bool(row["is_anonymous"]),
-                    created_at=_to_datetime(row["created_at"]),
-                    owner_user_id=row["owner_user_id"],
-                )
-            )
-            imported_polls += 1
-        db.flush()
-
-        variants = connection.execute(
-            f"""
-            SELECT
-                id,
-                poll_id,
-                label,
-                {column_or_null("poll_variants", "created_at")}
-            FROM poll_variants
-            """
-        ).fetchall()
-        for row in variants:
-            existing = db.query(PollVariant).filter(PollVariant.id == row["id"]).first()
-            if existing:
-                continue
-            db.add(
-                PollVariant(
-                    id=row["id"],
-                    poll_id=row["poll_id"],
-                    label=row["label"],
-                    created_at=_to_datetime(row["created_at"]),
-                )
-            )
-
-        vote_tables = {
-            row["name"]
-            for row in connection.execute(
-                "SELECT name FROM sqlite_master WHERE type='table'"
-            ).fetchall()
-        }
-        if "votes" in vote_tables:
-            votes = connection.execute(
-                f"""
-                SELECT
-                    id,
-                    poll_id,
-                    variant_id,
-                    user_id,
-                    {column_or_null("votes", "created_at")}
-                FROM votes
-                """
-            ).fetchall()
-            for row in votes:
-                existing = db.query(Vote).filter(Vote.id == row["id"]).first()
-                if existing:
-                    continue
-                db.add(
-                    Vote(
-                        id=row["id"],
-                        poll_id=row["poll_id"],
-                        variant_id=row["variant_id"],
-                        user_id=row["user_id"],
-                        created_at=_to_datetime(row["created_at"]),
-                    )
-                )
-
-        db.commit()
-        logger.info("Imported %s polls from SQLite source %s", imported_polls, source_path)
-        return imported_polls
-    finally:
-        connection.close()
+    importer = SqliteImporter(db, source_path, settings or load_sqlite_import_settings(), hash_password)
+    inserted = importer.run()
+    logger.info(
+        "Imported %s users, %s polls, %s variants and %s votes from SQLite source %s",
+        inserted["users"],
+        inserted["polls"],
+        inserted["poll_variants"],
+        inserted["votes"],
+        source_path,
+    )
+    return inserted["polls"]
 
 
 def seed_demo_data(db: Session) -> None:
@@ -289,8 +146,12 @@ def main() -> None:
     seed_on_empty = os.getenv("SEED_DEMO_DATA_ON_EMPTY", "true").lower() in {"1", "true", "yes"}
 
     with SessionLocal() as db:
-        ensure_runtime_schema(db, include_vote_constraints=True)
-        if db.query(Poll).count() > 0:
+        ensure_schema_ready(db)
+        # An interrupted import already wrote polls; the checkpoint says to finish it.
+        resuming = source_path.exists() and SqliteImporter(
+            db, source_path, load_sqlite_import_settings(), hash_password
+        ).has_unfinished_checkpoint()
+        if not resuming and db.query(Poll).count() > 0:
             logger.info("Data bootstrap skipped: target database already has polls")
             return
 
@@ -0,0 +1,43 @@
+import argparse
+import os
+
+from database import SessionLocal
+from repositories.settings_repository import RuntimeSettingRepository
+from runtime import PASSWORD_HASH_ROUNDS_SETTING, ensure_schema_ready, logger
+from services.password_service import calibrate_pbkdf2_rounds, measure_pbkdf2_ms
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Measure pbkdf2_sha256 cost on this host and persist rounds for a target login latency.",
+    )
+    parser.add_argument(
+        "--target-ms",
+        type=float,
+        default=float(os.getenv("PASSWORD_HASH_TARGET_MS", "250")),
+        help="Desired wall time of a single password hash in milliseconds",
+    )
+    parser.add_argument("--samples", type=int, default=5, help="Measurements per probe (median is used)")
+    parser.add_argument("--dry-run", action="store_true", help="Print the result without persisting it")
+    args = parser.parse_args()
+
+    rounds = calibrate_pbkdf2_rounds(args.target_ms, samples=args.samples)
+    achieved_ms = measure_pbkdf2_ms(rounds, samples=args.samples)
+    logger.info(
+        "Calibrated pbkdf2_sha256 to %s rounds (%.1f ms per hash, target %.1f ms)",
+        rounds,
+        achieved_ms,
+        args.target_ms,
+    )
+    if args.dry_run:
+        return
+
+    with SessionLocal() as db:
+        ensure_schema_ready(db)
+        RuntimeSettingRepository(db).set(PASSWORD_HASH_ROUNDS_SETTING, str(rounds))
+        db.commit()
+    logger.info("Persisted %s=%s; existing hashes are upgraded on next login", PASSWORD_HASH_ROUNDS_SETTING, rounds)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,21 @@
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from dataclasses import replace
 from sqlalchemy.ext.declarative import declarative_base
 import os
 import logging
 from pathlib import Path
 from dotenv import load_dotenv
 
+from metrics import register_metrics_source
+from services.db_pool import PoolMonitor, load_pool_settings, monitored_pool_class
+from services.read_replicas import ReplicaSet, load_replica_settings, replica_routing_session_class
+from services.sql_instrumentation import SqlInstrumentation, load_sql_instrumentation_settings
+from services.sqlite_profile import apply_sqlite_profile, load_sqlite_settings, writer_routing_session_class
+
 logger = logging.getLogger("survey_backend.database")
 if not logger.handlers:
     handler = logging.StreamHandler()
@@ -27,12 +37,23 @@ DATABASE_URL = os.getenv("DATABASE_URL")
 if not DATABASE_URL:
     DATABASE_URL = f"sqlite:///{DEFAULT_SQLITE_PATH}" if USE_SQLITE else DEFAULT_POSTGRES_URL
 
+pool_settings = load_pool_settings()
+pool_monitor = PoolMonitor(pool_settings)
+
 engine_kwargs = {
     "echo": os.getenv("SQLALCHEMY_ECHO", "true").lower() in {"1", "true", "yes"},
-    "pool_pre_ping": True,
+    "poolclass": monitored_pool_class(pool_monitor),
+    **pool_settings.engine_kwargs(),
 }
 
-if DATABASE_URL.startswith("sqlite"):
+sqlite_settings = load_sqlite_settings()
+IS_SQLITE = DATABASE_URL.startswith("sqlite")
+# The profile needs a shared file: every connection to :memory: is its own database.
+SQLITE_PROFILE_ACTIVE = IS_SQLITE and sqlite_settings.enabled and make_url(DATABASE_URL).database not in (None, "", ":memory:")
+SQLITE_SINGLE_WRITER = SQLITE_PROFILE_ACTIVE and sqlite_settings.routes_writes
+writer_pool_settings = replace(pool_settings, size=1, max_overflow=0)
+
+if IS_SQLITE:
     DEFAULT_SQLITE_PATH.parent.mkdir(parents=True, exist_ok=True)
     engine_kwargs["connect_args"] = {"check_same_thread": False}
     logger.info("Using SQLite database at %s", DEFAULT_SQLITE_PATH)
@@ -41,9 +62,126 @@ else:
 
 # Create engine
 engine = create_engine(DATABASE_URL, **engine_kwargs)
+pool_monitor.attach(engine.pool)
+register_metrics_source("dbPool", pool_monitor.stats)
+logger.info(
+    "Connection pool: size=%s overflow=%s timeout=%ss liveness=%s",
+    pool_settings.size,
+    pool_settings.max_overflow,
+    pool_settings.timeout_seconds,
+    pool_settings.liveness,
+)
+
+writer_engine = engine
+if SQLITE_PROFILE_ACTIVE:
+    apply_sqlite_profile(engine, sqlite_settings)
+    logger.info(
+        "SQLite profile: journal=%s synchronous=%s busy_timeout=%sms mmap=%s cache=%sKiB single_writer=%s",
+        sqlite_settings.journal_mode,
+        sqlite_settings.synchronous,
+        sqlite_settings.busy_timeout_ms,
+        sqlite_settings.mmap_size_bytes,
+        sqlite_settings.cache_size_kib,
+        SQLITE_SINGLE_WRITER,
+    )
+if SQLITE_SINGLE_WRITER:
+    # SQLite allows one writer at a time anyway. Queueing writers on a one-connection
+    # pool is cheaper than letting them spin on the file lock, and readers keep the
+    # main pool to themselves.
+    writer_pool_monitor = PoolMonitor(writer_pool_settings)
+    writer_engine = create_engine(
+        DATABASE_URL,
+        **{**engine_kwargs, "poolclass": monitored_pool_class(writer_pool_monitor), **writer_pool_settings.engine_kwargs()},
+    )
+    writer_pool_monitor.attach(writer_engine.pool)
+    apply_sqlite_profile(writer_engine, sqlite_settings, writer=True)
+    register_metrics_source("dbPoolWriter", writer_pool_monitor.stats)
+
+ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+psycopg"}
+
+
+def async_database_url(url: str) -> str:
+    """Same database, async driver: aiosqlite for SQLite, psycopg 3 async for Postgres."""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for {backend!r} databases")
+    return parsed.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+
+# The async engine gets its own pool with the same limits, so the sync and async
+# routes together may hold up to twice DB_POOL_SIZE + DB_MAX_OVERFLOW connections.
+async_pool_monitor = PoolMonitor(pool_settings)
+async_engine = create_async_engine(
+    async_database_url(DATABASE_URL),
+    **{**engine_kwargs, "poolclass": monitored_pool_class(async_pool_monitor, AsyncAdaptedQueuePool)},
+)
+async_pool_monitor.attach(async_engine.sync_engine.pool)
+register_metrics_source("dbPoolAsync", async_pool_monitor.stats)
+
+async_writer_engine = async_engine
+if SQLITE_PROFILE_ACTIVE:
+    apply_sqlite_profile(async_engine.sync_engine, sqlite_settings)
+if SQLITE_SINGLE_WRITER:
+    async_writer_pool_monitor = PoolMonitor(writer_pool_settings)
+    async_writer_engine = create_async_engine(
+        async_database_url(DATABASE_URL),
+        **{
+            **engine_kwargs,
+            "poolclass": monitored_pool_class(async_writer_pool_monitor, AsyncAdaptedQueuePool),
+            **writer_pool_settings.engine_kwargs(),
+        },
+    )
+    async_writer_pool_monitor.attach(async_writer_engine.sync_engine.pool)
+    apply_sqlite_profile(async_writer_engine.sync_engine, sqlite_settings, writer=True)
+    register_metrics_source("dbPoolWriterAsync", async_writer_pool_monitor.stats)
+
+# Read replicas get plain pools with the primary's limits; the primary stays the
+# bind for writes and for everything outside a GET/HEAD request.
+replica_settings = load_replica_settings()
+replica_kwargs = {"echo": engine_kwargs["echo"], **pool_settings.engine_kwargs()}
+replica_engines = [create_engine(url, **replica_kwargs) for url in replica_settings.urls]
+async_replica_engines = [create_async_engine(async_database_url(url), **replica_kwargs) for url in replica_settings.urls]
+replica_set = ReplicaSet(replica_settings, replica_engines)
+register_metrics_source("dbReplicas", replica_set.stats)
+
+sql_instrumentation = SqlInstrumentation(load_sql_instrumentation_settings())
+if sql_instrumentation.settings.enabled:
+    instrumented = {engine, writer_engine, async_engine.sync_engine, async_writer_engine.sync_engine}
+    instrumented.update(replica_engines)
+    instrumented.update(replica.sync_engine for replica in async_replica_engines)
+    for instrumented_engine in instrumented:
+        sql_instrumentation.instrument(instrumented_engine)
+    register_metrics_source("sqlRequests", sql_instrumentation.stats)
+    logger.info("SQL instrumentation on: N+1 warning above %s repeats", sql_instrumentation.settings.n_plus_one_threshold)
+
+
+def _session_class(writer, replicas) -> type:
+    session_class = writer_routing_session_class(writer) if SQLITE_SINGLE_WRITER else Session
+    if replica_settings.enabled:
+        session_class = replica_routing_session_class(replica_set, replicas, session_class)
+    return session_class
+
 
 # Create session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SessionLocal = sessionmaker(
+    autocommit=False,
+    autoflush=False,
+    bind=engine,
+    class_=_session_class(writer_engine, replica_engines),
+)
+
+# expire_on_commit=False: attribute access after commit would need an implicit
+# (and in async code, forbidden) refresh.
+AsyncSessionLocal = async_sessionmaker(
+    async_engine,
+    autoflush=False,
+    expire_on_commit=False,
+    sync_session_class=_session_class(
+        async_writer_engine.sync_engine,
+        [replica.sync_engine for replica in async_replica_engines],
+    ),
+)
 
 # Base class for models
 Base = declarative_base()
@@ -58,6 +196,21 @@ def get_db():
         db.close()
 
 
+async def dispose_async_engines():
+    """Close async pool connections; they are bound to the event loop that opened them."""
+    await async_engine.dispose()
+    if async_writer_engine is not async_engine:
+        await async_writer_engine.dispose()
+    for replica in async_replica_engines:
+        await replica.dispose()
+
+
+async def get_async_db():
+    """Dependency to get an async database session"""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
 def create_tables():
     """Create all tables in the database"""
     from models import Base
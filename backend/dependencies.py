@@ -2,21 +2,28 @@ from typing import Optional
 
 from fastapi import Depends, HTTPException
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from authz import user_has_permission
-from database import get_db
+from database import get_async_db, get_db
+from metrics import register_metrics_source
 from models import User as UserModel
-from repositories.auth_repository import RefreshSessionRepository, UserRepository
+from repositories.auth_repository import AsyncUserRepository, RefreshSessionRepository, UserRepository
 from runtime import logger, verify_password
 from services.auth_service import AuthError, AuthService, TokenService, load_auth_settings
+from services.login_throttle import build_login_throttle, load_login_throttle_settings
 
 auth_settings = load_auth_settings()
 if auth_settings.secret_key == "dev-insecure-jwt-secret":
     logger.warning("JWT_SECRET is not configured. Using insecure development secret.")
 
 token_service = TokenService(auth_settings)
+if token_service.access_token_cache is not None:
+    register_metrics_source("accessTokenCache", token_service.access_token_cache.stats)
 bearer_scheme = HTTPBearer(auto_error=False)
+login_throttle = build_login_throttle(load_login_throttle_settings())
+register_metrics_source("loginThrottle", login_throttle.stats)
 
 
 def get_auth_service(db: Session = Depends(get_db)) -> AuthService:
@@ -40,6 +47,27 @@ def get_current_user(
         raise HTTPException(status_code=exc.status_code, detail=exc.detail) from exc
 
 
+async def get_current_user_async(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme),
+    db: AsyncSession = Depends(get_async_db),
+) -> UserModel:
+    """``get_current_user`` for async routes: the user is loaded into the route's AsyncSession.
+
+    Sync routes keep using ``get_current_user``; they add the user back into their
+    own ``Session``, which an object owned by an AsyncSession cannot join.
+    """
+    if not credentials or credentials.scheme.lower() != "bearer":
+        raise HTTPException(status_code=401, detail="Missing bearer token")
+    try:
+        user_id = token_service.access_token_subject(credentials.credentials)
+    except AuthError as exc:
+        raise HTTPException(status_code=exc.status_code, detail=exc.detail) from exc
+    user = await AsyncUserRepository(db).get_by_id(user_id)
+    if not user:
+        raise HTTPException(status_code=401, detail="User not found")
+    return user
+
+
 def require_permission(permission: str):
     def dependency(current_user: UserModel = Depends(get_current_user)) -> UserModel:
         if not user_has_permission(current_user, permission):
@@ -47,3 +75,13 @@ def require_permission(permission: str):
         return current_user
 
     return dependency
+
+
+def require_permission_async(permission: str):
+    # async def so the check runs on the event loop instead of a threadpool hop.
+    async def dependency(current_user: UserModel = Depends(get_current_user_async)) -> UserModel:
+        if not user_has_permission(current_user, permission):
+            raise HTTPException(status_code=403, detail="Forbidden")
+        return current_user
+
+    return dependency
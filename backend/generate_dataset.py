@@ -0,0 +1,58 @@
+import argparse
+import time
+from datetime import datetime
+
+from database import SessionLocal
+from runtime import ensure_schema_ready, hash_password, logger
+from services.dataset_generator import DatasetGenerator, DatasetSpec
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Fill the database with a large synthetic dataset (Zipf-skewed votes) for load testing.",
+    )
+    parser.add_argument("--users", type=int, default=100_000, help="Number of users to create")
+    parser.add_argument("--polls", type=int, default=10_000, help="Number of polls to create")
+    parser.add_argument("--ballots", type=int, default=1_000_000, help="Poll participations to draw across all polls")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed; the same seed and anchor give the same rows")
+    parser.add_argument("--zipf", type=float, default=1.1, help="Zipf exponent of poll popularity (higher = hotter top polls)")
+    parser.add_argument("--max-variants", type=int, default=8, help="Upper bound of variants per poll")
+    parser.add_argument("--batch-size", type=int, default=10_000, help="Rows per insert chunk / transaction")
+    parser.add_argument(
+        "--anchor",
+        type=datetime.fromisoformat,
+        default=None,
+        help="Reference time (ISO) that timestamps and deadlines are relative to; defaults to now",
+    )
+    parser.add_argument("--password", default="LoadTest123!", help="Password of every generated user")
+    parser.add_argument("--no-copy", action="store_true", help="Use executemany instead of COPY on Postgres")
+    args = parser.parse_args()
+
+    spec_kwargs = {"anchor": args.anchor} if args.anchor else {}
+    spec = DatasetSpec(
+        users=args.users,
+        polls=args.polls,
+        ballots=args.ballots,
+        seed=args.seed,
+        zipf_exponent=args.zipf,
+        max_variants=args.max_variants,
+        batch_size=args.batch_size,
+        **spec_kwargs,
+    )
+    started = time.perf_counter()
+    with SessionLocal() as db:
+        ensure_schema_ready(db)
+        written = DatasetGenerator(db, spec, hash_password(args.password), use_copy=not args.no_copy).run()
+    logger.info(
+        "Generated %s users, %s polls, %s variants and %s votes in %.1fs (seed %s)",
+        written["users"],
+        written["polls"],
+        written["poll_variants"],
+        written["votes"],
+        time.perf_counter() - started,
+        spec.seed,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+import bisect
+import threading
+from typing import Any, Callable, Dict, Sequence
+
+MetricsSource = Callable[[], Dict[str, Any]]
+
+_sources: Dict[str, MetricsSource] = {}
+_sources_lock = threading.Lock()
+
+
+def register_metrics_source(name: str, source: MetricsSource) -> None:
+    with _sources_lock:
+        _sources[name] = source
+
+
+def collect_metrics() -> Dict[str, Any]:
+    with _sources_lock:
+        sources = dict(_sources)
+    return {name: source() for name, source in sorted(sources.items())}
+
+
+class LatencyHistogram:
+    """Thread-safe cumulative latency histogram with millisecond buckets."""
+
+    DEFAULT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+    def __init__(self, buckets_ms: Sequence[float] = DEFAULT_BUCKETS_MS) -> None:
+        self.buckets_ms = tuple(sorted(buckets_ms))
+        self._counts = [0] * (len(self.buckets_ms) + 1)
+        self._count = 0
+        self._sum_ms = 0.0
+        self._max_ms = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float) -> None:
+        elapsed_ms = max(0.0, seconds * 1000.0)
+        index = bisect.bisect_left(self.buckets_ms, elapsed_ms)
+        with self._lock:
+            self._counts[index] += 1
+            self._count += 1
+            self._sum_ms += elapsed_ms
+            self._max_ms = max(self._max_ms, elapsed_ms)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            buckets: Dict[str, int] = {}
+            cumulative = 0
+            for bound, count in zip(self.buckets_ms, self._counts):
+                cumulative += count
+                buckets[f"le{bound:g}ms"] = cumulative
+            buckets["leInf"] = cumulative + self._counts[-1]
+            return {
+                "count": self._count,
+                "avgMs": round(self._sum_ms / self._count, 3) if self._count else 0.0,
+                "maxMs": round(self._max_ms, 3),
+                "buckets": buckets,
+            }
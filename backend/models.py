@@ -1,16 +1,72 @@
-from sqlalchemy import Column, String, Integer, DateTime, Text, Boolean, ForeignKey, UniqueConstraint
+from sqlalchemy import Column, String, Integer, DateTime, Text, Boolean, ForeignKey, Index, LargeBinary, UniqueConstraint, Uuid, func, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
+from sqlalchemy.types import TypeDecorator
 from datetime import datetime
+import hashlib
+import re
 import uuid
 
 Base = declarative_base()
 
+_CANONICAL_UUID = re.compile(r"^[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}$")
+
+
+def uuid_key(value) -> uuid.UUID:
+    """The UUID an id value is stored as.
+
+    Canonical UUID text maps to itself and 16 raw bytes are read as a key. Any other
+    legacy text id maps to ``md5(text)``, the same rule migration 0008 applied to
+    existing rows, so old ids keep resolving to the rows they named.
+    """
+    if isinstance(value, uuid.UUID):
+        return value
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        raw = bytes(value)
+        if len(raw) == 16:
+            return uuid.UUID(bytes=raw)
+        value = raw.decode("utf-8")
+    value = str(value)
+    if _CANONICAL_UUID.match(value):
+        return uuid.UUID(value)
+    return uuid.UUID(bytes=hashlib.md5(value.encode("utf-8")).digest())
+
+
+def new_uuid_key() -> str:
+    return str(uuid.uuid4())
+
+
+class CompactUUID(TypeDecorator):
+    """UUID key stored natively: ``uuid`` on Postgres, a 16-byte BLOB on SQLite.
+
+    Python values stay canonical strings, so the API and every ``str`` id
+    comparison in the code are unchanged.
+    """
+
+    impl = LargeBinary(16)
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "postgresql":
+            return dialect.type_descriptor(Uuid(as_uuid=True))
+        return dialect.type_descriptor(LargeBinary(16))
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        key = uuid_key(value)
+        return key if dialect.name == "postgresql" else key.bytes
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return str(uuid_key(value))
+
 
 class User(Base):
     __tablename__ = "users"
 
-    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = Column(CompactUUID, primary_key=True, default=new_uuid_key)
     username = Column(String, unique=True, nullable=False)
     email = Column(String, unique=True, nullable=False)
     name = Column(String, nullable=False)
@@ -19,6 +75,27 @@ class User(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     avatar_url = Column(String, nullable=True)
 
+    # Prefix search on lower(...) for the admin listing; text_pattern_ops lets Postgres
+    # serve LIKE 'prefix%' regardless of the database collation.
+    __table_args__ = (
+        Index(
+            "ix_users_username_lower",
+            func.lower(username).label("username_lower"),
+            postgresql_ops={"username_lower": "text_pattern_ops"},
+        ),
+        Index(
+            "ix_users_email_lower",
+            func.lower(email).label("email_lower"),
+            postgresql_ops={"email_lower": "text_pattern_ops"},
+        ),
+        Index(
+            "ix_users_name_lower",
+            func.lower(name).label("name_lower"),
+            postgresql_ops={"name_lower": "text_pattern_ops"},
+        ),
+        Index("ix_users_role_username", "role", "username"),
+    )
+
     # Relationships
     owned_polls = relationship("Poll", back_populates="owner")
     refresh_sessions = relationship("RefreshTokenSession", back_populates="user", cascade="all, delete-orphan")
@@ -27,7 +104,7 @@ class User(Base):
 class Poll(Base):
     __tablename__ = "polls"
     
-    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = Column(CompactUUID, primary_key=True, default=new_uuid_key)
     title = Column(String, nullable=False)
     description = Column(Text)
     deadline_iso = Column(DateTime)
@@ -35,7 +112,7 @@ class Poll(Base):
     max_selections = Column(Integer, default=1)
     is_anonymous = Column(Boolean, default=True)  # True = анонимное, False = публичное
     created_at = Column(DateTime, default=datetime.utcnow)
-    owner_user_id = Column(String, ForeignKey("users.id"), nullable=True)
+    owner_user_id = Column(CompactUUID, ForeignKey("users.id"), nullable=True)
     
     # Relationships
     owner = relationship("User", back_populates="owned_polls")
@@ -47,8 +124,8 @@ class Poll(Base):
 class PollVariant(Base):
     __tablename__ = "poll_variants"
     
-    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
-    poll_id = Column(String, ForeignKey("polls.id"), nullable=False)
+    id = Column(CompactUUID, primary_key=True, default=new_uuid_key)
+    poll_id = Column(CompactUUID, ForeignKey("polls.id"), nullable=False, index=True)
     label = Column(String, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
     
@@ -60,10 +137,10 @@ class PollVariant(Base):
 class Vote(Base):
     __tablename__ = "votes"
     
-    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
-    poll_id = Column(String, ForeignKey("polls.id"), nullable=False)
-    variant_id = Column(String, ForeignKey("poll_variants.id"), nullable=False)
-    user_id = Column(String, nullable=False)
+    id = Column(CompactUUID, primary_key=True, default=new_uuid_key)
+    poll_id = Column(CompactUUID, ForeignKey("polls.id"), nullable=False)
+    variant_id = Column(CompactUUID, ForeignKey("poll_variants.id"), nullable=False)
+    user_id = Column(CompactUUID, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
     
     # Unique constraint: one vote per user per poll
@@ -79,15 +156,26 @@ class Vote(Base):
 class RefreshTokenSession(Base):
     __tablename__ = "refresh_token_sessions"
 
-    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
-    user_id = Column(String, ForeignKey("users.id"), nullable=False, index=True)
+    id = Column(CompactUUID, primary_key=True, default=new_uuid_key)
+    user_id = Column(CompactUUID, ForeignKey("users.id"), nullable=False, index=True)
     token_hash = Column(String, nullable=False, unique=True)
     user_agent = Column(String, nullable=True)
     ip_address = Column(String, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
-    expires_at = Column(DateTime, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
     revoked_at = Column(DateTime, nullable=True)
-    replaced_by_id = Column(String, nullable=True)
+    replaced_by_id = Column(CompactUUID, nullable=True)
+
+    # Partial index keeps revoke_all_active_for_user cheap however many revoked rows pile up.
+    __table_args__ = (
+        Index(
+            "ix_refresh_token_sessions_user_active",
+            "user_id",
+            "revoked_at",
+            postgresql_where=text("revoked_at IS NULL"),
+            sqlite_where=text("revoked_at IS NULL"),
+        ),
+    )
 
     user = relationship("User", back_populates="refresh_sessions")
 
@@ -95,13 +183,22 @@ class RefreshTokenSession(Base):
 class PollAttachment(Base):
     __tablename__ = "poll_attachments"
 
-    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
-    poll_id = Column(String, ForeignKey("polls.id"), nullable=False, index=True)
-    uploader_user_id = Column(String, ForeignKey("users.id"), nullable=False, index=True)
+    id = Column(CompactUUID, primary_key=True, default=new_uuid_key)
+    poll_id = Column(CompactUUID, ForeignKey("polls.id"), nullable=False, index=True)
+    uploader_user_id = Column(CompactUUID, ForeignKey("users.id"), nullable=False, index=True)
     original_name = Column(String, nullable=False)
     content_type = Column(String, nullable=False)
     size_bytes = Column(Integer, nullable=False)
+    checksum_sha256 = Column(String(64), nullable=True)
     object_name = Column(String, nullable=False, unique=True)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
     poll = relationship("Poll", back_populates="attachments")
+
+
+class RuntimeSetting(Base):
+    __tablename__ = "runtime_settings"
+
+    key = Column(String, primary_key=True)
+    value = Column(String, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
@@ -1,6 +1,9 @@
+from typing import Optional
+
 from models import User as UserModel
-from schemas import TokenPair, User
+from schemas import TokenPair, User, UserSummary
 from services.auth_service import AuthTokens
+from services.avatar_images import DEFAULT_AVATAR_FORMAT, avatar_variant_url
 
 
 def serialize_user_model(user: UserModel) -> User:
@@ -14,6 +17,17 @@ def serialize_user_model(user: UserModel) -> User:
     )
 
 
+def serialize_user_summary(user, *, avatar_size: Optional[int] = None, avatar_format: str = DEFAULT_AVATAR_FORMAT) -> UserSummary:
+    # Accepts ORM instances as well as column-only rows with the same attribute names.
+    return UserSummary(
+        id=user.id,
+        username=user.username,
+        name=user.name,
+        role=user.role,
+        avatarUrl=avatar_variant_url(user.avatar_url, avatar_size, avatar_format),
+    )
+
+
 def serialize_tokens(tokens: AuthTokens) -> TokenPair:
     return TokenPair(
         accessToken=tokens.access_token,
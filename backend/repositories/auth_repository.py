@@ -3,6 +3,8 @@ from __future__ import annotations
 from datetime import datetime, timezone
 from typing import Optional
 
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from models import RefreshTokenSession, User
@@ -28,6 +30,14 @@ class UserRepository:
         )
 
 
+class AsyncUserRepository:
+    def __init__(self, db: AsyncSession) -> None:
+        self.db = db
+
+    async def get_by_id(self, user_id: str) -> Optional[User]:
+        return await self.db.get(User, user_id)
+
+
 class RefreshSessionRepository:
     def __init__(self, db: Session) -> None:
         self.db = db
@@ -83,3 +93,29 @@ class RefreshSessionRepository:
             .update({RefreshTokenSession.revoked_at: marker}, synchronize_session=False)
         )
         return int(updated or 0)
+
+    def delete_expired_batch(self, *, now: datetime, limit: int) -> int:
+        ids = select(RefreshTokenSession.id).where(RefreshTokenSession.expires_at < now).limit(limit)
+        return self._delete_ids(ids)
+
+    def delete_revoked_before_batch(self, *, cutoff: datetime, limit: int) -> int:
+        ids = (
+            select(RefreshTokenSession.id)
+            .where(
+                RefreshTokenSession.revoked_at.is_not(None),
+                RefreshTokenSession.revoked_at < cutoff,
+            )
+            .limit(limit)
+        )
+        return self._delete_ids(ids)
+
+    def _delete_ids(self, ids_query) -> int:
+        batch = list(self.db.execute(ids_query).scalars())
+        if not batch:
+            return 0
+        deleted = self.db.execute(
+            delete(RefreshTokenSession)
+            .where(RefreshTokenSession.id.in_(batch))
+            .execution_options(synchronize_session=False)
+        )
+        return int(deleted.rowcount or 0)
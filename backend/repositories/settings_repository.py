@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from models import RuntimeSetting
+
+
+class RuntimeSettingRepository:
+    def __init__(self, db: Session) -> None:
+        self.db = db
+
+    def get(self, key: str) -> Optional[str]:
+        setting = self.db.query(RuntimeSetting).filter(RuntimeSetting.key == key).first()
+        return setting.value if setting else None
+
+    def set(self, key: str, value: str) -> RuntimeSetting:
+        setting = self.db.query(RuntimeSetting).filter(RuntimeSetting.key == key).first()
+        if setting is None:
+            setting = RuntimeSetting(key=key, value=value)
+        else:
+            setting.value = value
+        self.db.add(setting)
+        return setting
@@ -0,0 +1,59 @@
+import time
+from typing import Any, Dict
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from authz import PERM_SYSTEM_METRICS_READ, PERM_SYSTEM_SCHEMA_MANAGE
+from database import async_pool_monitor, get_db, pool_monitor, replica_set
+from dependencies import require_permission
+from metrics import collect_metrics
+from models import User as UserModel
+from runtime import SCHEMA_VERSION, ensure_schema_ready, logger
+
+router = APIRouter(tags=["admin"])
+
+
+@router.get("/admin/metrics")
+def read_metrics(
+    current_user: UserModel = Depends(require_permission(PERM_SYSTEM_METRICS_READ)),
+) -> Dict[str, Any]:
+    _ = current_user
+    return collect_metrics()
+
+
+@router.get("/admin/db/pool")
+def read_pool_stats(
+    current_user: UserModel = Depends(require_permission(PERM_SYSTEM_METRICS_READ)),
+) -> Dict[str, Any]:
+    _ = current_user
+    return {**pool_monitor.stats(), "async": async_pool_monitor.stats()}
+
+
+@router.get("/admin/db/replicas")
+def read_replica_status(
+    current_user: UserModel = Depends(require_permission(PERM_SYSTEM_METRICS_READ)),
+) -> Dict[str, Any]:
+    _ = current_user
+    return replica_set.stats()
+
+
+@router.post("/admin/schema/recheck")
+def recheck_schema(
+    db: Session = Depends(get_db),
+    current_user: UserModel = Depends(require_permission(PERM_SYSTEM_SCHEMA_MANAGE)),
+) -> Dict[str, Any]:
+    started_at = time.perf_counter()
+    try:
+        ensure_schema_ready(db, force=True)
+    except OperationalError:
+        db.rollback()
+        logger.exception("Database unavailable during schema re-check requested by %s", current_user.id)
+        raise HTTPException(status_code=503, detail="Database unavailable")
+    logger.info("Schema re-check requested by %s completed", current_user.id)
+    return {
+        "status": "ok",
+        "schemaVersion": SCHEMA_VERSION,
+        "durationMs": round((time.perf_counter() - started_at) * 1000.0, 3),
+    }
@@ -1,16 +1,25 @@
 from typing import Optional
 
-from fastapi import APIRouter, Depends, Header, HTTPException, Request
+from fastapi import APIRouter, BackgroundTasks, Depends, Header, HTTPException, Request
 from sqlalchemy.exc import IntegrityError, OperationalError
 from sqlalchemy.orm import Session
 
 from database import get_db
-from dependencies import get_auth_service, get_current_user
+from dependencies import get_auth_service, get_current_user_async, login_throttle
 from models import User as UserModel
 from presenters import serialize_tokens, serialize_user_model
-from runtime import ADMIN_SECRET, ensure_runtime_schema, hash_password, logger
+from runtime import (
+    ADMIN_SECRET,
+    ensure_schema_ready,
+    hash_password,
+    logger,
+    password_needs_rehash,
+    rehash_user_password,
+)
 from schemas import AuthResponse, LoginRequest, LogoutRequest, RefreshRequest, RegisterRequest, User
 from services.auth_service import AuthError, AuthService
+from services.login_throttle import LoginThrottledError
+from services.password_service import PasswordHashingBusyError
 
 router = APIRouter(tags=["auth"])
 
@@ -24,7 +33,7 @@ def request_client_ip(request: Request) -> Optional[str]:
 @router.post("/auth/register", response_model=User, status_code=201)
 def register(body: RegisterRequest, db: Session = Depends(get_db), x_admin_token: Optional[str] = Header(default=None)):
     try:
-        ensure_runtime_schema(db)
+        ensure_schema_ready(db)
         # pre-check for clarity
         if db.query(UserModel).filter((UserModel.email == body.email) | (UserModel.username == body.username)).first():
             raise HTTPException(status_code=409, detail="User with this email or username already exists")
@@ -59,6 +68,9 @@ def register(body: RegisterRequest, db: Session = Depends(get_db), x_admin_token
         raise HTTPException(status_code=503, detail="Database unavailable")
     except HTTPException:
         raise
+    except PasswordHashingBusyError:
+        db.rollback()
+        raise
     except Exception:
         db.rollback()
         logger.exception("Unexpected error during registration for %s", body.email)
@@ -69,23 +81,45 @@ def register(body: RegisterRequest, db: Session = Depends(get_db), x_admin_token
 def login(
     body: LoginRequest,
     request: Request,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     auth_service: AuthService = Depends(get_auth_service),
 ):
+    identifier = body.username.strip()
+    client_ip = request_client_ip(request)
     try:
-        ensure_runtime_schema(db, include_vote_constraints=True)
-        user = auth_service.authenticate(body.username.strip(), body.password)
+        # Throttled attempts are rejected here, before any password hashing happens.
+        login_throttle.check(client_ip, identifier)
+        ensure_schema_ready(db)
+        try:
+            user = auth_service.authenticate(identifier, body.password)
+        except AuthError:
+            login_throttle.record_failure(client_ip, identifier)
+            raise
+        login_throttle.record_success(client_ip, identifier)
         tokens = auth_service.issue_tokens(
             user=user,
             user_agent=request.headers.get("user-agent"),
-            ip_address=request_client_ip(request),
+            ip_address=client_ip,
             revoke_existing=True,
         )
         logger.info("User %s logged in with refresh-session rotation", user.id)
+        if password_needs_rehash(user.password_hash):
+            background_tasks.add_task(rehash_user_password, user.id, body.password, user.password_hash)
         return AuthResponse(user=serialize_user_model(user), tokens=serialize_tokens(tokens))
+    except LoginThrottledError as exc:
+        logger.warning("Throttled login attempt for %s from %s", identifier, client_ip)
+        raise HTTPException(
+            status_code=exc.status_code,
+            detail=exc.detail,
+            headers={"Retry-After": str(exc.retry_after_seconds)},
+        ) from exc
     except AuthError as exc:
         db.rollback()
         raise HTTPException(status_code=exc.status_code, detail=exc.detail) from exc
+    except PasswordHashingBusyError:
+        db.rollback()
+        raise
     except OperationalError:
         db.rollback()
         logger.exception("Database unavailable during login for %s", body.username)
@@ -127,5 +161,5 @@ def logout(
 
 
 @router.get("/auth/me", response_model=User)
-def auth_me(current_user: UserModel = Depends(get_current_user)):
+async def auth_me(current_user: UserModel = Depends(get_current_user_async)):
     return serialize_user_model(current_user)
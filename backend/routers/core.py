@@ -55,11 +55,9 @@ def health():
         checks["database"] = "error"
         status_code = 503
 
-    if runtime.MINIO_CLIENT:
+    if runtime.object_storage.configured:
         try:
-            checks["objectStorage"] = (
-                "ok" if runtime.MINIO_CLIENT.bucket_exists(runtime.MINIO_BUCKET) else "error"
-            )
+            checks["objectStorage"] = "ok" if runtime.object_storage.bucket_exists() else "error"
             if checks["objectStorage"] == "error":
                 status_code = 503
         except Exception:
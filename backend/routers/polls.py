@@ -1,16 +1,19 @@
 import csv
+import hashlib
 import io
+import re
 import uuid
 from collections import defaultdict
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, List, Literal, Optional
+from typing import Dict, Iterator, List, Literal, Optional, Tuple
 
-from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Depends, File, Header, HTTPException, Query, UploadFile
+from fastapi.responses import Response, StreamingResponse
 from minio.error import S3Error
-from sqlalchemy import asc, desc, func, or_
-from sqlalchemy.orm import Session
+from sqlalchemy import asc, delete, desc, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
 from starlette.background import BackgroundTask
 
 from authz import (
@@ -20,13 +23,14 @@ from authz import (
     can_manage_poll,
     user_has_permission,
 )
-from database import get_db
-from dependencies import get_current_user, require_permission
+from database import get_async_db, get_db
+from dependencies import get_current_user, require_permission, require_permission_async
 from models import Poll as PollModel
 from models import PollAttachment as PollAttachmentModel
 from models import PollVariant, User as UserModel
 from models import Vote as VoteModel
-from runtime import MINIO_BUCKET, MINIO_CLIENT, logger
+from models import uuid_key
+from runtime import MINIO_PRESIGN_CLIENT, PRESIGN_SETTINGS, logger, object_storage
 from schemas import (
     Poll,
     PollAttachment,
@@ -34,11 +38,19 @@ from schemas import (
     PollCreate,
     PollListResponse,
     PollUpdate,
+    PresignedDownload,
+    PresignedUpload,
+    PresignedUploadConfirm,
+    PresignedUploadRequest,
     PublicVoter,
     ResultItem,
     VoteRequest,
     VoteResult,
 )
+from services.avatar_images import AVATAR_SIZES, DEFAULT_AVATAR_FORMAT, avatar_variant_url
+from services.byte_ranges import RangeNotSatisfiable, http_date, if_range_matches, parse_range_header
+from services.object_upload import EmptyUploadError, UploadTooLargeError
+from services.presigned_storage import UPLOAD_STAGING_PREFIX, UploadChangedError, presign_download, presign_upload
 
 router = APIRouter(tags=["polls"])
 
@@ -56,6 +68,9 @@ ATTACHMENT_ALLOWED_CONTENT_TYPES = {
     "text/plain",
 }
 MIN_SORT_DATETIME = datetime(1970, 1, 1)
+_PRESIGNED_ATTACHMENT_NAME = re.compile(
+    re.escape(UPLOAD_STAGING_PREFIX) + r"attachments/(?P<poll_id>[^/]+)/[0-9a-f]{32}-(?P<name>[^/]+)"
+)
 
 
 def _sanitize_filename(name: Optional[str]) -> str:
@@ -68,6 +83,12 @@ def _poll_attachment_download_url(poll_id: str, attachment_id: str) -> str:
     return f"/polls/{poll_id}/attachments/{attachment_id}/download"
 
 
+def _attachment_etag(attachment: PollAttachmentModel) -> str:
+    # Object names are never reused, so they are a strong validator for rows
+    # uploaded before checksums were recorded.
+    return f'"{attachment.checksum_sha256 or hashlib.sha256(attachment.object_name.encode()).hexdigest()}"'
+
+
 def _close_minio_response(response) -> None:
     try:
         response.close()
@@ -79,6 +100,18 @@ def _close_minio_response(response) -> None:
         pass
 
 
+def _stream_byteranges(object_name: str, parts: List[Tuple[bytes, int, int]], closing: bytes) -> Iterator[bytes]:
+    """Body of a multipart/byteranges response; each part is fetched only when reached."""
+    for head, first, last in parts:
+        yield head
+        object_response = object_storage.get(object_name, offset=first, length=last - first + 1)
+        try:
+            yield from object_response.stream(32 * 1024)
+        finally:
+            _close_minio_response(object_response)
+    yield closing
+
+
 def _serialize_attachment(attachment: PollAttachmentModel) -> PollAttachment:
     return PollAttachment(
         id=attachment.id,
@@ -86,14 +119,23 @@ def _serialize_attachment(attachment: PollAttachmentModel) -> PollAttachment:
         originalName=attachment.original_name,
         contentType=attachment.content_type,
         sizeBytes=attachment.size_bytes,
+        checksumSha256=attachment.checksum_sha256,
         uploaderUserId=attachment.uploader_user_id,
         createdAt=attachment.created_at.isoformat(),
         downloadUrl=_poll_attachment_download_url(attachment.poll_id, attachment.id),
     )
 
 
+async def _load_poll(db: AsyncSession, poll_id: str) -> Optional[PollModel]:
+    # Variants are loaded eagerly: an AsyncSession cannot lazy-load them on access.
+    result = await db.execute(
+        select(PollModel).options(selectinload(PollModel.variants)).where(PollModel.id == poll_id)
+    )
+    return result.scalar_one_or_none()
+
+
 @router.get("/polls", response_model=PollListResponse)
-def list_polls(
+async def list_polls(
     status: Literal["all", "active", "completed", "upcoming"] = Query("all"),
     search: Optional[str] = Query(default=None, min_length=1, max_length=120),
     is_anonymous: Optional[bool] = Query(default=None, alias="isAnonymous"),
@@ -102,7 +144,7 @@ def list_polls(
     sort_order: str = Query(default="asc", alias="sortOrder"),
     page: int = Query(1, ge=1),
     limit: int = Query(POLL_DEFAULT_LIMIT, ge=1, le=POLL_MAX_LIMIT),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     if sort_by not in POLL_ALLOWED_SORT_BY:
         raise HTTPException(status_code=400, detail=f"Unsupported sortBy, allowed: {sorted(POLL_ALLOWED_SORT_BY)}")
@@ -111,32 +153,32 @@ def list_polls(
 
     offset = (page - 1) * limit
     now = datetime.now(timezone.utc)
-    base_query = db.query(PollModel)
+    base_query = select(PollModel)
     if status == "active":
-        base_query = base_query.filter(
+        base_query = base_query.where(
             PollModel.deadline_iso.isnot(None),
             PollModel.deadline_iso > now,
         )
     elif status == "completed":
-        base_query = base_query.filter(
+        base_query = base_query.where(
             PollModel.deadline_iso.isnot(None),
             PollModel.deadline_iso <= now,
         )
     elif status == "upcoming":
-        base_query = base_query.filter(PollModel.deadline_iso.is_(None))
+        base_query = base_query.where(PollModel.deadline_iso.is_(None))
 
     if search and search.strip():
         pattern = f"%{search.strip().lower()}%"
-        base_query = base_query.filter(
+        base_query = base_query.where(
             or_(
                 func.lower(PollModel.title).like(pattern),
                 func.lower(func.coalesce(PollModel.description, "")).like(pattern),
             )
         )
     if is_anonymous is not None:
-        base_query = base_query.filter(PollModel.is_anonymous == is_anonymous)
+        base_query = base_query.where(PollModel.is_anonymous == is_anonymous)
     if owner_user_id:
-        base_query = base_query.filter(PollModel.owner_user_id == owner_user_id)
+        base_query = base_query.where(PollModel.owner_user_id == owner_user_id)
 
     if sort_by == "title":
         order_expr = func.lower(PollModel.title)
@@ -149,14 +191,17 @@ def list_polls(
             order_expr = func.coalesce(PollModel.deadline_iso, MIN_SORT_DATETIME)
     order_clause = asc(order_expr) if sort_order == "asc" else desc(order_expr)
 
-    total = base_query.count()
+    total = await db.scalar(select(func.count()).select_from(base_query.subquery()))
     polls = (
-        base_query
-        .order_by(order_clause)
-        .offset(offset)
-        .limit(limit)
-        .all()
-    )
+        await db.scalars(
+            base_query
+            # One IN query for the whole page instead of a lazy load per poll.
+            .options(selectinload(PollModel.variants))
+            .order_by(order_clause)
+            .offset(offset)
+            .limit(limit)
+        )
+    ).all()
 
     payload = []
     for poll in polls:
@@ -191,7 +236,7 @@ def create_poll(
     owner_user_id = current_user.id
     # Only users with explicit permission can assign owner other than themselves.
     if body.ownerUserId:
-        if body.ownerUserId != current_user.id and not user_has_permission(current_user, PERM_POLLS_ASSIGN_OWNER):
+        if str(uuid_key(body.ownerUserId)) != current_user.id and not user_has_permission(current_user, PERM_POLLS_ASSIGN_OWNER):
             raise HTTPException(status_code=403, detail="Forbidden")
         owner = db.query(UserModel).filter(UserModel.id == body.ownerUserId).first()
         if not owner:
@@ -325,8 +370,8 @@ def update_poll(
 
 
 @router.get("/polls/{poll_id}", response_model=Poll)
-def get_poll(poll_id: str, db: Session = Depends(get_db)):
-    poll = db.query(PollModel).filter(PollModel.id == poll_id).first()
+async def get_poll(poll_id: str, db: AsyncSession = Depends(get_async_db)):
+    poll = await _load_poll(db, poll_id)
     if not poll:
         raise HTTPException(status_code=404, detail="Poll not found")
 
@@ -344,13 +389,13 @@ def get_poll(poll_id: str, db: Session = Depends(get_db)):
 
 
 @router.post("/polls/{poll_id}/vote")
-def vote(
+async def vote(
     poll_id: str,
     body: VoteRequest,
-    db: Session = Depends(get_db),
-    current_user: UserModel = Depends(require_permission(PERM_POLLS_VOTE)),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserModel = Depends(require_permission_async(PERM_POLLS_VOTE)),
 ):
-    poll = db.query(PollModel).filter(PollModel.id == poll_id).first()
+    poll = await _load_poll(db, poll_id)
     if not poll:
         raise HTTPException(status_code=404, detail="Poll not found")
     if not body.choices:
@@ -363,17 +408,19 @@ def vote(
         if current_utc > deadline_dt:
             raise HTTPException(status_code=403, detail="Poll is closed")
 
-    if body.userId and body.userId != current_user.id:
+    if body.userId and str(uuid_key(body.userId)) != current_user.id:
         raise HTTPException(status_code=403, detail="Cannot vote on behalf of another user")
 
-    # Get variant IDs for this poll
+    # Get variant IDs for this poll; choices are canonicalized like the stored keys
+    # so legacy and uppercase ids still match.
     variant_ids = {v.id for v in poll.variants}
-    invalid = [c for c in body.choices if c not in variant_ids]
+    choices = [str(uuid_key(c)) for c in body.choices]
+    invalid = [raw for raw, c in zip(body.choices, choices) if c not in variant_ids]
     if invalid:
         raise HTTPException(status_code=400, detail=f"invalid choices: {invalid}")
 
     # Ensure unique choices
-    unique_choices = list(dict.fromkeys(body.choices))
+    unique_choices = list(dict.fromkeys(choices))
 
     if poll.type == "single" and len(unique_choices) != 1:
         raise HTTPException(status_code=400, detail="single poll requires exactly one choice")
@@ -381,10 +428,12 @@ def vote(
         raise HTTPException(status_code=400, detail=f"too many choices, max {poll.max_selections}")
 
     # Delete existing votes for this user in this poll
-    db.query(VoteModel).filter(
-        VoteModel.poll_id == poll_id,
-        VoteModel.user_id == current_user.id
-    ).delete()
+    await db.execute(
+        delete(VoteModel).where(
+            VoteModel.poll_id == poll_id,
+            VoteModel.user_id == current_user.id
+        )
+    )
 
     # Create new votes
     for choice_id in unique_choices:
@@ -395,30 +444,38 @@ def vote(
         )
         db.add(vote)
 
-    db.commit()
+    await db.commit()
     return {"status": "ok"}
 
 
 @router.get("/polls/{poll_id}/results", response_model=VoteResult)
-def get_results(
+async def get_results(
     poll_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     format: Optional[str] = Query(default=None),
+    avatar_size: Optional[int] = Query(default=None, alias="avatarSize"),
+    avatar_format: Literal["jpeg", "webp"] = Query(default=DEFAULT_AVATAR_FORMAT, alias="avatarFormat"),
 ):
-    poll = db.query(PollModel).filter(PollModel.id == poll_id).first()
+    if avatar_size is not None and avatar_size not in AVATAR_SIZES:
+        raise HTTPException(status_code=400, detail=f"avatarSize must be one of {', '.join(map(str, AVATAR_SIZES))}")
+    poll = await _load_poll(db, poll_id)
     if not poll:
         raise HTTPException(status_code=404, detail="Poll not found")
 
     # Count votes for each variant
-    vote_counts = db.query(
-        VoteModel.variant_id,
-        func.count(VoteModel.id).label('count')
-    ).filter(VoteModel.poll_id == poll_id).group_by(VoteModel.variant_id).all()
+    vote_counts = (
+        await db.execute(
+            select(
+                VoteModel.variant_id,
+                func.count(VoteModel.id).label('count')
+            ).where(VoteModel.poll_id == poll_id).group_by(VoteModel.variant_id)
+        )
+    ).all()
 
     # Count unique voters
-    unique_voters = db.query(func.count(func.distinct(VoteModel.user_id))).filter(
-        VoteModel.poll_id == poll_id
-    ).scalar() or 0
+    unique_voters = await db.scalar(
+        select(func.count(func.distinct(VoteModel.user_id))).where(VoteModel.poll_id == poll_id)
+    ) or 0
 
     counts = {variant_id: count for variant_id, count in vote_counts}
     total = sum(counts.values())
@@ -426,24 +483,25 @@ def get_results(
     voter_map: Dict[str, List[PublicVoter]] = defaultdict(list)
     if not poll.is_anonymous:
         vote_details = (
-            db.query(
-                VoteModel.variant_id,
-                UserModel.id,
-                UserModel.username,
-                UserModel.name,
-                UserModel.avatar_url,
+            await db.execute(
+                select(
+                    VoteModel.variant_id,
+                    UserModel.id,
+                    UserModel.username,
+                    UserModel.name,
+                    UserModel.avatar_url,
+                )
+                .join(UserModel, UserModel.id == VoteModel.user_id)
+                .where(VoteModel.poll_id == poll_id)
             )
-            .join(UserModel, UserModel.id == VoteModel.user_id)
-            .filter(VoteModel.poll_id == poll_id)
-            .all()
-        )
+        ).all()
         for variant_id, user_id, username, name, avatar in vote_details:
             voter_map[variant_id].append(
                 PublicVoter(
                     id=user_id,
                     username=name or username,
                     name=name,
-                    avatarUrl=avatar,
+                    avatarUrl=avatar_variant_url(avatar, avatar_size, avatar_format),
                 )
             )
 
@@ -513,10 +571,10 @@ def delete_poll(
         .filter(PollAttachmentModel.poll_id == poll_id)
         .all()
     )
-    if attachments and MINIO_CLIENT:
+    if attachments and object_storage.configured:
         for attachment in attachments:
             try:
-                MINIO_CLIENT.remove_object(MINIO_BUCKET, attachment.object_name)
+                object_storage.remove(attachment.object_name)
             except S3Error:
                 logger.exception("Failed to remove attachment object %s while deleting poll", attachment.object_name)
                 raise HTTPException(status_code=502, detail="Failed to remove attached files")
@@ -537,7 +595,7 @@ def list_poll_attachments(
     poll = db.query(PollModel).filter(PollModel.id == poll_id).first()
     if not poll:
         raise HTTPException(status_code=404, detail="Poll not found")
-    if not MINIO_CLIENT:
+    if not object_storage.configured:
         raise HTTPException(status_code=503, detail="File storage is not configured")
 
     attachments = (
@@ -561,30 +619,27 @@ async def upload_poll_attachment(
         raise HTTPException(status_code=404, detail="Poll not found")
     if not can_manage_poll(current_user, poll):
         raise HTTPException(status_code=403, detail="Forbidden")
-    if not MINIO_CLIENT:
+    if not object_storage.configured:
         raise HTTPException(status_code=503, detail="File storage is not configured")
     if file.content_type not in ATTACHMENT_ALLOWED_CONTENT_TYPES:
         raise HTTPException(status_code=400, detail="Unsupported file type")
 
-    payload = await file.read()
-    if not payload:
-        raise HTTPException(status_code=400, detail="Empty file")
-    if len(payload) > ATTACHMENT_MAX_SIZE_BYTES:
-        raise HTTPException(
-            status_code=400,
-            detail=f"File is too large. Max size is {ATTACHMENT_MAX_SIZE_BYTES // (1024 * 1024)} MB",
-        )
-
     safe_name = _sanitize_filename(file.filename)
     object_name = f"attachments/{poll_id}/{uuid.uuid4().hex}-{safe_name}"
     try:
-        MINIO_CLIENT.put_object(
-            MINIO_BUCKET,
+        stored = await object_storage.aput_stream(
             object_name,
-            io.BytesIO(payload),
-            length=len(payload),
+            file.file,
+            max_size=ATTACHMENT_MAX_SIZE_BYTES,
             content_type=file.content_type,
         )
+    except EmptyUploadError:
+        raise HTTPException(status_code=400, detail="Empty file")
+    except UploadTooLargeError:
+        raise HTTPException(
+            status_code=400,
+            detail=f"File is too large. Max size is {ATTACHMENT_MAX_SIZE_BYTES // (1024 * 1024)} MB",
+        )
     except S3Error:
         logger.exception("Failed to upload poll attachment for poll %s", poll_id)
         raise HTTPException(status_code=502, detail="Failed to store file")
@@ -594,7 +649,115 @@ async def upload_poll_attachment(
         uploader_user_id=current_user.id,
         original_name=safe_name,
         content_type=file.content_type,
-        size_bytes=len(payload),
+        size_bytes=stored.size,
+        checksum_sha256=stored.sha256,
+        object_name=object_name,
+    )
+    db.add(attachment)
+    db.commit()
+    db.refresh(attachment)
+    return _serialize_attachment(attachment)
+
+
+@router.post("/polls/{poll_id}/attachments/presign", response_model=PresignedUpload)
+def presign_poll_attachment_upload(
+    poll_id: str,
+    body: PresignedUploadRequest,
+    db: Session = Depends(get_db),
+    current_user: UserModel = Depends(get_current_user),
+):
+    if not PRESIGN_SETTINGS.enabled:
+        raise HTTPException(status_code=404, detail="Presigned URLs are not enabled")
+    poll = db.query(PollModel).filter(PollModel.id == poll_id).first()
+    if not poll:
+        raise HTTPException(status_code=404, detail="Poll not found")
+    if not can_manage_poll(current_user, poll):
+        raise HTTPException(status_code=403, detail="Forbidden")
+    if not MINIO_PRESIGN_CLIENT:
+        raise HTTPException(status_code=503, detail="File storage is not configured")
+    if body.contentType not in ATTACHMENT_ALLOWED_CONTENT_TYPES:
+        raise HTTPException(status_code=400, detail="Unsupported file type")
+    if body.sizeBytes > ATTACHMENT_MAX_SIZE_BYTES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"File is too large. Max size is {ATTACHMENT_MAX_SIZE_BYTES // (1024 * 1024)} MB",
+        )
+
+    object_name = f"{UPLOAD_STAGING_PREFIX}attachments/{poll_id}/{uuid.uuid4().hex}-{_sanitize_filename(body.fileName)}"
+    url, expires_at = presign_upload(MINIO_PRESIGN_CLIENT, object_storage.bucket, object_name, PRESIGN_SETTINGS)
+    return PresignedUpload(
+        uploadUrl=url,
+        headers={"Content-Type": body.contentType},
+        objectName=object_name,
+        expiresAt=expires_at.isoformat(),
+    )
+
+
+@router.post("/polls/{poll_id}/attachments/confirm", response_model=PollAttachment, status_code=201)
+def confirm_poll_attachment_upload(
+    poll_id: str,
+    body: PresignedUploadConfirm,
+    db: Session = Depends(get_db),
+    current_user: UserModel = Depends(get_current_user),
+):
+    if not PRESIGN_SETTINGS.enabled:
+        raise HTTPException(status_code=404, detail="Presigned URLs are not enabled")
+    poll = db.query(PollModel).filter(PollModel.id == poll_id).first()
+    if not poll:
+        raise HTTPException(status_code=404, detail="Poll not found")
+    if not can_manage_poll(current_user, poll):
+        raise HTTPException(status_code=403, detail="Forbidden")
+    if not object_storage.configured:
+        raise HTTPException(status_code=503, detail="File storage is not configured")
+    # Only names handed out by the presign endpoint for this poll are accepted.
+    match = _PRESIGNED_ATTACHMENT_NAME.fullmatch(body.objectName)
+    if not match or match.group("poll_id") != poll_id:
+        raise HTTPException(status_code=400, detail="Invalid object name")
+
+    try:
+        uploaded = object_storage.stat(body.objectName)
+    except S3Error:
+        logger.exception("Failed to inspect uploaded attachment %s", body.objectName)
+        raise HTTPException(status_code=502, detail="Failed to read file")
+    if uploaded is None:
+        raise HTTPException(status_code=404, detail="Uploaded file not found")
+    # A presigned PUT cannot bound the body or pin its type, so both are checked
+    # here and a rejected object is removed again.
+    rejection = None
+    if uploaded.size == 0:
+        rejection = "Empty file"
+    elif uploaded.size > ATTACHMENT_MAX_SIZE_BYTES:
+        rejection = f"File is too large. Max size is {ATTACHMENT_MAX_SIZE_BYTES // (1024 * 1024)} MB"
+    elif uploaded.content_type not in ATTACHMENT_ALLOWED_CONTENT_TYPES:
+        rejection = "Unsupported file type"
+    if rejection:
+        try:
+            object_storage.remove(body.objectName)
+        except S3Error:
+            logger.warning("Failed to remove rejected attachment object %s", body.objectName)
+        raise HTTPException(status_code=400, detail=rejection)
+
+    # The PUT URL stays valid until it expires, so the checked object is copied
+    # (pinned to the ETag that was checked) to a name no URL was signed for.
+    object_name = f"attachments/{poll_id}/{uuid.uuid4().hex}-{match.group('name')}"
+    try:
+        object_storage.copy(body.objectName, object_name, match_etag=uploaded.etag)
+    except UploadChangedError:
+        raise HTTPException(status_code=409, detail="Uploaded file changed, upload it again")
+    except S3Error:
+        logger.exception("Failed to copy uploaded attachment %s", body.objectName)
+        raise HTTPException(status_code=502, detail="Failed to store file")
+    try:
+        object_storage.remove(body.objectName)
+    except S3Error:
+        logger.warning("Failed to remove staged attachment object %s", body.objectName)
+
+    attachment = PollAttachmentModel(
+        poll_id=poll_id,
+        uploader_user_id=current_user.id,
+        original_name=match.group("name"),
+        content_type=uploaded.content_type,
+        size_bytes=uploaded.size,
         object_name=object_name,
     )
     db.add(attachment)
@@ -615,7 +778,7 @@ def delete_poll_attachment(
         raise HTTPException(status_code=404, detail="Poll not found")
     if not can_manage_poll(current_user, poll):
         raise HTTPException(status_code=403, detail="Forbidden")
-    if not MINIO_CLIENT:
+    if not object_storage.configured:
         raise HTTPException(status_code=503, detail="File storage is not configured")
 
     attachment = (
@@ -627,7 +790,7 @@ def delete_poll_attachment(
         raise HTTPException(status_code=404, detail="Attachment not found")
 
     try:
-        MINIO_CLIENT.remove_object(MINIO_BUCKET, attachment.object_name)
+        object_storage.remove(attachment.object_name)
     except S3Error:
         logger.exception("Failed to remove attachment object %s", attachment.object_name)
         raise HTTPException(status_code=502, detail="Failed to remove file")
@@ -641,11 +804,13 @@ def delete_poll_attachment(
 def download_poll_attachment(
     poll_id: str,
     attachment_id: str,
+    range_header: Optional[str] = Header(default=None, alias="Range"),
+    if_range: Optional[str] = Header(default=None, alias="If-Range"),
     db: Session = Depends(get_db),
     current_user: UserModel = Depends(get_current_user),
 ):
     _ = current_user
-    if not MINIO_CLIENT:
+    if not object_storage.configured:
         raise HTTPException(status_code=503, detail="File storage is not configured")
 
     attachment = (
@@ -656,18 +821,98 @@ def download_poll_attachment(
     if not attachment:
         raise HTTPException(status_code=404, detail="Attachment not found")
 
+    size = attachment.size_bytes
+    ascii_filename = attachment.original_name.encode("ascii", "ignore").decode() or "attachment"
+    headers = {
+        "Content-Disposition": f'attachment; filename="{ascii_filename}"',
+        "Accept-Ranges": "bytes",
+        "ETag": _attachment_etag(attachment),
+        "Last-Modified": http_date(attachment.created_at),
+    }
+    ranges = None
+    if if_range_matches(if_range, headers["ETag"], attachment.created_at):
+        try:
+            ranges = parse_range_header(range_header, size)
+        except RangeNotSatisfiable:
+            return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{size}"})
+
+    if ranges and len(ranges) > 1:
+        boundary = uuid.uuid4().hex
+        parts = [
+            (
+                (
+                    f"\r\n--{boundary}\r\n"
+                    f"Content-Type: {attachment.content_type}\r\n"
+                    f"Content-Range: bytes {first}-{last}/{size}\r\n\r\n"
+                ).encode("ascii"),
+                first,
+                last,
+            )
+            for first, last in ranges
+        ]
+        closing = f"\r\n--{boundary}--\r\n".encode("ascii")
+        length = sum(len(head) + last - first + 1 for head, first, last in parts) + len(closing)
+        return StreamingResponse(
+            _stream_byteranges(attachment.object_name, parts, closing),
+            status_code=206,
+            media_type=f"multipart/byteranges; boundary={boundary}",
+            headers={**headers, "Content-Length": str(length)},
+        )
+
     try:
-        object_response = MINIO_CLIENT.get_object(MINIO_BUCKET, attachment.object_name)
+        if ranges:
+            [(first, last)] = ranges
+            object_response = object_storage.get(attachment.object_name, offset=first, length=last - first + 1)
+        else:
+            object_response = object_storage.get(attachment.object_name)
     except S3Error:
         logger.exception("Failed to download attachment object %s", attachment.object_name)
         raise HTTPException(status_code=502, detail="Failed to read file")
 
-    ascii_filename = attachment.original_name.encode("ascii", "ignore").decode() or "attachment"
+    if ranges:
+        headers["Content-Range"] = f"bytes {first}-{last}/{size}"
+        headers["Content-Length"] = str(last - first + 1)
+    else:
+        headers["Content-Length"] = str(size)
     return StreamingResponse(
         object_response.stream(32 * 1024),
+        status_code=206 if ranges else 200,
         media_type=attachment.content_type,
-        headers={
-            "Content-Disposition": f'attachment; filename="{ascii_filename}"',
-        },
+        headers=headers,
         background=BackgroundTask(_close_minio_response, object_response),
     )
+
+
+@router.get("/polls/{poll_id}/attachments/{attachment_id}/presigned-download", response_model=PresignedDownload)
+def presign_poll_attachment_download(
+    poll_id: str,
+    attachment_id: str,
+    db: Session = Depends(get_db),
+    current_user: UserModel = Depends(get_current_user),
+):
+    _ = current_user
+    if not PRESIGN_SETTINGS.enabled:
+        raise HTTPException(status_code=404, detail="Presigned URLs are not enabled")
+    if not MINIO_PRESIGN_CLIENT:
+        raise HTTPException(status_code=503, detail="File storage is not configured")
+
+    attachment = (
+        db.query(PollAttachmentModel)
+        .filter(PollAttachmentModel.id == attachment_id, PollAttachmentModel.poll_id == poll_id)
+        .first()
+    )
+    if not attachment:
+        raise HTTPException(status_code=404, detail="Attachment not found")
+
+    ascii_filename = attachment.original_name.encode("ascii", "ignore").decode() or "attachment"
+    url, expires_at = presign_download(
+        MINIO_PRESIGN_CLIENT,
+        object_storage.bucket,
+        attachment.object_name,
+        PRESIGN_SETTINGS,
+        response_headers={
+            "response-content-type": attachment.content_type,
+            "response-content-disposition": f'attachment; filename="{ascii_filename}"',
+        },
+    )
+    return PresignedDownload(url=url, expiresAt=expires_at.isoformat())
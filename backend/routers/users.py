@@ -1,10 +1,19 @@
+import base64
+import binascii
+import csv
 import io
+import asyncio
+import json
+import re
 import uuid
 
-from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile
+from fastapi.responses import StreamingResponse
 from minio.error import S3Error
+from sqlalchemy import and_, func, or_, select
 from sqlalchemy.orm import Session
-from typing import List
+from starlette.concurrency import run_in_threadpool
+from typing import Iterator, List, Literal, Optional
 
 from authz import (
     PERM_PROFILE_AVATAR_UPDATE,
@@ -15,15 +24,92 @@ from authz import (
     PERM_USERS_ROLE_MANAGE,
     user_has_permission,
 )
-from database import get_db
+from database import SessionLocal, get_db
 from dependencies import get_current_user, require_permission
 from models import User as UserModel
-from presenters import serialize_user_model
-from runtime import MINIO_BUCKET, MINIO_CLIENT, MINIO_PUBLIC_URL, hash_password, logger, remove_existing_avatar_resource
-from schemas import RoleUpdateRequest, User, UserCreate, UserUpdate
+from models import uuid_key
+from presenters import serialize_user_model, serialize_user_summary
+from runtime import (
+    MINIO_PRESIGN_CLIENT,
+    MINIO_PUBLIC_URL,
+    PRESIGN_SETTINGS,
+    hash_password,
+    logger,
+    object_storage,
+    remove_existing_avatar_resource,
+)
+from schemas import (
+    PresignedUpload,
+    PresignedUploadConfirm,
+    PresignedUploadRequest,
+    RoleUpdateRequest,
+    User,
+    UserBatchResponse,
+    UserCreate,
+    UserListResponse,
+    UserUpdate,
+)
+from services.avatar_images import (
+    AVATAR_SIZES,
+    DEFAULT_AVATAR_FORMAT,
+    VARIANT_CACHE_CONTROL,
+    AvatarImageError,
+    render_avatar_variants,
+)
+from services.object_upload import EmptyUploadError, MeteredUploadStream, UploadTooLargeError
+from services.presigned_storage import UPLOAD_STAGING_PREFIX, presign_upload
 
 router = APIRouter(tags=["users"])
 
+USER_DEFAULT_LIMIT = 50
+USER_MAX_LIMIT = 200
+USER_EXPORT_BATCH_SIZE = 500
+USER_EXPORT_COLUMNS = ("id", "username", "email", "name", "role", "created_at")
+USER_BATCH_MAX_IDS = 200
+AVATAR_MAX_SIZE_BYTES = 5 * 1024 * 1024
+AVATAR_ALLOWED_CONTENT_TYPES = {"image/png", "image/jpeg", "image/jpg"}
+_PRESIGNED_AVATAR_NAME = re.compile(re.escape(UPLOAD_STAGING_PREFIX) + r"avatars/(?P<user_id>[^/]+)/[0-9a-f]{32}\.(?:png|jpg)")
+USER_SUMMARY_COLUMNS = (UserModel.id, UserModel.username, UserModel.name, UserModel.role, UserModel.avatar_url)
+
+
+def _encode_user_cursor(username: str) -> str:
+    return base64.urlsafe_b64encode(username.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _decode_user_cursor(cursor: str) -> str:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        return base64.b64decode(padded.encode("ascii"), altchars=b"-_", validate=True).decode("utf-8")
+    except (binascii.Error, UnicodeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _prefix_match(column, prefix: str, dialect_name: str):
+    lowered = func.lower(column)
+    if dialect_name == "postgresql":
+        escaped = prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        return lowered.like(f"{escaped}%", escape="\\")
+    # SQLite cannot use an expression index for LIKE, but it can for a range scan.
+    # Note that SQLite's lower() only folds ASCII letters.
+    return and_(lowered >= prefix, lowered < prefix + "\U0010ffff")
+
+
+def _user_filters(db: Session, search: Optional[str], role: Optional[str]) -> list:
+    filters = []
+    if search and search.strip():
+        prefix = search.strip().lower()
+        dialect_name = db.get_bind().dialect.name
+        filters.append(
+            or_(
+                _prefix_match(UserModel.username, prefix, dialect_name),
+                _prefix_match(UserModel.email, prefix, dialect_name),
+                _prefix_match(UserModel.name, prefix, dialect_name),
+            )
+        )
+    if role:
+        filters.append(UserModel.role == role)
+    return filters
+
 
 @router.post("/users", response_model=User, status_code=201)
 def create_user(
@@ -44,14 +130,123 @@ def create_user(
     return serialize_user_model(user)
 
 
-@router.get("/users", response_model=List[User])
+@router.get("/users", response_model=UserListResponse)
 def list_users(
+    search: Optional[str] = Query(default=None, min_length=1, max_length=120),
+    role: Optional[Literal["admin", "user"]] = Query(default=None),
+    cursor: Optional[str] = Query(default=None, max_length=512),
+    limit: int = Query(USER_DEFAULT_LIMIT, ge=1, le=USER_MAX_LIMIT),
     db: Session = Depends(get_db),
     current_user: UserModel = Depends(require_permission(PERM_USERS_READ_ALL)),
 ):
     _ = current_user
-    users = db.query(UserModel).all()
-    return [serialize_user_model(u) for u in users]
+    # Keyset pagination on the unique username: every page is an index range scan,
+    # no matter how deep the admin scrolls.
+    query = db.query(UserModel).filter(*_user_filters(db, search, role))
+    if cursor:
+        query = query.filter(UserModel.username > _decode_user_cursor(cursor))
+    users = query.order_by(UserModel.username).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(users) > limit:
+        users = users[:limit]
+        next_cursor = _encode_user_cursor(users[-1].username)
+    return UserListResponse(items=[serialize_user_model(u) for u in users], nextCursor=next_cursor)
+
+
+def _export_record(row) -> dict:
+    record = dict(row._mapping)
+    record["created_at"] = record["created_at"].isoformat() if record["created_at"] else None
+    return record
+
+
+def _stream_user_export(export_format: str, search: Optional[str], role: Optional[str]) -> Iterator[str]:
+    # The request-scoped session is closed before a streaming body is sent, so the
+    # export owns its session and reads through a server-side cursor in batches.
+    with SessionLocal() as db:
+        statement = (
+            select(*(getattr(UserModel, column) for column in USER_EXPORT_COLUMNS))
+            .where(*_user_filters(db, search, role))
+            .order_by(UserModel.username)
+            .execution_options(yield_per=USER_EXPORT_BATCH_SIZE)
+        )
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        if export_format == "csv":
+            writer.writerow(USER_EXPORT_COLUMNS)
+        for partition in db.execute(statement).partitions():
+            for row in partition:
+                record = _export_record(row)
+                if export_format == "csv":
+                    writer.writerow([record[column] for column in USER_EXPORT_COLUMNS])
+                else:
+                    buffer.write(json.dumps(record, ensure_ascii=False) + "\n")
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue()
+
+
+@router.get("/users/export")
+def export_users(
+    format: Literal["csv", "jsonl"] = Query(default="jsonl"),
+    search: Optional[str] = Query(default=None, min_length=1, max_length=120),
+    role: Optional[Literal["admin", "user"]] = Query(default=None),
+    current_user: UserModel = Depends(require_permission(PERM_USERS_READ_ALL)),
+):
+    _ = current_user
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        _stream_user_export(format, search, role),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="users.{format}"'},
+    )
+
+
+def _parse_batch_ids(raw_ids: List[str]) -> List[str]:
+    # Accept both ?ids=a&ids=b and ?ids=a,b; keep first-seen order without duplicates.
+    # Ids are canonicalized like stored keys, so legacy and uppercase ids match rows.
+    ids = list(dict.fromkeys(str(uuid_key(part.strip())) for raw in raw_ids for part in raw.split(",") if part.strip()))
+    if not ids:
+        raise HTTPException(status_code=400, detail="At least one user id is required")
+    if len(ids) > USER_BATCH_MAX_IDS:
+        raise HTTPException(status_code=400, detail=f"At most {USER_BATCH_MAX_IDS} user ids per request")
+    return ids
+
+
+def _check_avatar_size(avatar_size: Optional[int]) -> None:
+    if avatar_size is not None and avatar_size not in AVATAR_SIZES:
+        raise HTTPException(status_code=400, detail=f"avatarSize must be one of {', '.join(map(str, AVATAR_SIZES))}")
+
+
+@router.get("/users/batch", response_model=UserBatchResponse)
+def get_users_batch(
+    ids: List[str] = Query(...),
+    avatar_size: Optional[int] = Query(default=None, alias="avatarSize"),
+    avatar_format: Literal["jpeg", "webp"] = Query(default=DEFAULT_AVATAR_FORMAT, alias="avatarFormat"),
+    db: Session = Depends(get_db),
+    current_user: UserModel = Depends(get_current_user),
+):
+    user_ids = _parse_batch_ids(ids)
+    _check_avatar_size(avatar_size)
+    # Same rules as get_user, applied once for the whole batch.
+    if any(user_id != current_user.id for user_id in user_ids):
+        if not user_has_permission(current_user, PERM_USERS_READ_ALL):
+            raise HTTPException(status_code=403, detail="Forbidden")
+    elif not user_has_permission(current_user, PERM_USERS_READ_SELF):
+        raise HTTPException(status_code=403, detail="Forbidden")
+
+    rows = db.execute(select(*USER_SUMMARY_COLUMNS).where(UserModel.id.in_(user_ids))).all()
+    by_id = {row.id: row for row in rows}
+    # Unknown ids are omitted rather than failing the whole batch.
+    return UserBatchResponse(
+        items=[
+            serialize_user_summary(by_id[user_id], avatar_size=avatar_size, avatar_format=avatar_format)
+            for user_id in user_ids
+            if user_id in by_id
+        ]
+    )
 
 
 @router.get("/users/{user_id}", response_model=User)
@@ -60,7 +255,7 @@ def get_user(
     db: Session = Depends(get_db),
     current_user: UserModel = Depends(get_current_user),
 ):
-    if user_id == current_user.id:
+    if str(uuid_key(user_id)) == current_user.id:
         if not user_has_permission(current_user, PERM_USERS_READ_SELF):
             raise HTTPException(status_code=403, detail="Forbidden")
     else:
@@ -152,40 +347,143 @@ def update_profile(
     return serialize_user_model(user)
 
 
+async def _publish_avatar(user: UserModel, db: Session, source: bytes) -> User:
+    try:
+        default_name, variants = await run_in_threadpool(render_avatar_variants, source, user.id)
+    except AvatarImageError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    try:
+        await asyncio.gather(
+            *(
+                object_storage.aput_bytes(
+                    variant.object_name,
+                    variant.payload,
+                    content_type=variant.content_type,
+                    cache_control=VARIANT_CACHE_CONTROL,
+                )
+                for variant in variants
+            )
+        )
+    except S3Error:
+        logger.exception("Failed to upload avatar to MinIO for user %s", user.id)
+        raise HTTPException(status_code=502, detail="Failed to store avatar")
+
+    public_url = f"{MINIO_PUBLIC_URL}/{object_storage.bucket}/{default_name}"
+    # Only drop the previous avatar once the new one is stored; re-uploading the
+    # same picture maps to the same (content-hashed) objects.
+    if user.avatar_url != public_url:
+        await remove_existing_avatar_resource(user.avatar_url)
+    user.avatar_url = public_url
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    return serialize_user_model(user)
+
+
 @router.post("/me/avatar", response_model=User)
 async def upload_avatar(
     file: UploadFile = File(...),
     db: Session = Depends(get_db),
     current_user: UserModel = Depends(require_permission(PERM_PROFILE_AVATAR_UPDATE)),
 ):
-    user = current_user
-    if file.content_type not in {"image/png", "image/jpeg", "image/jpg"}:
+    if file.content_type not in AVATAR_ALLOWED_CONTENT_TYPES:
         raise HTTPException(status_code=400, detail="Unsupported file type")
-    if not MINIO_CLIENT or not MINIO_PUBLIC_URL:
+    if not object_storage.configured or not MINIO_PUBLIC_URL:
         raise HTTPException(status_code=503, detail="Avatar storage is not configured")
 
-    ext = ".png" if file.content_type == "image/png" else ".jpg"
-    data = await file.read()
-    if not data:
+    # The source has to be decoded whole anyway; the limit still applies while reading.
+    try:
+        source = await run_in_threadpool(MeteredUploadStream(file.file, AVATAR_MAX_SIZE_BYTES).read)
+    except EmptyUploadError:
         raise HTTPException(status_code=400, detail="Empty file")
+    except UploadTooLargeError:
+        raise HTTPException(
+            status_code=400,
+            detail=f"File is too large. Max size is {AVATAR_MAX_SIZE_BYTES // (1024 * 1024)} MB",
+        )
+    return await _publish_avatar(current_user, db, source)
 
-    object_name = f"{user.id}/{uuid.uuid4().hex}{ext}"
-    remove_existing_avatar_resource(user.avatar_url)
-    try:
-        MINIO_CLIENT.put_object(
-            MINIO_BUCKET,
-            object_name,
-            io.BytesIO(data),
-            length=len(data),
-            content_type=file.content_type,
+
+@router.post("/me/avatar/presign", response_model=PresignedUpload)
+def presign_avatar_upload(
+    body: PresignedUploadRequest,
+    current_user: UserModel = Depends(require_permission(PERM_PROFILE_AVATAR_UPDATE)),
+):
+    if not PRESIGN_SETTINGS.enabled:
+        raise HTTPException(status_code=404, detail="Presigned URLs are not enabled")
+    if body.contentType not in AVATAR_ALLOWED_CONTENT_TYPES:
+        raise HTTPException(status_code=400, detail="Unsupported file type")
+    if not MINIO_PRESIGN_CLIENT or not MINIO_PUBLIC_URL:
+        raise HTTPException(status_code=503, detail="Avatar storage is not configured")
+    if body.sizeBytes > AVATAR_MAX_SIZE_BYTES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"File is too large. Max size is {AVATAR_MAX_SIZE_BYTES // (1024 * 1024)} MB",
         )
+
+    ext = ".png" if body.contentType == "image/png" else ".jpg"
+    object_name = f"{UPLOAD_STAGING_PREFIX}avatars/{current_user.id}/{uuid.uuid4().hex}{ext}"
+    url, expires_at = presign_upload(MINIO_PRESIGN_CLIENT, object_storage.bucket, object_name, PRESIGN_SETTINGS)
+    return PresignedUpload(
+        uploadUrl=url,
+        headers={"Content-Type": body.contentType},
+        objectName=object_name,
+        expiresAt=expires_at.isoformat(),
+    )
+
+
+@router.post("/me/avatar/confirm", response_model=User)
+async def confirm_avatar_upload(
+    body: PresignedUploadConfirm,
+    db: Session = Depends(get_db),
+    current_user: UserModel = Depends(require_permission(PERM_PROFILE_AVATAR_UPDATE)),
+):
+    user = current_user
+    if not PRESIGN_SETTINGS.enabled:
+        raise HTTPException(status_code=404, detail="Presigned URLs are not enabled")
+    if not object_storage.configured or not MINIO_PUBLIC_URL:
+        raise HTTPException(status_code=503, detail="Avatar storage is not configured")
+    match = _PRESIGNED_AVATAR_NAME.fullmatch(body.objectName)
+    if not match or match.group("user_id") != user.id:
+        raise HTTPException(status_code=400, detail="Invalid object name")
+
+    try:
+        uploaded = await object_storage.astat(body.objectName)
     except S3Error:
-        logger.exception("Failed to upload avatar to MinIO for user %s", user.id)
-        raise HTTPException(status_code=502, detail="Failed to store avatar")
+        logger.exception("Failed to inspect uploaded avatar %s", body.objectName)
+        raise HTTPException(status_code=502, detail="Failed to read avatar")
+    if uploaded is None:
+        raise HTTPException(status_code=404, detail="Uploaded file not found")
+    rejection = None
+    if uploaded.size == 0:
+        rejection = "Empty file"
+    elif uploaded.size > AVATAR_MAX_SIZE_BYTES:
+        rejection = f"File is too large. Max size is {AVATAR_MAX_SIZE_BYTES // (1024 * 1024)} MB"
+    elif uploaded.content_type not in AVATAR_ALLOWED_CONTENT_TYPES:
+        rejection = "Unsupported file type"
+    if rejection:
+        try:
+            await object_storage.aremove(body.objectName)
+        except S3Error:
+            logger.warning("Failed to remove rejected avatar object %s", body.objectName)
+        raise HTTPException(status_code=400, detail=rejection)
 
-    public_url = f"{MINIO_PUBLIC_URL}/{MINIO_BUCKET}/{object_name}"
-    user.avatar_url = public_url
-    db.add(user)
-    db.commit()
-    db.refresh(user)
-    return serialize_user_model(user)
+    # The PUT URL stays valid after the stat above, so the limit is enforced again
+    # while reading; only the re-encoded variants are ever published.
+    try:
+        source = await object_storage.aread(body.objectName, max_size=AVATAR_MAX_SIZE_BYTES)
+    except (EmptyUploadError, UploadTooLargeError):
+        rejection = "Uploaded file changed, upload it again"
+    except S3Error:
+        logger.exception("Failed to read uploaded avatar %s", body.objectName)
+        raise HTTPException(status_code=502, detail="Failed to read avatar")
+    try:
+        if rejection:
+            raise HTTPException(status_code=409, detail=rejection)
+        return await _publish_avatar(user, db, source)
+    finally:
+        # The raw upload is superseded by its processed variants, or unusable.
+        try:
+            await object_storage.aremove(body.objectName)
+        except S3Error:
+            logger.warning("Failed to remove raw avatar upload %s", body.objectName)
@@ -1,18 +1,39 @@
 import logging
 import os
+import threading
 from pathlib import Path
-from typing import List, Optional
+from typing import Optional
+from urllib.parse import urlsplit
 
+from alembic import command
+from alembic.config import Config as AlembicConfig
+from alembic.script import ScriptDirectory
 from minio import Minio
 from minio.error import S3Error
 from passlib.context import CryptContext
-from sqlalchemy import inspect, text
-from sqlalchemy.exc import NoSuchTableError
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 
-from database import create_tables
-
-pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
+from database import SessionLocal
+from metrics import register_metrics_source
+from models import User as UserModel
+from repositories.settings_repository import RuntimeSettingRepository
+from services.password_service import (
+    PasswordHasher,
+    PasswordHashingBusyError,
+    load_password_hashing_settings,
+    pbkdf2_context_config,
+)
+from services.avatar_images import sibling_variant_names
+from services.object_storage import ObjectStorage, load_object_storage_settings
+from services.presigned_storage import load_presign_settings
+
+PASSWORD_HASH_ROUNDS_SETTING = "password_hash.pbkdf2_sha256.rounds"
+
+pwd_context = CryptContext(**pbkdf2_context_config())
+password_hasher = PasswordHasher(pwd_context, load_password_hashing_settings())
+register_metrics_source("passwordHashing", password_hasher.stats)
 
 logger = logging.getLogger("survey_backend")
 if not logger.handlers:
@@ -25,6 +46,7 @@ ADMIN_SECRET = os.getenv("ADMIN_SECRET")
 BASE_DIR = Path(__file__).resolve().parent
 STATIC_DIR = BASE_DIR / "static"
 AVATAR_DIR = STATIC_DIR / "avatars"
+ALEMBIC_INI_PATH = BASE_DIR / "alembic.ini"
 STATIC_DIR.mkdir(exist_ok=True)
 AVATAR_DIR.mkdir(parents=True, exist_ok=True)
 
@@ -34,7 +56,10 @@ MINIO_SECRET_KEY = os.getenv("MINIO_SECRET_KEY")
 MINIO_BUCKET = os.getenv("MINIO_BUCKET", "avatars")
 MINIO_USE_SSL = os.getenv("MINIO_USE_SSL", "false").lower() in {"1", "true", "yes"}
 MINIO_PUBLIC_URL = os.getenv("MINIO_PUBLIC_URL")
+MINIO_REGION = os.getenv("MINIO_REGION", "us-east-1")
 MINIO_CLIENT: Optional[Minio] = None
+MINIO_PRESIGN_CLIENT: Optional[Minio] = None
+PRESIGN_SETTINGS = load_presign_settings()
 
 if MINIO_ENDPOINT and MINIO_ACCESS_KEY and MINIO_SECRET_KEY:
     try:
@@ -48,231 +73,157 @@ if MINIO_ENDPOINT and MINIO_ACCESS_KEY and MINIO_SECRET_KEY:
             scheme = "https" if MINIO_USE_SSL else "http"
             MINIO_PUBLIC_URL = f"{scheme}://{MINIO_ENDPOINT}"
         MINIO_PUBLIC_URL = MINIO_PUBLIC_URL.rstrip("/")
+        # Presigned URLs are signed for the host the browser talks to, which is
+        # not necessarily MINIO_ENDPOINT (e.g. "minio:9000" inside compose). A
+        # fixed region keeps signing offline.
+        public_url = urlsplit(MINIO_PUBLIC_URL)
+        MINIO_PRESIGN_CLIENT = Minio(
+            public_url.netloc,
+            access_key=MINIO_ACCESS_KEY,
+            secret_key=MINIO_SECRET_KEY,
+            secure=public_url.scheme == "https",
+            region=MINIO_REGION,
+        )
     except Exception:
         logger.exception("Failed to initialize MinIO client")
         MINIO_CLIENT = None
+        MINIO_PRESIGN_CLIENT = None
 else:
     if MINIO_ENDPOINT or MINIO_ACCESS_KEY or MINIO_SECRET_KEY:
         logger.warning("MinIO configuration is incomplete; avatar uploads are disabled")
 
+object_storage = ObjectStorage(MINIO_CLIENT, MINIO_BUCKET, load_object_storage_settings())
+register_metrics_source("objectStorage", object_storage.stats)
+
 
 def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+    return password_hasher.hash(password)
 
 
 def verify_password(plain: str, hashed: str) -> bool:
-    return pwd_context.verify(plain, hashed)
+    return password_hasher.verify(plain, hashed)
+
 
+def password_needs_rehash(hashed: str) -> bool:
+    return password_hasher.needs_update(hashed)
 
-def ensure_runtime_schema(db: Session, include_vote_constraints: bool = False) -> None:
-    """Initialize and align schema for runtime compatibility."""
-    create_tables()
-    ensure_user_columns(db)
-    ensure_poll_columns(db)
-    if include_vote_constraints:
-        ensure_vote_constraints(db)
 
+def configure_password_hash_rounds(rounds: Optional[int]) -> None:
+    pwd_context.load(pbkdf2_context_config(rounds))
 
-def ensure_user_columns(db: Session) -> None:
-    """Ensure legacy databases have auth columns and constraints."""
-    engine = db.get_bind()
-    inspector = inspect(engine)
 
+def load_password_hash_rounds(db: Session) -> Optional[int]:
+    """Apply the persisted pbkdf2 cost chosen by calibrate_password_hashing.py."""
+    stored = RuntimeSettingRepository(db).get(PASSWORD_HASH_ROUNDS_SETTING)
+    if not stored:
+        return None
     try:
-        columns = {col["name"] for col in inspector.get_columns("users")}
-    except NoSuchTableError:
-        # Table will be created on startup via create_tables()
-        return
+        rounds = int(stored)
+    except ValueError:
+        logger.warning("Ignoring invalid %s setting %r", PASSWORD_HASH_ROUNDS_SETTING, stored)
+        return None
+    configure_password_hash_rounds(rounds)
+    logger.info("Using calibrated pbkdf2_sha256 cost of %s rounds", rounds)
+    return rounds
 
-    statements: List[str] = []
-
-    if "username" not in columns:
-        statements.append("ALTER TABLE users ADD COLUMN username VARCHAR")
-        columns.add("username")
-        logger.info("Added missing column users.username")
-    if "password_hash" not in columns:
-        statements.append("ALTER TABLE users ADD COLUMN password_hash VARCHAR")
-        columns.add("password_hash")
-        logger.info("Added missing column users.password_hash")
-    if "created_at" not in columns:
-        default_expr = "CURRENT_TIMESTAMP"
-        if engine.dialect.name in {"postgresql", "postgresql+psycopg2", "postgresql+psycopg"}:
-            default_expr = "TIMEZONE('utc', NOW())"
-        statements.append(f"ALTER TABLE users ADD COLUMN created_at TIMESTAMP DEFAULT {default_expr}")
-        columns.add("created_at")
-        logger.info("Added missing column users.created_at")
-    if "avatar_url" not in columns:
-        statements.append("ALTER TABLE users ADD COLUMN avatar_url VARCHAR")
-        columns.add("avatar_url")
-        logger.info("Added missing column users.avatar_url")
-
-    executed = False
-    for stmt in statements:
-        db.execute(text(stmt))
-        executed = True
-    if executed:
-        db.commit()
 
-    # Backfill and deduplicate usernames
-    if "username" in columns:
-        rows = db.execute(
-            text("SELECT id, email FROM users WHERE username IS NULL OR username = ''")
-        ).fetchall()
-        updated = 0
-        for row in rows:
-            base = (row.email.split("@")[0] if row.email else f"user_{row.id[:8]}") or f"user_{row.id[:8]}"
-            base = base.lower()
-            candidate = base
-            suffix = 1
-            while db.execute(
-                text("SELECT 1 FROM users WHERE username = :username AND id <> :id"),
-                {"username": candidate, "id": row.id},
-            ).scalar():
-                candidate = f"{base}{suffix}"
-                suffix += 1
-            db.execute(
-                text("UPDATE users SET username = :username WHERE id = :id"),
-                {"username": candidate, "id": row.id},
-            )
-            updated += 1
-        if updated:
-            db.commit()
-            logger.info("Backfilled usernames for %s existing users", updated)
-
-        duplicates = db.execute(
-            text(
-                """
-                SELECT username FROM users
-                WHERE username IS NOT NULL AND username <> ''
-                GROUP BY username
-                HAVING COUNT(*) > 1
-                """
-            )
-        ).fetchall()
-
-        deduped = 0
-        for dup in duplicates:
-            users = db.execute(
-                text(
-                    "SELECT id FROM users WHERE username = :username ORDER BY id"
-                ),
-                {"username": dup.username},
-            ).fetchall()
-            # keep the first record, adjust the rest
-            for idx, user_row in enumerate(users[1:], start=1):
-                candidate = f"{dup.username}{idx}"
-                suffix = idx
-                while db.execute(
-                    text("SELECT 1 FROM users WHERE username = :username AND id <> :id"),
-                    {"username": candidate, "id": user_row.id},
-                ).scalar():
-                    suffix += 1
-                    candidate = f"{dup.username}{suffix}"
-                db.execute(
-                    text("UPDATE users SET username = :username WHERE id = :id"),
-                    {"username": candidate, "id": user_row.id},
-                )
-                deduped += 1
-        if deduped:
-            db.commit()
-            logger.warning("Resolved %s duplicate usernames in users table", deduped)
-
-    if "password_hash" in columns:
-        rows = db.execute(
-            text("SELECT id FROM users WHERE password_hash IS NULL OR password_hash = ''")
-        ).fetchall()
-        if rows:
-            for row in rows:
-                db.execute(
-                    text("UPDATE users SET password_hash = :password WHERE id = :id"),
-                    {"password": hash_password("changeme"), "id": row.id},
-                )
-            db.commit()
-            logger.info("Backfilled password hashes for %s existing users", len(rows))
-
-    if "role" in columns:
-        migrated = db.execute(
-            text("UPDATE users SET role = 'admin' WHERE role = 'owner'")
+def rehash_user_password(user_id: str, password: str, previous_hash: str) -> None:
+    """Background task: re-hash a verified password with the current cost settings."""
+    try:
+        new_hash = hash_password(password)
+    except PasswordHashingBusyError:
+        logger.info("Skipped password rehash for user %s: hashing queue is full", user_id)
+        return
+    with SessionLocal() as db:
+        updated = (
+            db.query(UserModel)
+            .filter(UserModel.id == user_id, UserModel.password_hash == previous_hash)
+            .update({UserModel.password_hash: new_hash}, synchronize_session=False)
         )
-        if migrated.rowcount:
-            db.commit()
-            logger.info("Normalized %s legacy owner roles to admin", migrated.rowcount)
-
-    unique_constraints = {
-        tuple(uc.get("column_names", []))
-        for uc in inspector.get_unique_constraints("users")
-    }
-    unique_indexes = {
-        tuple(idx.get("column_names", []))
-        for idx in inspector.get_indexes("users")
-        if idx.get("unique")
-    }
-
-    idx_statements: List[str] = []
-    if ("username",) not in unique_constraints and ("username",) not in unique_indexes:
-        idx_statements.append("CREATE UNIQUE INDEX IF NOT EXISTS uq_users_username ON users (username)")
-    if ("email",) not in unique_constraints and ("email",) not in unique_indexes:
-        idx_statements.append("CREATE UNIQUE INDEX IF NOT EXISTS uq_users_email ON users (email)")
-
-    ran_indexes = False
-    for stmt in idx_statements:
-        db.execute(text(stmt))
-        ran_indexes = True
-    if ran_indexes:
         db.commit()
+    if updated:
+        logger.info("Rehashed password for user %s with updated cost settings", user_id)
 
 
-def ensure_poll_columns(db: Session) -> None:
-    """Ensure legacy databases contain poll ownership column."""
-    inspector = inspect(db.get_bind())
-    try:
-        columns = {col["name"] for col in inspector.get_columns("polls")}
-    except NoSuchTableError:
-        return
-    if "owner_user_id" in columns:
-        return
-    db.execute(text("ALTER TABLE polls ADD COLUMN owner_user_id VARCHAR"))
-    db.commit()
-    logger.info("Added missing column polls.owner_user_id")
+_schema_ready = False
+_schema_lock = threading.Lock()
 
 
-def ensure_vote_constraints(db: Session) -> None:
-    """Ensure votes table allows multi-select per variant."""
-    if db.get_bind().dialect.name == "sqlite":
-        # SQLite test environments build the current constraint layout from metadata,
-        # but do not support the ALTER TABLE constraint operations used for Postgres.
-        return
-    inspector = inspect(db.get_bind())
+def alembic_config() -> AlembicConfig:
+    config = AlembicConfig(str(ALEMBIC_INI_PATH))
+    config.set_main_option("script_location", str(BASE_DIR / "alembic"))
+    return config
+
+
+def schema_head_revision() -> str:
+    """Head of the migration chain, read from the revision files rather than the database."""
+    head = ScriptDirectory.from_config(alembic_config()).get_current_head()
+    if head is None:
+        raise RuntimeError("Alembic migration chain is empty")
+    return head
+
+
+SCHEMA_VERSION = schema_head_revision()
+
+
+def read_schema_version(db: Session) -> Optional[str]:
     try:
-        constraints = {uc.get("name") for uc in inspector.get_unique_constraints("votes")}
-    except NoSuchTableError:
-        return
-    if "unique_user_poll_vote" in constraints:
-        db.execute(text('ALTER TABLE votes DROP CONSTRAINT IF EXISTS unique_user_poll_vote'))
-        db.commit()
-        constraints.remove("unique_user_poll_vote")
-    if "unique_user_poll_variant" not in constraints:
-        db.execute(
-            text('ALTER TABLE votes ADD CONSTRAINT unique_user_poll_variant UNIQUE (poll_id, user_id, variant_id)')
-        )
-        db.commit()
+        return db.execute(text("SELECT version_num FROM alembic_version")).scalar()
+    except SQLAlchemyError:
+        # alembic_version does not exist yet on a fresh or pre-migration database.
+        db.rollback()
+        return None
+
+
+def upgrade_schema(db: Session) -> None:
+    """Run pending Alembic revisions up to head on a dedicated connection."""
+    # Release the session's snapshot and locks first: on Postgres an open read
+    # transaction on the same tables would block ALTER TABLE from the migration.
+    db.rollback()
+    config = alembic_config()
+    with db.get_bind().connect() as connection:
+        config.attributes["connection"] = connection
+        command.upgrade(config, "head")
+        connection.commit()
+
+
+def ensure_schema_ready(db: Session, *, force: bool = False) -> bool:
+    """Bring the schema to the migration head at most once per process.
+
+    Startup only compares the stamped Alembic revision with the head of the chain;
+    the database is not reflected unless a migration actually has to run.
+    Returns True when ``upgrade_schema`` was executed.
+    """
+    global _schema_ready
+    if _schema_ready and not force:
+        return False
+    with _schema_lock:
+        if _schema_ready and not force:
+            return False
+        executed = False
+        current = read_schema_version(db)
+        if force or current != SCHEMA_VERSION:
+            upgrade_schema(db)
+            executed = True
+            logger.info("Database schema migrated from %s to %s", current or "<none>", SCHEMA_VERSION)
+        _schema_ready = True
+        return executed
 
 
 def ensure_minio_bucket() -> None:
-    if not MINIO_CLIENT:
+    if not object_storage.configured:
         return
     try:
-        if not MINIO_CLIENT.bucket_exists(MINIO_BUCKET):
-            MINIO_CLIENT.make_bucket(MINIO_BUCKET)
-            logger.info("Created MinIO bucket %s", MINIO_BUCKET)
+        if object_storage.ensure_bucket():
+            logger.info("Created MinIO bucket %s", object_storage.bucket)
     except S3Error:
-        logger.exception("Failed to ensure MinIO bucket %s", MINIO_BUCKET)
+        logger.exception("Failed to ensure MinIO bucket %s", object_storage.bucket)
     except Exception:
         # Network/transport errors are not always wrapped as S3Error.
-        logger.exception("Failed to connect to MinIO while ensuring bucket %s", MINIO_BUCKET)
+        logger.exception("Failed to connect to MinIO while ensuring bucket %s", object_storage.bucket)
 
 
-def remove_existing_avatar_resource(avatar_url: Optional[str]) -> None:
+async def remove_existing_avatar_resource(avatar_url: Optional[str]) -> None:
     if not avatar_url:
         return
     if avatar_url.startswith("/static/avatars/"):
@@ -286,12 +237,14 @@ def remove_existing_avatar_resource(avatar_url: Optional[str]) -> None:
                 except Exception:
                     logger.warning("Failed to remove legacy avatar %s", old_file)
         return
-    if MINIO_CLIENT and MINIO_BUCKET:
-        marker = f"/{MINIO_BUCKET}/"
+    if object_storage.configured and object_storage.bucket:
+        marker = f"/{object_storage.bucket}/"
         if marker in avatar_url:
-            object_name = avatar_url.split(marker, 1)[1]
+            object_name = avatar_url.split(marker, 1)[1].split("?")[0]
             if object_name:
-                try:
-                    MINIO_CLIENT.remove_object(MINIO_BUCKET, object_name)
-                except S3Error:
-                    logger.warning("Failed to remove old MinIO avatar object %s", object_name)
+                # Processed avatars are a set of size/format variants; older ones a single file.
+                for name in sibling_variant_names(object_name) or [object_name]:
+                    try:
+                        await object_storage.aremove(name)
+                    except S3Error:
+                        logger.warning("Failed to remove old MinIO avatar object %s", name)
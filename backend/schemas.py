@@ -47,6 +47,7 @@ class PollAttachment(BaseModel):
     originalName: str
     contentType: str
     sizeBytes: int
+    checksumSha256: Optional[str] = None
     uploaderUserId: str
     createdAt: str
     downloadUrl: str
@@ -56,6 +57,30 @@ class PollAttachmentListResponse(BaseModel):
     items: List[PollAttachment]
 
 
+class PresignedUploadRequest(BaseModel):
+    fileName: Optional[str] = None
+    contentType: str
+    sizeBytes: int = Field(gt=0)
+
+
+class PresignedUpload(BaseModel):
+    # PUT the file body to uploadUrl with these headers, then confirm objectName.
+    uploadUrl: str
+    method: str = "PUT"
+    headers: Dict[str, str]
+    objectName: str
+    expiresAt: str
+
+
+class PresignedUploadConfirm(BaseModel):
+    objectName: str
+
+
+class PresignedDownload(BaseModel):
+    url: str
+    expiresAt: str
+
+
 class VoteRequest(BaseModel):
     # Legacy field kept for backward compatibility; server uses current user from access token.
     userId: Optional[str] = None
@@ -113,6 +138,23 @@ class User(BaseModel):
     avatarUrl: Optional[str] = None
 
 
+class UserListResponse(BaseModel):
+    items: List[User]
+    nextCursor: Optional[str] = None
+
+
+class UserSummary(BaseModel):
+    id: str
+    username: Optional[str] = None
+    name: str
+    role: str
+    avatarUrl: Optional[str] = None
+
+
+class UserBatchResponse(BaseModel):
+    items: List[UserSummary]
+
+
 class RegisterRequest(BaseModel):
     username: str
     email: str
@@ -2,7 +2,10 @@ from __future__ import annotations
 
 import hashlib
 import os
+import threading
+import time
 import uuid
+from collections import OrderedDict
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 from typing import Any, Callable, Dict, Optional, Tuple
@@ -21,6 +24,7 @@ class AuthSettings:
     issuer: str
     access_token_ttl_minutes: int
     refresh_token_ttl_days: int
+    access_token_cache_size: int = 0
 
 
 @dataclass(frozen=True)
@@ -39,9 +43,77 @@ class AuthError(Exception):
         self.status_code = status_code
 
 
+class VerifiedTokenCache:
+    """LRU of already verified token payloads keyed by a SHA-256 digest of the token.
+
+    Entries live until the token's ``exp`` claim; expired entries are dropped on lookup
+    so the caller falls back to full verification and reports the expiry itself.
+    """
+
+    def __init__(self, *, max_entries: int) -> None:
+        self.max_entries = max(1, max_entries)
+        self._entries: OrderedDict[str, Tuple[float, Dict[str, Any]]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    @staticmethod
+    def _digest(token: str) -> str:
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        key = self._digest(token)
+        now = time.time()
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is None:
+                self._misses += 1
+                return None
+            expires_at, payload = cached
+            if expires_at <= now:
+                del self._entries[key]
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return dict(payload)
+
+    def put(self, token: str, payload: Dict[str, Any]) -> None:
+        expires_at = payload.get("exp")
+        if not isinstance(expires_at, (int, float)):
+            return
+        key = self._digest(token)
+        with self._lock:
+            self._entries[key] = (float(expires_at), dict(payload))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "size": len(self._entries),
+                "maxEntries": self.max_entries,
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "hitRatio": round(self._hits / lookups, 4) if lookups else 0.0,
+            }
+
+
 class TokenService:
     def __init__(self, settings: AuthSettings) -> None:
         self.settings = settings
+        self.access_token_cache: Optional[VerifiedTokenCache] = None
+        if settings.access_token_cache_size > 0:
+            self.access_token_cache = VerifiedTokenCache(max_entries=settings.access_token_cache_size)
 
     def _utc_now(self) -> datetime:
         return datetime.now(timezone.utc)
@@ -74,7 +146,22 @@ class TokenService:
         return encoded, max(ttl_seconds, 0)
 
     def decode_access_token(self, token: str) -> Dict[str, Any]:
-        return self._decode_typed_token(token, expected_type="access")
+        cache = self.access_token_cache
+        if cache is None:
+            return self._decode_typed_token(token, expected_type="access")
+        cached = cache.get(token)
+        if cached is not None:
+            return cached
+        payload = self._decode_typed_token(token, expected_type="access")
+        cache.put(token, payload)
+        return payload
+
+    def access_token_subject(self, token: str) -> str:
+        payload = self.decode_access_token(token)
+        user_id = str(payload.get("sub") or "")
+        if not user_id:
+            raise AuthError("Invalid token payload", status_code=401)
+        return user_id
 
     def decode_refresh_token(self, token: str) -> Dict[str, Any]:
         return self._decode_typed_token(token, expected_type="refresh")
@@ -117,10 +204,7 @@ class AuthService:
         return user
 
     def resolve_user_from_access_token(self, access_token: str) -> User:
-        payload = self.token_service.decode_access_token(access_token)
-        user_id = str(payload.get("sub") or "")
-        if not user_id:
-            raise AuthError("Invalid token payload", status_code=401)
+        user_id = self.token_service.access_token_subject(access_token)
         user = self.user_repo.get_by_id(user_id)
         if not user:
             raise AuthError("User not found", status_code=401)
@@ -221,6 +305,9 @@ class AuthService:
         )
 
         access_token, access_expires_in = self.token_service.issue_access_token(user_id=user.id, role=user.role)
+        # The user row is not modified here; detaching it keeps the loaded attributes
+        # from being expired by the commit and re-selected just to build the response.
+        self.user_repo.db.expunge(user)
         self.user_repo.db.commit()
         return (
             user,
@@ -269,4 +356,5 @@ def load_auth_settings() -> AuthSettings:
         issuer=os.getenv("JWT_ISSUER", "survey-app"),
         access_token_ttl_minutes=int(os.getenv("ACCESS_TOKEN_TTL_MINUTES", "15")),
         refresh_token_ttl_days=int(os.getenv("REFRESH_TOKEN_TTL_DAYS", "14")),
+        access_token_cache_size=max(0, int(os.getenv("ACCESS_TOKEN_CACHE_SIZE", "4096"))),
     )
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import hashlib
+import io
+import re
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+AVATAR_SIZES = (64, 128, 256)
+DEFAULT_AVATAR_SIZE = 256
+# format -> (content type, file extension)
+AVATAR_FORMATS = {"jpeg": ("image/jpeg", "jpg"), "webp": ("image/webp", "webp")}
+DEFAULT_AVATAR_FORMAT = "jpeg"
+ACCEPTED_SOURCE_FORMATS = {"PNG", "JPEG"}
+# Refuse decompression bombs before decoding: a 5 MB PNG can expand to gigabytes.
+MAX_SOURCE_PIXELS = 40_000_000
+# Variants are immutable (the name embeds the source hash), so caches may keep them forever.
+VARIANT_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+_VARIANT_NAME = re.compile(r"(?P<base>.+/[0-9a-f]{16})/(?P<size>\d+)\.(?P<ext>jpg|webp)")
+
+
+class AvatarImageError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class AvatarVariant:
+    size: int
+    format: str
+    content_type: str
+    object_name: str
+    payload: bytes
+
+
+def variant_object_name(base: str, size: int, image_format: str) -> str:
+    return f"{base}/{size}.{AVATAR_FORMATS[image_format][1]}"
+
+
+def render_avatar_variants(source: bytes, prefix: str) -> Tuple[str, List[AvatarVariant]]:
+    """Square thumbnails of ``source`` in every size and format, named under ``prefix``.
+
+    Names are ``<prefix>/<source hash>/<size>.<ext>``, so re-uploading the same
+    picture yields the same objects. Returns the default variant's object name
+    and all variants. Raises ``AvatarImageError`` for anything that is not a
+    sane PNG or JPEG.
+    """
+    try:
+        image = Image.open(io.BytesIO(source))
+        if image.format not in ACCEPTED_SOURCE_FORMATS:
+            raise AvatarImageError("Unsupported image format")
+        if image.width * image.height > MAX_SOURCE_PIXELS:
+            raise AvatarImageError("Image dimensions are too large")
+        largest = max(AVATAR_SIZES)
+        # JPEG can decode straight at a reduced scale, which is most of the work
+        # for multi-megapixel phone photos.
+        image.draft("RGB", (largest * 2, largest * 2))
+        image = ImageOps.exif_transpose(image)
+        image.load()
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError, SyntaxError) as exc:
+        raise AvatarImageError("File is not a valid image") from exc
+
+    has_alpha = image.mode in {"RGBA", "LA"} or (image.mode == "P" and "transparency" in image.info)
+    image = image.convert("RGBA" if has_alpha else "RGB")
+    base = f"{prefix}/{hashlib.sha256(source).hexdigest()[:16]}"
+
+    variants: List[AvatarVariant] = []
+    square = ImageOps.fit(image, (largest, largest), method=Image.Resampling.LANCZOS)
+    for size in sorted(AVATAR_SIZES, reverse=True):
+        thumbnail = square if size == largest else square.resize((size, size), Image.Resampling.LANCZOS)
+        for image_format, (content_type, _) in AVATAR_FORMATS.items():
+            buffer = io.BytesIO()
+            if image_format == "jpeg":
+                flattened = thumbnail
+                if has_alpha:
+                    flattened = Image.new("RGB", thumbnail.size, (255, 255, 255))
+                    flattened.paste(thumbnail, mask=thumbnail.getchannel("A"))
+                flattened.save(buffer, "JPEG", quality=85, optimize=True, progressive=True)
+            else:
+                thumbnail.save(buffer, "WEBP", quality=80, method=4)
+            variants.append(
+                AvatarVariant(
+                    size=size,
+                    format=image_format,
+                    content_type=content_type,
+                    object_name=variant_object_name(base, size, image_format),
+                    payload=buffer.getvalue(),
+                )
+            )
+    return variant_object_name(base, DEFAULT_AVATAR_SIZE, DEFAULT_AVATAR_FORMAT), variants
+
+
+def sibling_variant_names(object_name: str) -> List[str]:
+    """Every variant stored next to ``object_name``; empty for a pre-pipeline avatar."""
+    match = _VARIANT_NAME.fullmatch(object_name)
+    if not match:
+        return []
+    return [variant_object_name(match.group("base"), size, image_format) for size in AVATAR_SIZES for image_format in AVATAR_FORMATS]
+
+
+def avatar_variant_url(avatar_url: Optional[str], size: Optional[int], image_format: str = DEFAULT_AVATAR_FORMAT) -> Optional[str]:
+    """``avatar_url`` rewritten to the requested variant; legacy single-file avatars are returned unchanged."""
+    if not avatar_url or (size is None and image_format == DEFAULT_AVATAR_FORMAT):
+        return avatar_url
+    path, _, query = avatar_url.partition("?")
+    match = _VARIANT_NAME.fullmatch(path)
+    if not match:
+        return avatar_url
+    url = variant_object_name(match.group("base"), size or DEFAULT_AVATAR_SIZE, image_format)
+    return url + (f"?{query}" if query else "")
@@ -0,0 +1,244 @@
+from __future__ import annotations
+
+import gzip
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Sequence
+
+from sqlalchemy import Boolean, DateTime, Table, func, select
+from sqlalchemy.engine import Engine
+
+from models import Base
+from services.bulk_load import insert_records
+
+logger = logging.getLogger("survey_backend.backup")
+
+BACKUP_FORMAT = "survey-jsonl-gzip/1"
+BACKUP_TABLES = ("users", "polls", "poll_variants", "votes", "poll_attachments")
+MANIFEST_NAME = "manifest.json"
+
+
+class BackupError(RuntimeError):
+    pass
+
+
+@dataclass(frozen=True)
+class BackupSettings:
+    batch_size: int
+    workers: int
+    compress_level: int
+    use_copy: bool
+
+
+def restore_levels(tables: Sequence[str] = BACKUP_TABLES) -> List[List[str]]:
+    """Group ``tables`` so each group only references tables of earlier groups."""
+    remaining = {name: Base.metadata.tables[name] for name in tables}
+    loaded: set = set()
+    levels = []
+    while remaining:
+        ready = sorted(
+            name
+            for name, table in remaining.items()
+            if all(fk.column.table.name in loaded or fk.column.table.name not in remaining for fk in table.foreign_keys)
+        )
+        if not ready:
+            raise BackupError(f"Circular foreign keys between {sorted(remaining)}")
+        levels.append(ready)
+        loaded.update(ready)
+        for name in ready:
+            del remaining[name]
+    return levels
+
+
+def _encode(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _decoder(table: Table) -> Callable[[Dict[str, Any]], Dict[str, Any]]:
+    datetimes = [column.name for column in table.columns if isinstance(column.type, DateTime)]
+    booleans = [column.name for column in table.columns if isinstance(column.type, Boolean)]
+
+    def decode(record: Dict[str, Any]) -> Dict[str, Any]:
+        for name in datetimes:
+            if record.get(name) is not None:
+                record[name] = datetime.fromisoformat(record[name])
+        for name in booleans:
+            if record.get(name) is not None:
+                record[name] = bool(record[name])
+        return record
+
+    return decode
+
+
+def export_tables(engine: Engine, directory: Path, settings: BackupSettings, *, tables: Sequence[str] = BACKUP_TABLES) -> Dict[str, Any]:
+    """Stream every table to ``<table>.jsonl.gz`` in ``directory`` and write the manifest.
+
+    Rows are read with ``yield_per`` (a server-side cursor on Postgres), so memory
+    stays flat whatever the table size. The manifest is written last: a directory
+    without one is an interrupted export.
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    manifest_tables: Dict[str, Any] = {}
+    with engine.connect() as connection:
+        schema_version = connection.exec_driver_sql("SELECT version_num FROM alembic_version").scalar()
+        for name in tables:
+            table = Base.metadata.tables[name]
+            path = directory / f"{name}.jsonl.gz"
+            started = time.perf_counter()
+            rows = 0
+            columns = [column.name for column in table.columns]
+            statement = select(table).order_by(*table.primary_key.columns)
+            result = connection.execution_options(yield_per=settings.batch_size).execute(statement)
+            with gzip.open(path, "wt", encoding="utf-8", compresslevel=settings.compress_level) as stream:
+                for partition in result.partitions():
+                    stream.writelines(
+                        json.dumps({column: _encode(value) for column, value in zip(columns, row)}, ensure_ascii=False) + "\n"
+                        for row in partition
+                    )
+                    rows += len(partition)
+            manifest_tables[name] = {"file": path.name, "rows": rows, "columns": columns}
+            logger.info("Exported %s rows of %s in %.1fs", rows, name, time.perf_counter() - started)
+
+    manifest = {
+        "format": BACKUP_FORMAT,
+        "schemaVersion": schema_version,
+        "createdAt": datetime.now(timezone.utc).isoformat(),
+        "sourceDialect": engine.dialect.name,
+        "tables": manifest_tables,
+    }
+    staging = directory / f"{MANIFEST_NAME}.tmp"
+    staging.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    staging.replace(directory / MANIFEST_NAME)
+    return manifest
+
+
+def read_manifest(directory: Path) -> Dict[str, Any]:
+    path = directory / MANIFEST_NAME
+    if not path.exists():
+        raise BackupError(f"{path} not found: not a backup directory, or the export did not finish")
+    manifest = json.loads(path.read_text(encoding="utf-8"))
+    if manifest.get("format") != BACKUP_FORMAT:
+        raise BackupError(f"Unsupported backup format {manifest.get('format')!r}")
+    return manifest
+
+
+def _read_chunks(path: Path, batch_size: int) -> Iterator[List[Dict[str, Any]]]:
+    chunk: List[Dict[str, Any]] = []
+    with gzip.open(path, "rt", encoding="utf-8") as stream:
+        for line in stream:
+            chunk.append(json.loads(line))
+            if len(chunk) >= batch_size:
+                yield chunk
+                chunk = []
+    if chunk:
+        yield chunk
+
+
+def _cleared_by(occupied: Sequence[str]) -> set:
+    """``occupied`` plus every table that (transitively) references one of them.
+
+    Tables left out of backups, such as refresh_token_sessions, still hold
+    foreign keys to the rows being replaced; they have to go first or Postgres
+    refuses the delete.
+    """
+    cleared = set(occupied)
+    for table in Base.metadata.sorted_tables:
+        if any(fk.column.table.name in cleared for fk in table.foreign_keys):
+            cleared.add(table.name)
+    return cleared
+
+
+def restore_tables(engine: Engine, directory: Path, settings: BackupSettings, *, replace: bool = False) -> Dict[str, int]:
+    """Load a backup into ``engine``, whose schema must already be at the backup's revision.
+
+    Tables go in dependency levels (users, then polls, then variants and
+    attachments, then votes). Within a level, chunks of every table are inserted
+    concurrently by ``settings.workers`` threads, each chunk in its own
+    transaction; at most two chunks per worker are in memory at a time. SQLite
+    serializes writers anyway, so it is restored with a single worker. With
+    ``replace`` the existing rows go first, including refresh sessions of the
+    replaced users, so everyone has to sign in again.
+    """
+    manifest = read_manifest(directory)
+    with engine.connect() as connection:
+        schema_version = connection.exec_driver_sql("SELECT version_num FROM alembic_version").scalar()
+    if schema_version != manifest["schemaVersion"]:
+        raise BackupError(
+            f"Backup was taken at schema revision {manifest['schemaVersion']}, target is at {schema_version}; "
+            "migrate the target to the same revision first"
+        )
+    names = [name for name in BACKUP_TABLES if name in manifest["tables"]]
+    for name in names:
+        missing = set(manifest["tables"][name]["columns"]) - set(Base.metadata.tables[name].columns.keys())
+        if missing:
+            raise BackupError(f"Backup of {name} has columns the target lacks: {sorted(missing)}")
+
+    with engine.begin() as connection:
+        occupied = [
+            name for name in names if connection.execute(select(func.count()).select_from(Base.metadata.tables[name])).scalar()
+        ]
+        if occupied and not replace:
+            raise BackupError(f"Target tables are not empty: {occupied}; pass replace=True to overwrite them")
+        for name in reversed([table.name for table in Base.metadata.sorted_tables if table.name in _cleared_by(occupied)]):
+            deleted = connection.execute(Base.metadata.tables[name].delete()).rowcount
+            if name not in names:
+                logger.info("Cleared %s rows of %s that referenced replaced rows", deleted, name)
+
+    workers = 1 if engine.dialect.name == "sqlite" else max(1, settings.workers)
+    restored = {name: 0 for name in names}
+    lock = threading.Lock()
+    in_flight = threading.BoundedSemaphore(workers * 2)
+
+    def load(table: Table, records: List[Dict[str, Any]]) -> None:
+        try:
+            with engine.begin() as connection:
+                insert_records(connection, table, records, use_copy=settings.use_copy)
+            with lock:
+                restored[table.name] += len(records)
+        finally:
+            in_flight.release()
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="restore") as pool:
+        for level in restore_levels(names):
+            started = time.perf_counter()
+            futures: List[Future] = []
+            for name in level:
+                table = Base.metadata.tables[name]
+                decode = _decoder(table)
+                path = directory / manifest["tables"][name]["file"]
+                for chunk in _read_chunks(path, settings.batch_size):
+                    in_flight.acquire()
+                    futures.append(pool.submit(load, table, [decode(record) for record in chunk]))
+            # Children are only loaded once their parents have fully committed;
+            # result() re-raises the first failed chunk.
+            for future in futures:
+                future.result()
+            logger.info(
+                "Restored %s in %.1fs",
+                ", ".join(f"{restored[name]} {name}" for name in level),
+                time.perf_counter() - started,
+            )
+
+    for name in names:
+        expected = manifest["tables"][name]["rows"]
+        if restored[name] != expected:
+            raise BackupError(f"Restored {restored[name]} rows of {name}, manifest lists {expected}")
+    return restored
+
+
+def load_backup_settings() -> BackupSettings:
+    return BackupSettings(
+        batch_size=max(1, int(os.getenv("BACKUP_BATCH_SIZE", "10000"))),
+        workers=max(1, int(os.getenv("BACKUP_RESTORE_WORKERS", "4"))),
+        compress_level=min(9, max(1, int(os.getenv("BACKUP_COMPRESS_LEVEL", "6")))),
+        use_copy=os.getenv("BACKUP_USE_COPY", "true").lower() in {"1", "true", "yes"},
+    )
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+from typing import Any, Dict, Optional, Sequence
+
+from sqlalchemy import Table, insert
+from sqlalchemy.engine import Connection
+
+from models import CompactUUID, uuid_key
+
+
+def copy_cursor(connection: Connection) -> Optional[Any]:
+    """A psycopg 3 cursor on ``connection`` when ``COPY FROM STDIN`` is available, else None."""
+    if connection.dialect.name != "postgresql":
+        return None
+    cursor = connection.connection.dbapi_connection.cursor()
+    if hasattr(cursor, "copy"):
+        return cursor
+    cursor.close()
+    return None
+
+
+def copy_records(cursor: Any, target: str, table: Table, records: Sequence[Dict[str, Any]]) -> None:
+    """Stream ``records`` into ``target`` (``table`` itself or a staging copy) with COPY.
+
+    COPY bypasses SQLAlchemy's bind processing, so key columns are converted to
+    ``uuid.UUID`` here the way ``CompactUUID`` would.
+    """
+    columns = list(records[0])
+    keys = {column for column in columns if isinstance(table.c[column].type, CompactUUID)}
+    try:
+        with cursor.copy(f"COPY {target} ({', '.join(columns)}) FROM STDIN") as copy:
+            for record in records:
+                copy.write_row(
+                    [
+                        uuid_key(record[column]) if column in keys and record[column] is not None else record[column]
+                        for column in columns
+                    ]
+                )
+    finally:
+        cursor.close()
+
+
+def insert_records(connection: Connection, table: Table, records: Sequence[Dict[str, Any]], *, use_copy: bool) -> None:
+    """Insert ``records`` with one COPY on Postgres, or one ``executemany`` elsewhere."""
+    if not records:
+        return
+    cursor = copy_cursor(connection) if use_copy else None
+    if cursor is not None:
+        copy_records(cursor, table.name, table, records)
+        return
+    connection.execute(insert(table), records)
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import List, Optional, Sequence, Tuple
+
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+# More ranges than this in one request is treated as abuse and answered with
+# the whole representation instead (RFC 9110 allows ignoring Range).
+MAX_RANGES = 16
+
+
+class RangeNotSatisfiable(ValueError):
+    pass
+
+
+def parse_range_header(header: Optional[str], size: int) -> Optional[List[Tuple[int, int]]]:
+    """Inclusive ``(first, last)`` byte pairs requested by ``header`` for a ``size``-byte body.
+
+    None means "serve the whole body": no header, a unit other than bytes, bad
+    syntax or too many ranges. Raises ``RangeNotSatisfiable`` when the header is
+    valid but no range overlaps the body. Overlapping or adjacent ranges are
+    merged, as RFC 9110 recommends.
+    """
+    if not header:
+        return None
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or not spec.strip():
+        return None
+    parts = spec.split(",")
+    if len(parts) > MAX_RANGES:
+        return None
+
+    ranges: List[Tuple[int, int]] = []
+    for part in parts:
+        first_text, dash, last_text = part.strip().partition("-")
+        if not dash:
+            return None
+        first_text, last_text = first_text.strip(), last_text.strip()
+        if not (first_text.isdigit() or (not first_text and last_text)) or (last_text and not last_text.isdigit()):
+            return None
+        if not first_text:
+            suffix = int(last_text)
+            if suffix and size:
+                ranges.append((max(0, size - suffix), size - 1))
+            continue
+        first = int(first_text)
+        if last_text and int(last_text) < first:
+            return None
+        if first < size:
+            ranges.append((first, min(int(last_text), size - 1) if last_text else size - 1))
+    if not ranges:
+        raise RangeNotSatisfiable(header)
+
+    ranges.sort()
+    merged = [ranges[0]]
+    for first, last in ranges[1:]:
+        if first <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], last))
+        else:
+            merged.append((first, last))
+    return merged
+
+
+def http_date(value: datetime) -> str:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+
+def if_range_matches(header: Optional[str], etag: str, last_modified: datetime) -> bool:
+    """Whether a ``Range`` may be honoured given the request's ``If-Range`` validator.
+
+    An entity tag must match strongly; an HTTP date must equal the
+    last-modification time to the second.
+    """
+    if not header:
+        return True
+    header = header.strip()
+    if header.startswith('"') or header.startswith("W/"):
+        return header == etag
+    try:
+        since = parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return False
+    if last_modified.tzinfo is None:
+        last_modified = last_modified.replace(tzinfo=timezone.utc)
+    return since.tzinfo is not None and int(since.timestamp()) == int(last_modified.timestamp())
+
+
+class RangeAwareGZipMiddleware(GZipMiddleware):
+    """``GZipMiddleware`` that never compresses byte-range downloads.
+
+    Range offsets, Content-Length and the ETag address the unencoded body, so a
+    download that was compressed once cannot be resumed with a Range request.
+    Requests carrying ``Range`` and paths ending in one of ``identity_suffixes``
+    are passed through untouched.
+    """
+
+    def __init__(self, app: ASGIApp, identity_suffixes: Sequence[str] = (), **kwargs) -> None:
+        super().__init__(app, **kwargs)
+        self.identity_suffixes = tuple(identity_suffixes)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and (
+            scope["path"].endswith(self.identity_suffixes)
+            or any(name == b"range" for name, _ in scope["headers"])
+        ):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
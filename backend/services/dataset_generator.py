@@ -0,0 +1,239 @@
+from __future__ import annotations
+
+import itertools
+import logging
+import random
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from sqlalchemy import Table, insert
+from sqlalchemy.orm import Session
+
+from models import Poll, PollVariant, User, Vote
+from services.bulk_load import insert_records
+
+logger = logging.getLogger("survey_backend.dataset_generator")
+
+SAMPLE_CHUNK = 1_000_000
+MULTI_POLL_SHARE = 0.3
+SECONDS_PER_DAY = 86_400
+
+
+@dataclass(frozen=True)
+class DatasetSpec:
+    users: int
+    polls: int
+    # Poll participations to draw; a voter in a multi-select poll adds one vote
+    # row per selected variant.
+    ballots: int
+    seed: int
+    zipf_exponent: float = 1.1
+    max_variants: int = 8
+    history_days: int = 365
+    batch_size: int = 10_000
+    anchor: datetime = field(default_factory=lambda: datetime.now(timezone.utc).replace(tzinfo=None))
+
+
+@dataclass(frozen=True)
+class GenerationProgress:
+    table: str
+    written: int
+    elapsed_seconds: float
+
+
+@dataclass(frozen=True)
+class _GeneratedPoll:
+    id: uuid.UUID
+    created_at: datetime
+    multi: bool
+    max_selections: int
+    variant_ids: List[uuid.UUID]
+    variant_weights: List[float]
+
+
+def zipf_cumulative_weights(count: int, exponent: float) -> List[float]:
+    """Cumulative weights of ranks ``1..count`` under Zipf's law, for ``random.choices``."""
+    return list(itertools.accumulate(1.0 / rank**exponent for rank in range(1, count + 1)))
+
+
+class DatasetGenerator:
+    """Builds a large synthetic dataset for load tests, reproducible from ``spec.seed``.
+
+    Poll popularity follows Zipf's law over a shuffled ranking, so a few polls get
+    most of the ballots; within a poll, early variants are favoured the same way.
+    Every value comes from one ``random.Random(seed)`` consumed in a fixed order, so
+    the same spec (including ``anchor``) always yields the same rows. Rows are
+    written in ``batch_size`` chunks through ``services.bulk_load`` (COPY on
+    Postgres, ``executemany`` elsewhere), one transaction per chunk.
+    """
+
+    def __init__(
+        self,
+        db: Session,
+        spec: DatasetSpec,
+        password_hash: str,
+        *,
+        use_copy: bool = True,
+        progress: Optional[Callable[[GenerationProgress], None]] = None,
+    ) -> None:
+        if spec.users < 1 or spec.polls < 0 or spec.ballots < 0:
+            raise ValueError("users must be positive; polls and ballots must not be negative")
+        if spec.max_variants < 2:
+            raise ValueError("max_variants must be at least 2")
+        self.db = db
+        self.spec = spec
+        self.password_hash = password_hash
+        self.use_copy = use_copy
+        self.progress = progress or _log_progress
+        self.rng = random.Random(spec.seed)
+        # Sequential row numbers in the low bits of a random 64-bit prefix: unique,
+        # derivable from the index alone, and never held in memory all at once.
+        self._user_prefix = self.rng.getrandbits(64) << 64
+        self._vote_prefix = self.rng.getrandbits(64) << 64
+
+    def user_id(self, index: int) -> uuid.UUID:
+        return uuid.UUID(int=self._user_prefix | index, version=4)
+
+    def run(self) -> Dict[str, int]:
+        """Generate everything; returns the number of rows written per table."""
+        written = {"users": self._write_users()}
+        polls = self._generate_polls()
+        written["polls"] = self._write(Poll.__table__, self._poll_records(polls))
+        written["poll_variants"] = self._write(PollVariant.__table__, self._variant_records(polls))
+        written["votes"] = self._write(Vote.__table__, self._vote_records(polls))
+        return written
+
+    def _write_users(self) -> int:
+        spec = self.spec
+        seconds = spec.history_days * SECONDS_PER_DAY
+        records = (
+            {
+                "id": self.user_id(index),
+                "username": f"load{spec.seed}_{index}",
+                "email": f"load{spec.seed}_{index}@load.test",
+                "name": f"Нагрузочный пользователь {index}",
+                "role": "user",
+                "password_hash": self.password_hash,
+                "created_at": spec.anchor - timedelta(seconds=self.rng.randrange(seconds)),
+                "avatar_url": None,
+            }
+            for index in range(spec.users)
+        )
+        return self._write(User.__table__, records)
+
+    def _generate_polls(self) -> List[_GeneratedPoll]:
+        spec, rng = self.spec, self.rng
+        polls = []
+        for _ in range(spec.polls):
+            variant_count = rng.randint(2, spec.max_variants)
+            multi = rng.random() < MULTI_POLL_SHARE
+            polls.append(
+                _GeneratedPoll(
+                    id=uuid.UUID(int=rng.getrandbits(128), version=4),
+                    created_at=spec.anchor - timedelta(seconds=rng.randrange(spec.history_days * SECONDS_PER_DAY)),
+                    multi=multi,
+                    max_selections=rng.randint(2, variant_count) if multi else 1,
+                    variant_ids=[uuid.UUID(int=rng.getrandbits(128), version=4) for _ in range(variant_count)],
+                    variant_weights=zipf_cumulative_weights(variant_count, 1.0),
+                )
+            )
+        return polls
+
+    def _poll_records(self, polls: Sequence[_GeneratedPoll]):
+        rng, anchor = self.rng, self.spec.anchor
+        for index, poll in enumerate(polls):
+            roll = rng.random()
+            # Mostly open polls, some closed and some without a deadline.
+            if roll < 0.8:
+                deadline = anchor + timedelta(days=rng.randint(1, 60))
+            elif roll < 0.9:
+                deadline = anchor - timedelta(days=rng.randint(1, 30))
+            else:
+                deadline = None
+            yield {
+                "id": poll.id,
+                "title": f"Нагрузочный опрос {index}",
+                "description": None,
+                "deadline_iso": deadline,
+                "type": "multi" if poll.multi else "single",
+                "max_selections": poll.max_selections,
+                "is_anonymous": rng.random() < 0.5,
+                "created_at": poll.created_at,
+                "owner_user_id": self.user_id(rng.randrange(self.spec.users)),
+            }
+
+    def _variant_records(self, polls: Sequence[_GeneratedPoll]):
+        for poll in polls:
+            for position, variant_id in enumerate(poll.variant_ids, start=1):
+                yield {"id": variant_id, "poll_id": poll.id, "label": f"Вариант {position}", "created_at": poll.created_at}
+
+    def _ballots_per_poll(self, count: int) -> List[int]:
+        spec, rng = self.spec, self.rng
+        ranking = list(range(count))
+        rng.shuffle(ranking)
+        weights = zipf_cumulative_weights(count, spec.zipf_exponent)
+        per_rank = [0] * count
+        remaining = spec.ballots
+        while remaining:
+            chunk = min(remaining, SAMPLE_CHUNK)
+            for rank in rng.choices(range(count), cum_weights=weights, k=chunk):
+                per_rank[rank] += 1
+            remaining -= chunk
+        # A user votes at most once per poll, so the hottest polls saturate at
+        # every user; those excess ballots are dropped.
+        return [min(per_rank[ranking[index]], spec.users) for index in range(count)]
+
+    def _vote_records(self, polls: Sequence[_GeneratedPoll]):
+        if not polls:
+            return
+        rng = self.rng
+        sequence = itertools.count()
+        for poll, ballots in zip(polls, self._ballots_per_poll(len(polls))):
+            if not ballots:
+                continue
+            voters = rng.sample(range(self.spec.users), ballots)
+            window = max(1, int((self.spec.anchor - poll.created_at).total_seconds()))
+            if poll.multi:
+                choices = [rng.sample(poll.variant_ids, rng.randint(1, poll.max_selections)) for _ in voters]
+            else:
+                choices = [[variant] for variant in rng.choices(poll.variant_ids, cum_weights=poll.variant_weights, k=ballots)]
+            for voter, selected in zip(voters, choices):
+                created_at = poll.created_at + timedelta(seconds=rng.randrange(window))
+                user_id = self.user_id(voter)
+                for variant_id in selected:
+                    yield {
+                        "id": uuid.UUID(int=self._vote_prefix | next(sequence), version=4),
+                        "poll_id": poll.id,
+                        "variant_id": variant_id,
+                        "user_id": user_id,
+                        "created_at": created_at,
+                    }
+
+    def _write(self, table: Table, records) -> int:
+        written = 0
+        started = time.perf_counter()
+        batch: List[Dict[str, Any]] = []
+        for record in records:
+            batch.append(record)
+            if len(batch) >= self.spec.batch_size:
+                written += self._flush(table, batch)
+                batch = []
+                self.progress(GenerationProgress(table.name, written, time.perf_counter() - started))
+        if batch:
+            written += self._flush(table, batch)
+            self.progress(GenerationProgress(table.name, written, time.perf_counter() - started))
+        return written
+
+    def _flush(self, table: Table, batch: List[Dict[str, Any]]) -> int:
+        connection = self.db.connection(bind_arguments={"clause": insert(table)})
+        insert_records(connection, table, batch, use_copy=self.use_copy)
+        self.db.commit()
+        return len(batch)
+
+
+def _log_progress(progress: GenerationProgress) -> None:
+    rate = progress.written / progress.elapsed_seconds if progress.elapsed_seconds else 0.0
+    logger.info("Generated %s %s rows (%.0f rows/s)", progress.written, progress.table, rate)
@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Type
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import Pool, QueuePool
+
+from metrics import LatencyHistogram
+
+POOL_LIVENESS_STRATEGIES = ("pre_ping", "recycle")
+DEFAULT_RECYCLE_LIVENESS_SECONDS = 300
+
+
+@dataclass(frozen=True)
+class PoolSettings:
+    size: int
+    max_overflow: int
+    timeout_seconds: float
+    recycle_seconds: int
+    liveness: str
+
+    def engine_kwargs(self) -> Dict[str, Any]:
+        recycle = self.recycle_seconds
+        if self.liveness == "recycle" and recycle <= 0:
+            recycle = DEFAULT_RECYCLE_LIVENESS_SECONDS
+        return {
+            "pool_size": self.size,
+            "max_overflow": self.max_overflow,
+            "pool_timeout": self.timeout_seconds,
+            "pool_recycle": recycle,
+            # "recycle" trades the per-checkout SELECT 1 for retiring connections before
+            # the server or a proxy drops them; a stale one can still fail a request.
+            "pool_pre_ping": self.liveness == "pre_ping",
+        }
+
+
+class PoolMonitor:
+    """Pool saturation metrics fed by pool events and a timed checkout wrapper.
+
+    Pool events count connections being opened, checked out and invalidated. None of them fires before a checkout starts waiting, so the
+    wait time and timeouts are measured around ``Pool.connect`` by the pool
+    class from ``monitored_pool_class``.
+    """
+
+    def __init__(self, settings: PoolSettings) -> None:
+        self.settings = settings
+        self._lock = threading.Lock()
+        self._pool: Optional[Pool] = None
+        self._checkouts = 0
+        self._timeouts = 0
+        self._connections_opened = 0
+        self._invalidations = 0
+        self._checkout_wait = LatencyHistogram(LatencyHistogram.DEFAULT_BUCKETS_MS + (10_000, 30_000))
+
+    def attach(self, pool: Pool) -> None:
+        self.track(pool)
+        event.listen(pool, "connect", self._on_connect)
+        event.listen(pool, "checkout", self._on_checkout)
+        event.listen(pool, "invalidate", self._on_invalidate)
+
+    def track(self, pool: Pool) -> None:
+        self._pool = pool
+
+    def _on_connect(self, dbapi_connection, connection_record) -> None:
+        with self._lock:
+            self._connections_opened += 1
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy) -> None:
+        with self._lock:
+            self._checkouts += 1
+
+    def _on_invalidate(self, dbapi_connection, connection_record, exception) -> None:
+        with self._lock:
+            self._invalidations += 1
+
+    def observe_wait(self, seconds: float, *, timed_out: bool) -> None:
+        self._checkout_wait.observe(seconds)
+        if timed_out:
+            with self._lock:
+                self._timeouts += 1
+
+    def stats(self) -> Dict[str, Any]:
+        pool = self._pool
+        occupancy: Dict[str, Any] = {}
+        if isinstance(pool, QueuePool):
+            occupancy = {
+                "size": pool.size(),
+                "checkedOut": pool.checkedout(),
+                "checkedIn": pool.checkedin(),
+                "overflow": max(pool.overflow(), 0),
+            }
+        with self._lock:
+            counters = {
+                "checkouts": self._checkouts,
+                "timeouts": self._timeouts,
+                "connectionsOpened": self._connections_opened,
+                "invalidations": self._invalidations,
+            }
+        return {
+            "poolClass": type(pool).__name__ if pool is not None else None,
+            "maxOverflow": self.settings.max_overflow,
+            "timeoutSeconds": self.settings.timeout_seconds,
+            "recycleSeconds": self.settings.engine_kwargs()["pool_recycle"],
+            "liveness": self.settings.liveness,
+            **occupancy,
+            **counters,
+            "checkoutWait": self._checkout_wait.snapshot(),
+        }
+
+
+def monitored_pool_class(monitor: PoolMonitor, base: Type[QueuePool] = QueuePool) -> Type[QueuePool]:
+    """QueuePool subclass that times every checkout into ``monitor``.
+
+    The monitor is bound on the class rather than the instance because
+    ``engine.dispose()`` rebuilds the pool through ``self.__class__``. Pass
+    ``AsyncAdaptedQueuePool`` as ``base`` for an async engine; its checkouts
+    run inside the greenlet bridge, so the same synchronous timing applies.
+    """
+
+    class MonitoredQueuePool(base):
+        def connect(self):
+            started_at = time.perf_counter()
+            try:
+                connection = super().connect()
+            except PoolTimeoutError:
+                monitor.observe_wait(time.perf_counter() - started_at, timed_out=True)
+                raise
+            monitor.observe_wait(time.perf_counter() - started_at, timed_out=False)
+            return connection
+
+        def recreate(self):
+            # Listeners travel with the pool's dispatch; only the stats target moves.
+            pool = super().recreate()
+            monitor.track(pool)
+            return pool
+
+    return MonitoredQueuePool
+
+
+def load_pool_settings() -> PoolSettings:
+    liveness = os.getenv("DB_POOL_LIVENESS", "pre_ping").strip().lower()
+    if liveness not in POOL_LIVENESS_STRATEGIES:
+        raise ValueError(f"DB_POOL_LIVENESS must be one of {POOL_LIVENESS_STRATEGIES}, got {liveness!r}")
+    return PoolSettings(
+        size=max(1, int(os.getenv("DB_POOL_SIZE", "5"))),
+        max_overflow=max(0, int(os.getenv("DB_MAX_OVERFLOW", "10"))),
+        timeout_seconds=max(0.1, float(os.getenv("DB_POOL_TIMEOUT_SECONDS", "30"))),
+        recycle_seconds=int(os.getenv("DB_POOL_RECYCLE_SECONDS", "-1")),
+        liveness=liveness,
+    )
@@ -0,0 +1,294 @@
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Protocol
+
+from services.auth_service import AuthError
+
+
+class LoginThrottledError(AuthError):
+    def __init__(self, retry_after_seconds: int) -> None:
+        super().__init__("Too many login attempts. Try again later", status_code=429)
+        self.retry_after_seconds = retry_after_seconds
+
+
+@dataclass(frozen=True)
+class LoginThrottleSettings:
+    enabled: bool
+    window_seconds: int
+    max_failures_per_ip: int
+    max_failures_per_identifier: int
+    base_lockout_seconds: int
+    max_lockout_seconds: int
+    max_tracked_keys: int
+    sqlite_path: Optional[str] = None
+
+
+@dataclass
+class ThrottleState:
+    failures: List[float] = field(default_factory=list)
+    lockouts: int = 0
+    locked_until: float = 0.0
+    last_seen: float = 0.0
+
+
+StateMutator = Callable[[Optional[ThrottleState]], Optional[ThrottleState]]
+
+
+class ThrottleStore(Protocol):
+    backend: str
+
+    def get(self, key: str) -> Optional[ThrottleState]:
+        ...
+
+    def update(self, key: str, mutator: StateMutator) -> Optional[ThrottleState]:
+        ...
+
+    def size(self) -> int:
+        ...
+
+
+class MemoryThrottleStore:
+    """Per-process LRU of throttle states capped at ``max_keys`` entries."""
+
+    backend = "memory"
+
+    def __init__(self, *, max_keys: int) -> None:
+        self.max_keys = max(1, max_keys)
+        self._states: OrderedDict[str, ThrottleState] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[ThrottleState]:
+        with self._lock:
+            state = self._states.get(key)
+            if state is None:
+                return None
+            return ThrottleState(list(state.failures), state.lockouts, state.locked_until, state.last_seen)
+
+    def update(self, key: str, mutator: StateMutator) -> Optional[ThrottleState]:
+        with self._lock:
+            updated = mutator(self._states.get(key))
+            if updated is None:
+                self._states.pop(key, None)
+                return None
+            self._states[key] = updated
+            self._states.move_to_end(key)
+            while len(self._states) > self.max_keys:
+                self._states.popitem(last=False)
+            return updated
+
+    def size(self) -> int:
+        with self._lock:
+            return len(self._states)
+
+
+class SqliteThrottleStore:
+    """Throttle states shared by several workers on one host through a SQLite file."""
+
+    backend = "sqlite"
+    PRUNE_EVERY_WRITES = 500
+
+    def __init__(self, path: str, *, max_keys: int, retention_seconds: float) -> None:
+        self.path = path
+        self.max_keys = max(1, max_keys)
+        self.retention_seconds = retention_seconds
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._connection = sqlite3.connect(path, timeout=5.0, isolation_level=None, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS login_throttle (
+                key TEXT PRIMARY KEY,
+                failures TEXT NOT NULL,
+                lockouts INTEGER NOT NULL,
+                locked_until REAL NOT NULL,
+                last_seen REAL NOT NULL
+            )
+            """
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS ix_login_throttle_last_seen ON login_throttle (last_seen)")
+
+    def _read(self, key: str) -> Optional[ThrottleState]:
+        row = self._connection.execute(
+            "SELECT failures, lockouts, locked_until, last_seen FROM login_throttle WHERE key = ?",
+            (key,),
+        ).fetchone()
+        if row is None:
+            return None
+        return ThrottleState(json.loads(row[0]), int(row[1]), float(row[2]), float(row[3]))
+
+    def get(self, key: str) -> Optional[ThrottleState]:
+        with self._lock:
+            return self._read(key)
+
+    def update(self, key: str, mutator: StateMutator) -> Optional[ThrottleState]:
+        with self._lock:
+            # BEGIN IMMEDIATE serializes read-modify-write across worker processes.
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                updated = mutator(self._read(key))
+                if updated is None:
+                    self._connection.execute("DELETE FROM login_throttle WHERE key = ?", (key,))
+                else:
+                    self._connection.execute(
+                        """
+                        INSERT INTO login_throttle (key, failures, lockouts, locked_until, last_seen)
+                        VALUES (?, ?, ?, ?, ?)
+                        ON CONFLICT(key) DO UPDATE SET
+                            failures = excluded.failures,
+                            lockouts = excluded.lockouts,
+                            locked_until = excluded.locked_until,
+                            last_seen = excluded.last_seen
+                        """,
+                        (key, json.dumps(updated.failures), updated.lockouts, updated.locked_until, updated.last_seen),
+                    )
+                self._writes += 1
+                if self._writes % self.PRUNE_EVERY_WRITES == 0:
+                    self._prune(time.time())
+                self._connection.execute("COMMIT")
+            except Exception:
+                self._connection.execute("ROLLBACK")
+                raise
+            return updated
+
+    def _prune(self, now: float) -> None:
+        self._connection.execute(
+            "DELETE FROM login_throttle WHERE last_seen < ? AND locked_until < ?",
+            (now - self.retention_seconds, now),
+        )
+        self._connection.execute(
+            """
+            DELETE FROM login_throttle WHERE key IN (
+                SELECT key FROM login_throttle ORDER BY last_seen DESC LIMIT -1 OFFSET ?
+            )
+            """,
+            (self.max_keys,),
+        )
+
+    def size(self) -> int:
+        with self._lock:
+            return int(self._connection.execute("SELECT COUNT(*) FROM login_throttle").fetchone()[0])
+
+
+class LoginThrottle:
+    """Sliding-window failure counting per client IP and per login identifier.
+
+    Reaching the failure threshold inside the window locks the key out for
+    ``base_lockout_seconds * 2 ** (lockouts - 1)`` seconds, capped at
+    ``max_lockout_seconds``. Checks only touch the store, so throttled attempts are
+    rejected before any password hashing is done.
+    """
+
+    def __init__(self, settings: LoginThrottleSettings, store: ThrottleStore) -> None:
+        self.settings = settings
+        self.store = store
+        self._lock = threading.Lock()
+        self._rejected = 0
+        self._lockouts = 0
+
+    @staticmethod
+    def _keys(client_ip: Optional[str], identifier: str) -> Dict[str, str]:
+        keys = {"identifier": f"id:{identifier.strip().lower()}"}
+        if client_ip:
+            keys["ip"] = f"ip:{client_ip}"
+        return keys
+
+    def _threshold(self, kind: str) -> int:
+        if kind == "ip":
+            return self.settings.max_failures_per_ip
+        return self.settings.max_failures_per_identifier
+
+    def check(self, client_ip: Optional[str], identifier: str) -> None:
+        if not self.settings.enabled:
+            return
+        now = time.time()
+        locked_until = 0.0
+        for key in self._keys(client_ip, identifier).values():
+            state = self.store.get(key)
+            if state is not None:
+                locked_until = max(locked_until, state.locked_until)
+        if locked_until > now:
+            with self._lock:
+                self._rejected += 1
+            raise LoginThrottledError(max(1, int(locked_until - now + 0.999)))
+
+    def record_failure(self, client_ip: Optional[str], identifier: str) -> None:
+        if not self.settings.enabled:
+            return
+        now = time.time()
+        for kind, key in self._keys(client_ip, identifier).items():
+            self.store.update(key, lambda state, kind=kind: self._register_failure(state, now, self._threshold(kind)))
+
+    def record_success(self, client_ip: Optional[str], identifier: str) -> None:
+        if not self.settings.enabled:
+            return
+        # Only the account key is cleared: one valid login must not wipe an IP's stuffing history.
+        self.store.update(self._keys(client_ip, identifier)["identifier"], lambda state: None)
+
+    def _register_failure(self, state: Optional[ThrottleState], now: float, threshold: int) -> ThrottleState:
+        state = state or ThrottleState()
+        if now - state.last_seen > max(self.settings.window_seconds, self.settings.max_lockout_seconds):
+            state.lockouts = 0
+        window_start = now - self.settings.window_seconds
+        state.failures = [ts for ts in state.failures if ts > window_start]
+        state.failures.append(now)
+        # Never keep more timestamps than the threshold, so each key's footprint is bounded.
+        state.failures = state.failures[-threshold:]
+        state.last_seen = now
+        if len(state.failures) >= threshold:
+            state.lockouts += 1
+            lockout = min(
+                self.settings.base_lockout_seconds * (2 ** (state.lockouts - 1)),
+                self.settings.max_lockout_seconds,
+            )
+            state.locked_until = now + lockout
+            state.failures = []
+            with self._lock:
+                self._lockouts += 1
+        return state
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            rejected = self._rejected
+            lockouts = self._lockouts
+        return {
+            "enabled": self.settings.enabled,
+            "backend": self.store.backend,
+            "trackedKeys": self.store.size(),
+            "maxTrackedKeys": self.settings.max_tracked_keys,
+            "rejected": rejected,
+            "lockouts": lockouts,
+        }
+
+
+def build_login_throttle(settings: LoginThrottleSettings) -> LoginThrottle:
+    store: ThrottleStore
+    if settings.sqlite_path:
+        store = SqliteThrottleStore(
+            settings.sqlite_path,
+            max_keys=settings.max_tracked_keys,
+            retention_seconds=max(settings.window_seconds, settings.max_lockout_seconds),
+        )
+    else:
+        store = MemoryThrottleStore(max_keys=settings.max_tracked_keys)
+    return LoginThrottle(settings, store)
+
+
+def load_login_throttle_settings() -> LoginThrottleSettings:
+    return LoginThrottleSettings(
+        enabled=os.getenv("LOGIN_THROTTLE_ENABLED", "true").lower() in {"1", "true", "yes"},
+        window_seconds=max(1, int(os.getenv("LOGIN_THROTTLE_WINDOW_SECONDS", "300"))),
+        max_failures_per_ip=max(1, int(os.getenv("LOGIN_THROTTLE_MAX_FAILURES_PER_IP", "50"))),
+        max_failures_per_identifier=max(1, int(os.getenv("LOGIN_THROTTLE_MAX_FAILURES_PER_IDENTIFIER", "5"))),
+        base_lockout_seconds=max(1, int(os.getenv("LOGIN_THROTTLE_BASE_LOCKOUT_SECONDS", "30"))),
+        max_lockout_seconds=max(1, int(os.getenv("LOGIN_THROTTLE_MAX_LOCKOUT_SECONDS", "3600"))),
+        max_tracked_keys=max(1, int(os.getenv("LOGIN_THROTTLE_MAX_TRACKED_KEYS", "100000"))),
+        sqlite_path=os.getenv("LOGIN_THROTTLE_SQLITE_PATH") or None,
+    )
@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import asyncio
+import functools
+import io
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, BinaryIO, Callable, Dict, Optional, TypeVar
+
+from metrics import LatencyHistogram
+from services.object_upload import MeteredUploadStream, StoredUpload, stream_to_storage
+from services.presigned_storage import UploadedObject, copy_uploaded_object, stat_uploaded_object
+
+T = TypeVar("T")
+
+OPERATIONS = ("put", "get", "stat", "copy", "remove", "bucket")
+
+
+@dataclass(frozen=True)
+class ObjectStorageSettings:
+    max_workers: int
+
+
+class ObjectStorage:
+    """Facade over the blocking MinIO client with per-operation latency metrics.
+
+    Async handlers await the ``a``-prefixed coroutines, which run the call on a
+    dedicated bounded pool, so an upload in flight neither stalls the event loop
+    nor occupies the shared request threadpool. Sync handlers already run on a
+    worker thread and call the plain methods directly.
+    """
+
+    def __init__(self, client: Optional[Any], bucket: str, settings: ObjectStorageSettings) -> None:
+        self.client = client
+        self.bucket = bucket
+        self.settings = settings
+        self._executor = ThreadPoolExecutor(max_workers=settings.max_workers, thread_name_prefix="object-storage")
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._running = 0
+        self._errors = {operation: 0 for operation in OPERATIONS}
+        self._queue_wait = LatencyHistogram()
+        self._latency = {operation: LatencyHistogram(LatencyHistogram.DEFAULT_BUCKETS_MS + (10_000, 30_000)) for operation in OPERATIONS}
+
+    @property
+    def configured(self) -> bool:
+        return self.client is not None
+
+    def _timed(self, operation: str, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        started_at = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        except Exception:
+            with self._lock:
+                self._errors[operation] += 1
+            raise
+        finally:
+            self._latency[operation].observe(time.perf_counter() - started_at)
+
+    async def _submit(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        submitted_at = time.perf_counter()
+
+        def job() -> T:
+            self._queue_wait.observe(time.perf_counter() - submitted_at)
+            with self._lock:
+                self._running += 1
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                with self._lock:
+                    self._running -= 1
+
+        with self._lock:
+            self._in_flight += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, job)
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    def put_stream(self, object_name: str, source: BinaryIO, *, max_size: int, content_type: Optional[str] = None) -> StoredUpload:
+        return self._timed(
+            "put",
+            stream_to_storage,
+            self.client,
+            self.bucket,
+            object_name,
+            source,
+            max_size=max_size,
+            content_type=content_type,
+        )
+
+    def put_bytes(self, object_name: str, payload: bytes, *, content_type: str, cache_control: Optional[str] = None) -> None:
+        metadata = {"Cache-Control": cache_control} if cache_control else None
+        self._timed(
+            "put",
+            self.client.put_object,
+            self.bucket,
+            object_name,
+            io.BytesIO(payload),
+            length=len(payload),
+            content_type=content_type,
+            metadata=metadata,
+        )
+
+    def read(self, object_name: str, *, max_size: Optional[int] = None) -> bytes:
+        """Whole body of a small object; use ``get`` to stream large ones.
+
+        With ``max_size``, stops reading and raises ``UploadTooLargeError`` once the
+        body turns out larger, whatever an earlier ``stat`` reported.
+        """
+        response = self.get(object_name)
+        try:
+            if max_size is not None:
+                return MeteredUploadStream(response, max_size).read()
+            return response.read()
+        finally:
+            response.close()
+            response.release_conn()
+
+    def get(self, object_name: str, *, offset: int = 0, length: int = 0) -> Any:
+        """Open ``object_name`` (or ``length`` bytes of it from ``offset``); latency is time to headers."""
+        if offset or length:
+            return self._timed("get", self.client.get_object, self.bucket, object_name, offset=offset, length=length)
+        return self._timed("get", self.client.get_object, self.bucket, object_name)
+
+    def stat(self, object_name: str) -> Optional[UploadedObject]:
+        return self._timed("stat", stat_uploaded_object, self.client, self.bucket, object_name)
+
+    def copy(self, source_name: str, object_name: str, *, match_etag: Optional[str]) -> None:
+        self._timed("copy", copy_uploaded_object, self.client, self.bucket, source_name, object_name, match_etag)
+
+    def remove(self, object_name: str) -> None:
+        self._timed("remove", self.client.remove_object, self.bucket, object_name)
+
+    def bucket_exists(self) -> bool:
+        return self._timed("bucket", self.client.bucket_exists, self.bucket)
+
+    def ensure_bucket(self) -> bool:
+        """Create the bucket if it is missing; True when it was created."""
+        if self.bucket_exists():
+            return False
+        self._timed("bucket", self.client.make_bucket, self.bucket)
+        return True
+
+    async def aput_stream(self, object_name: str, source: BinaryIO, *, max_size: int, content_type: Optional[str] = None) -> StoredUpload:
+        return await self._submit(
+            functools.partial(self.put_stream, max_size=max_size, content_type=content_type), object_name, source
+        )
+
+    async def aput_bytes(self, object_name: str, payload: bytes, *, content_type: str, cache_control: Optional[str] = None) -> None:
+        await self._submit(
+            functools.partial(self.put_bytes, content_type=content_type, cache_control=cache_control), object_name, payload
+        )
+
+    async def aread(self, object_name: str, *, max_size: Optional[int] = None) -> bytes:
+        return await self._submit(functools.partial(self.read, max_size=max_size), object_name)
+
+    async def aget(self, object_name: str, *, offset: int = 0, length: int = 0) -> Any:
+        return await self._submit(functools.partial(self.get, offset=offset, length=length), object_name)
+
+    async def astat(self, object_name: str) -> Optional[UploadedObject]:
+        return await self._submit(self.stat, object_name)
+
+    async def acopy(self, source_name: str, object_name: str, *, match_etag: Optional[str]) -> None:
+        await self._submit(functools.partial(self.copy, match_etag=match_etag), source_name, object_name)
+
+    async def aremove(self, object_name: str) -> None:
+        await self._submit(self.remove, object_name)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            in_flight = self._in_flight
+            running = self._running
+            errors = dict(self._errors)
+        return {
+            "configured": self.configured,
+            "maxWorkers": self.settings.max_workers,
+            "running": running,
+            "queueDepth": max(in_flight - running, 0),
+            "queueWait": self._queue_wait.snapshot(),
+            "errors": errors,
+            "latency": {operation: histogram.snapshot() for operation, histogram in self._latency.items()},
+        }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def load_object_storage_settings() -> ObjectStorageSettings:
+    return ObjectStorageSettings(max_workers=max(1, int(os.getenv("OBJECT_STORAGE_WORKERS", "8"))))
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import hashlib
+from dataclasses import dataclass
+from typing import Any, BinaryIO, Optional
+
+# MinIO's minimum multipart part size; the client buffers one part (+1 byte) at
+# a time, which is what bounds the memory of an upload.
+UPLOAD_PART_SIZE = 5 * 1024 * 1024
+
+
+class UploadTooLargeError(ValueError):
+    def __init__(self, max_size: int) -> None:
+        super().__init__(f"Upload exceeds {max_size} bytes")
+        self.max_size = max_size
+
+
+class EmptyUploadError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class StoredUpload:
+    size: int
+    sha256: str
+
+
+class MeteredUploadStream:
+    """File-like wrapper that counts and hashes bytes as the storage client pulls them.
+
+    Raising from ``read`` makes MinIO abort the multipart upload, so an oversized
+    or empty upload leaves nothing behind in the bucket.
+    """
+
+    def __init__(self, source: BinaryIO, max_size: int) -> None:
+        self._source = source
+        self._max_size = max_size
+        self._digest = hashlib.sha256()
+        self.size = 0
+
+    def read(self, size: int = -1) -> bytes:
+        # Never ask the source for more than one byte past the limit.
+        budget = self._max_size - self.size + 1
+        chunk = self._source.read(budget if size is None or size < 0 else min(size, budget))
+        if not chunk:
+            if self.size == 0:
+                raise EmptyUploadError("Empty upload")
+            return b""
+        self.size += len(chunk)
+        if self.size > self._max_size:
+            raise UploadTooLargeError(self._max_size)
+        self._digest.update(chunk)
+        return chunk
+
+    @property
+    def sha256(self) -> str:
+        return self._digest.hexdigest()
+
+
+def stream_to_storage(
+    client: Any,
+    bucket: str,
+    object_name: str,
+    source: BinaryIO,
+    *,
+    max_size: int,
+    content_type: Optional[str] = None,
+    part_size: int = UPLOAD_PART_SIZE,
+) -> StoredUpload:
+    """Upload ``source`` to ``bucket`` without knowing its length up front.
+
+    The object is sent as a multipart upload of ``part_size`` parts (a single PUT
+    when it fits in one), while size and SHA-256 are computed on the fly. Raises
+    ``UploadTooLargeError`` as soon as more than ``max_size`` bytes were read and
+    ``EmptyUploadError`` for an empty source. Blocking: call it from a worker thread.
+    """
+    stream = MeteredUploadStream(source, max_size)
+    client.put_object(bucket, object_name, stream, length=-1, part_size=part_size, content_type=content_type)
+    return StoredUpload(size=stream.size, sha256=stream.sha256)
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import warnings
+from contextlib import contextmanager
+from typing import Iterator
+
+import sqlalchemy as sa
+from alembic import op
+
+
+def index_is_invalid(bind, name: str) -> bool:
+    return bool(
+        bind.execute(
+            sa.text(
+                "SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+                "WHERE c.relname = :name AND NOT i.indisvalid"
+            ),
+            {"name": name},
+        ).scalar()
+    )
+
+
+def build_index_concurrently(name: str, definition: str, *, unique: bool = False) -> None:
+    """CREATE INDEX CONCURRENTLY ``name`` ON ``definition``; call inside an autocommit block.
+
+    An interrupted concurrent build leaves an INVALID index behind that IF NOT
+    EXISTS would silently keep, so such a leftover is dropped and built again.
+    """
+    if index_is_invalid(op.get_bind(), name):
+        op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+    op.execute(f"CREATE {'UNIQUE ' if unique else ''}INDEX CONCURRENTLY IF NOT EXISTS {name} ON {definition}")
+
+
+def create_index(name: str, definition: str, *, unique: bool = False) -> None:
+    """Create ``name`` ON ``definition`` (``"table (columns) [WHERE ...]"``) if it is missing.
+
+    Postgres builds it CONCURRENTLY so writers keep going; other dialects get the
+    plain statement.
+    """
+    if op.get_bind().dialect.name != "postgresql":
+        op.execute(f"CREATE {'UNIQUE ' if unique else ''}INDEX IF NOT EXISTS {name} ON {definition}")
+        return
+    with op.get_context().autocommit_block():
+        build_index_concurrently(name, definition, unique=unique)
+
+
+def drop_index(name: str) -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        op.execute(f"DROP INDEX IF EXISTS {name}")
+        return
+    with op.get_context().autocommit_block():
+        op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+
+
+@contextmanager
+def batch_alter_table(table_name: str, **kwargs) -> Iterator:
+    """``op.batch_alter_table`` without the SQLite expression-index reflection warnings.
+
+    SQLite cannot reflect expression indexes such as ``lower(username)``, and a
+    batch rebuild warns about each one on the table or any table it references.
+    Such indexes on the rebuilt table itself are lost and must be replayed.
+    """
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore", message="Skipped unsupported reflection of expression-based index")
+        with op.batch_alter_table(table_name, **kwargs) as batch_op:
+            yield batch_op
@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import os
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+from passlib.context import CryptContext
+from passlib.hash import pbkdf2_sha256
+
+from metrics import LatencyHistogram
+
+T = TypeVar("T")
+
+PBKDF2_MIN_ROUNDS = 10_000
+PBKDF2_MAX_ROUNDS = 2_000_000
+PBKDF2_ROUNDS_STEP = 1_000
+
+
+class PasswordHashingBusyError(Exception):
+    def __init__(self, retry_after_seconds: int) -> None:
+        super().__init__("Password hashing queue is full")
+        self.detail = "Server is busy, please retry later"
+        self.status_code = 503
+        self.retry_after_seconds = retry_after_seconds
+
+
+@dataclass(frozen=True)
+class PasswordHashingSettings:
+    max_workers: int
+    max_queue: int
+    retry_after_seconds: int
+
+
+class PasswordHasher:
+    """Runs CryptContext hashing on a dedicated, size-limited thread pool.
+
+    Callers block until their job finishes, but admission is bounded by
+    ``max_workers + max_queue``: once that many jobs are in flight new ones are
+    rejected immediately instead of piling up in the shared request threadpool.
+    """
+
+    def __init__(self, context: CryptContext, settings: PasswordHashingSettings) -> None:
+        self.context = context
+        self.settings = settings
+        self._executor = ThreadPoolExecutor(max_workers=settings.max_workers, thread_name_prefix="password-hash")
+        self._slots = threading.BoundedSemaphore(settings.max_workers + settings.max_queue)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._running = 0
+        self._rejected = 0
+        self._queue_wait = LatencyHistogram()
+        self._latency = {"hash": LatencyHistogram(), "verify": LatencyHistogram()}
+
+    def hash(self, password: str) -> str:
+        return self._run("hash", self.context.hash, password)
+
+    def verify(self, plain: str, hashed: str) -> bool:
+        return self._run("verify", self.context.verify, plain, hashed)
+
+    def needs_update(self, hashed: str) -> bool:
+        # Pure parsing of the hash header; cheap enough to stay on the caller's thread.
+        return self.context.needs_update(hashed)
+
+    def _run(self, operation: str, fn: Callable[..., T], *args: Any) -> T:
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            raise PasswordHashingBusyError(self.settings.retry_after_seconds)
+
+        submitted_at = time.perf_counter()
+
+        def job() -> T:
+            started_at = time.perf_counter()
+            self._queue_wait.observe(started_at - submitted_at)
+            with self._lock:
+                self._running += 1
+            try:
+                return fn(*args)
+            finally:
+                with self._lock:
+                    self._running -= 1
+                self._latency[operation].observe(time.perf_counter() - started_at)
+
+        with self._lock:
+            self._in_flight += 1
+        try:
+            return self._executor.submit(job).result()
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+            self._slots.release()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            in_flight = self._in_flight
+            running = self._running
+            rejected = self._rejected
+        return {
+            "maxWorkers": self.settings.max_workers,
+            "maxQueue": self.settings.max_queue,
+            "running": running,
+            "queueDepth": max(in_flight - running, 0),
+            "rejected": rejected,
+            "queueWait": self._queue_wait.snapshot(),
+            "hashLatency": self._latency["hash"].snapshot(),
+            "verifyLatency": self._latency["verify"].snapshot(),
+        }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def pbkdf2_context_config(rounds: Optional[int] = None) -> Dict[str, Any]:
+    config: Dict[str, Any] = {"schemes": ["pbkdf2_sha256"], "deprecated": "auto"}
+    if rounds is not None:
+        # Pinning min == max makes needs_update() flag hashes with any other cost,
+        # so a recalibration both upgrades and downgrades stored hashes on login.
+        config.update(
+            pbkdf2_sha256__default_rounds=rounds,
+            pbkdf2_sha256__min_rounds=rounds,
+            pbkdf2_sha256__max_rounds=rounds,
+        )
+    return config
+
+
+def measure_pbkdf2_ms(rounds: int, *, samples: int = 5) -> float:
+    handler = pbkdf2_sha256.using(rounds=rounds)
+    timings = []
+    for _ in range(max(1, samples)):
+        started_at = time.perf_counter()
+        handler.hash("calibration-probe-password")
+        timings.append((time.perf_counter() - started_at) * 1000.0)
+    return statistics.median(timings)
+
+
+def calibrate_pbkdf2_rounds(
+    target_ms: float,
+    *,
+    probe_rounds: int = 20_000,
+    samples: int = 5,
+    measure: Optional[Callable[[int], float]] = None,
+) -> int:
+    """Pick pbkdf2_sha256 rounds so one hash takes about ``target_ms`` on this host.
+
+    pbkdf2 cost is linear in rounds, so a single probe measurement is scaled and
+    then rounded to a whole step and clamped to sane bounds.
+    """
+    if target_ms <= 0:
+        raise ValueError("target_ms must be positive")
+    probe_ms = measure(probe_rounds) if measure else measure_pbkdf2_ms(probe_rounds, samples=samples)
+    if probe_ms <= 0:
+        return PBKDF2_MAX_ROUNDS
+    rounds = int(probe_rounds * target_ms / probe_ms)
+    rounds = int(round(rounds / PBKDF2_ROUNDS_STEP)) * PBKDF2_ROUNDS_STEP
+    return min(max(rounds, PBKDF2_MIN_ROUNDS), PBKDF2_MAX_ROUNDS)
+
+
+def load_password_hashing_settings() -> PasswordHashingSettings:
+    return PasswordHashingSettings(
+        max_workers=max(1, int(os.getenv("PASSWORD_HASH_WORKERS", str(os.cpu_count() or 2)))),
+        max_queue=max(0, int(os.getenv("PASSWORD_HASH_QUEUE_SIZE", "16"))),
+        retry_after_seconds=max(1, int(os.getenv("PASSWORD_HASH_RETRY_AFTER_SECONDS", "2"))),
+    )
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional, Tuple
+
+from minio.commonconfig import CopySource
+from minio.error import S3Error
+
+# S3 caps presigned URLs at seven days.
+MAX_PRESIGN_TTL_SECONDS = 7 * 24 * 3600
+# Presigned PUT URLs only ever point below this prefix. A URL stays usable until
+# it expires, so confirmed uploads are copied out to a name no URL was signed for.
+UPLOAD_STAGING_PREFIX = "uploads/"
+
+
+@dataclass(frozen=True)
+class PresignSettings:
+    enabled: bool
+    ttl_seconds: int
+
+
+@dataclass(frozen=True)
+class UploadedObject:
+    size: int
+    content_type: Optional[str]
+    etag: Optional[str] = None
+
+
+class UploadChangedError(RuntimeError):
+    """The staged object was overwritten after it was inspected."""
+
+
+def presign_upload(client: Any, bucket: str, object_name: str, settings: PresignSettings) -> Tuple[str, datetime]:
+    """A PUT URL the browser can send the object to directly, and its expiry."""
+    expires = timedelta(seconds=settings.ttl_seconds)
+    url = client.presigned_put_object(bucket, object_name, expires=expires)
+    return url, datetime.now(timezone.utc) + expires
+
+
+def presign_download(
+    client: Any,
+    bucket: str,
+    object_name: str,
+    settings: PresignSettings,
+    *,
+    response_headers: Optional[Dict[str, str]] = None,
+) -> Tuple[str, datetime]:
+    """A GET URL for ``object_name``; ``response_headers`` are S3 ``response-*`` overrides."""
+    expires = timedelta(seconds=settings.ttl_seconds)
+    url = client.presigned_get_object(bucket, object_name, expires=expires, response_headers=response_headers)
+    return url, datetime.now(timezone.utc) + expires
+
+
+def stat_uploaded_object(client: Any, bucket: str, object_name: str) -> Optional[UploadedObject]:
+    """Size and content type of an object the client says it uploaded, or None if it is not there."""
+    try:
+        stat = client.stat_object(bucket, object_name)
+    except S3Error as exc:
+        if exc.code in {"NoSuchKey", "NoSuchObject", "ResourceNotFound"}:
+            return None
+        raise
+    return UploadedObject(size=stat.size, content_type=stat.content_type, etag=stat.etag)
+
+
+def copy_uploaded_object(client: Any, bucket: str, source_name: str, object_name: str, etag: Optional[str]) -> None:
+    """Server-side copy of ``source_name`` to ``object_name``, only if it still has ``etag``.
+
+    Raises ``UploadChangedError`` when the source was replaced (or removed) since
+    it was inspected, so the copy is always the object that was validated.
+    """
+    try:
+        client.copy_object(bucket, object_name, CopySource(bucket, source_name, match_etag=etag))
+    except S3Error as exc:
+        if exc.code in {"PreconditionFailed", "NoSuchKey", "NoSuchObject"}:
+            raise UploadChangedError(source_name) from exc
+        raise
+
+
+def load_presign_settings() -> PresignSettings:
+    return PresignSettings(
+        enabled=os.getenv("PRESIGNED_URLS_ENABLED", "false").lower() in {"1", "true", "yes"},
+        ttl_seconds=min(MAX_PRESIGN_TTL_SECONDS, max(1, int(os.getenv("PRESIGNED_URL_TTL_SECONDS", "300")))),
+    )
@@ -0,0 +1,279 @@
+from __future__ import annotations
+
+import itertools
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Type
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.dml import UpdateBase
+
+logger = logging.getLogger("survey_backend.read_replicas")
+
+READ_METHODS = frozenset({"GET", "HEAD"})
+PRIMARY_PINNED_KEY = "replica_primary_pinned"
+REPLICA_INDEX_KEY = "replica_index"
+MAX_TRACKED_WRITERS = 10_000
+POSTGRES_LAG_SQL = text(
+    """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+    """
+)
+
+# True while serving a read request that may go to a replica. Set by
+# ReplicaRoutingMiddleware; sessions opened outside a request always use the primary.
+_replica_reads: ContextVar[bool] = ContextVar("replica_reads", default=False)
+
+
+@dataclass(frozen=True)
+class ReplicaSettings:
+    urls: Tuple[str, ...]
+    read_your_writes_seconds: float
+    max_lag_seconds: float
+    lag_check_interval_seconds: float
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.urls)
+
+
+class ReplicaSet:
+    """Replica health, measured lag and the per-user read-your-writes window.
+
+    Replicas are picked round-robin among those whose last lag check succeeded and
+    stayed under ``max_lag_seconds``. A background thread re-measures the lag every
+    ``lag_check_interval_seconds``; until the first check a replica counts as healthy.
+    """
+
+    def __init__(
+        self,
+        settings: ReplicaSettings,
+        engines: Sequence[Engine],
+        *,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.settings = settings
+        self.engines = list(engines)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._round_robin = itertools.count()
+        self._lag_seconds: List[Optional[float]] = [None] * len(self.engines)
+        self._healthy: List[bool] = [True] * len(self.engines)
+        self._last_error: List[Optional[str]] = [None] * len(self.engines)
+        self._checked_at: Optional[float] = None
+        self._recent_writers: "OrderedDict[str, float]" = OrderedDict()
+        self._replica_reads = 0
+        self._primary_reads = 0
+        self._sticky_reads = 0
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def mark_write(self, keys: Iterable[Optional[str]]) -> None:
+        until = self._clock() + self.settings.read_your_writes_seconds
+        with self._lock:
+            for key in keys:
+                if not key:
+                    continue
+                self._recent_writers.pop(key, None)
+                self._recent_writers[key] = until
+            while len(self._recent_writers) > MAX_TRACKED_WRITERS:
+                self._recent_writers.popitem(last=False)
+
+    def wrote_recently(self, keys: Iterable[Optional[str]]) -> bool:
+        now = self._clock()
+        with self._lock:
+            for key in keys:
+                until = self._recent_writers.get(key) if key else None
+                if until is None:
+                    continue
+                if until > now:
+                    self._sticky_reads += 1
+                    return True
+                del self._recent_writers[key]
+        return False
+
+    def choose(self) -> Optional[int]:
+        """Index of the replica for the next read session, or None for the primary."""
+        with self._lock:
+            healthy = [index for index, ok in enumerate(self._healthy) if ok]
+            if not healthy:
+                self._primary_reads += 1
+                return None
+            self._replica_reads += 1
+            return healthy[next(self._round_robin) % len(healthy)]
+
+    def measure_lag(self) -> List[Optional[float]]:
+        results: List[Tuple[Optional[float], Optional[str]]] = []
+        for engine in self.engines:
+            try:
+                with engine.connect() as connection:
+                    if engine.dialect.name == "postgresql":
+                        lag = float(connection.execute(POSTGRES_LAG_SQL).scalar() or 0.0)
+                    else:
+                        connection.execute(text("SELECT 1"))
+                        lag = 0.0
+                results.append((lag, None))
+            except Exception as exc:
+                results.append((None, f"{type(exc).__name__}: {exc}"))
+        with self._lock:
+            for index, (lag, error) in enumerate(results):
+                self._lag_seconds[index] = lag
+                self._last_error[index] = error
+                self._healthy[index] = lag is not None and lag <= self.settings.max_lag_seconds
+            self._checked_at = self._clock()
+        return [lag for lag, _ in results]
+
+    def start(self) -> None:
+        if not self.engines or self._thread is not None:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._loop, name="replica-lag-monitor", daemon=True)
+        self._thread.start()
+        logger.info(
+            "Routing reads to %s replica(s); lag checked every %ss",
+            len(self.engines),
+            self.settings.lag_check_interval_seconds,
+        )
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop_event.set()
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout=timeout)
+        self._thread = None
+
+    def _loop(self) -> None:
+        while True:
+            try:
+                self.measure_lag()
+            except Exception:
+                logger.exception("Replica lag check failed")
+            if self._stop_event.wait(self.settings.lag_check_interval_seconds):
+                return
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            checked_ago = None if self._checked_at is None else round(self._clock() - self._checked_at, 3)
+            return {
+                "enabled": self.settings.enabled,
+                "readYourWritesSeconds": self.settings.read_your_writes_seconds,
+                "maxLagSeconds": self.settings.max_lag_seconds,
+                "lastCheckSecondsAgo": checked_ago,
+                "replicas": [
+                    {
+                        "url": make_url(str(engine.url)).render_as_string(hide_password=True),
+                        "healthy": self._healthy[index],
+                        "lagSeconds": self._lag_seconds[index],
+                        "lastError": self._last_error[index],
+                    }
+                    for index, engine in enumerate(self.engines)
+                ],
+                "replicaReads": self._replica_reads,
+                "primaryFallbackReads": self._primary_reads,
+                "readYourWritesReads": self._sticky_reads,
+                "trackedWriters": len(self._recent_writers),
+            }
+
+
+def replica_routing_session_class(
+    replicas: ReplicaSet,
+    engines: Sequence[Engine],
+    base: Type[Session] = Session,
+) -> Type[Session]:
+    """Session subclass that reads from a replica while a read request is being served.
+
+    ``engines`` lines up with ``replicas.engines`` (pass the ``sync_engine`` of the
+    async replica engines for an AsyncSession). One replica is picked per session so
+    a request sees a single snapshot. Flushes and DML go to the base bind, and after
+    the first write the session stays on the primary.
+    """
+
+    class ReplicaRoutingSession(base):
+        def get_bind(self, mapper=None, clause=None, **kw):
+            if self._flushing or isinstance(clause, UpdateBase):
+                self.info[PRIMARY_PINNED_KEY] = True
+            elif _replica_reads.get() and not self.info.get(PRIMARY_PINNED_KEY):
+                if REPLICA_INDEX_KEY not in self.info:
+                    self.info[REPLICA_INDEX_KEY] = replicas.choose()
+                index = self.info[REPLICA_INDEX_KEY]
+                if index is not None:
+                    return engines[index]
+            return super().get_bind(mapper=mapper, clause=clause, **kw)
+
+    return ReplicaRoutingSession
+
+
+class ReplicaRoutingMiddleware:
+    """Marks GET/HEAD requests as replica-eligible and records who just wrote.
+
+    A caller is identified by the access-token subject and by client address (the
+    latter covers requests made before a token exists, such as registration). A
+    successful write from either keeps that caller's reads on the primary for the
+    read-your-writes window. The window is per process, like the rest of the
+    in-memory state here.
+    """
+
+    def __init__(self, app, replicas: ReplicaSet, identify: Callable[[str], Optional[str]]) -> None:
+        self.app = app
+        self.replicas = replicas
+        self.identify = identify
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or not self.replicas.engines:
+            await self.app(scope, receive, send)
+            return
+
+        keys = self._caller_keys(scope)
+        if scope["method"] in READ_METHODS:
+            token = _replica_reads.set(not self.replicas.wrote_recently(keys))
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                _replica_reads.reset(token)
+            return
+
+        async def send_wrapper(message) -> None:
+            # Mark before the response leaves, so a read issued as soon as the client
+            # sees it already sticks to the primary.
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                self.replicas.mark_write(keys)
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+    def _caller_keys(self, scope) -> Tuple[Optional[str], Optional[str]]:
+        client = scope.get("client")
+        address = f"addr:{client[0]}" if client else None
+        subject = None
+        for name, value in scope.get("headers", ()):
+            if name == b"authorization":
+                scheme, _, credentials = value.decode("latin-1").partition(" ")
+                if scheme.lower() == "bearer" and credentials:
+                    try:
+                        found = self.identify(credentials.strip())
+                    except Exception:
+                        found = None
+                    subject = f"user:{found}" if found else None
+                break
+        return subject, address
+
+
+def load_replica_settings() -> ReplicaSettings:
+    raw = os.getenv("DATABASE_REPLICA_URLS", "")
+    return ReplicaSettings(
+        urls=tuple(url.strip() for url in raw.split(",") if url.strip()),
+        read_your_writes_seconds=max(0.0, float(os.getenv("DB_READ_YOUR_WRITES_SECONDS", "5"))),
+        max_lag_seconds=max(0.0, float(os.getenv("DB_REPLICA_MAX_LAG_SECONDS", "10"))),
+        lag_check_interval_seconds=max(0.5, float(os.getenv("DB_REPLICA_LAG_CHECK_SECONDS", "5"))),
+    )
@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Optional
+
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from metrics import LatencyHistogram
+from repositories.auth_repository import RefreshSessionRepository
+
+logger = logging.getLogger("survey_backend.session_pruner")
+
+
+@dataclass(frozen=True)
+class SessionPruneSettings:
+    enabled: bool
+    interval_seconds: float
+    batch_size: int
+    max_batches_per_run: int
+    revoked_retention_hours: int
+
+
+class RefreshSessionPruner:
+    """Periodically deletes expired and long-revoked refresh sessions in bounded batches.
+
+    Each batch is its own short transaction so the job never holds locks on a large
+    slice of ``refresh_token_sessions``; a run stops after ``max_batches_per_run``
+    batches and picks up the remainder on the next tick.
+    """
+
+    PHASES = ("expired", "revoked")
+
+    def __init__(self, settings: SessionPruneSettings, session_factory: Callable[[], Session]) -> None:
+        self.settings = settings
+        self.session_factory = session_factory
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._run_lock = threading.Lock()
+        self._runs = 0
+        self._failures = 0
+        self._total_deleted = {phase: 0 for phase in self.PHASES}
+        self._last_run: Optional[Dict[str, Any]] = None
+        self._current_run: Optional[Dict[str, Any]] = None
+        self._last_error: Optional[str] = None
+        self._run_duration = LatencyHistogram(LatencyHistogram.DEFAULT_BUCKETS_MS + (10_000, 30_000, 60_000))
+        self._batch_duration = LatencyHistogram()
+
+    def start(self) -> None:
+        if not self.settings.enabled or self._thread is not None:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._loop, name="refresh-session-pruner", daemon=True)
+        self._thread.start()
+        logger.info(
+            "Refresh session pruning scheduled every %ss (batch size %s)",
+            self.settings.interval_seconds,
+            self.settings.batch_size,
+        )
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop_event.set()
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout=timeout)
+        self._thread = None
+
+    def _loop(self) -> None:
+        while not self._stop_event.wait(self.settings.interval_seconds):
+            try:
+                self.run_once()
+            except Exception:
+                logger.exception("Refresh session pruning run failed")
+
+    def run_once(self, *, now: Optional[datetime] = None) -> Dict[str, int]:
+        with self._run_lock:
+            return self._run(now or datetime.now(timezone.utc))
+
+    def _run(self, now: datetime) -> Dict[str, int]:
+        started_at = time.perf_counter()
+        deleted = {phase: 0 for phase in self.PHASES}
+        progress: Dict[str, Any] = {
+            "startedAt": now.isoformat(),
+            "phase": self.PHASES[0],
+            "batches": 0,
+            "deleted": deleted,
+        }
+        with self._lock:
+            self._current_run = progress
+
+        revoked_cutoff = now - timedelta(hours=self.settings.revoked_retention_hours)
+        error: Optional[str] = None
+        try:
+            for phase in self.PHASES:
+                progress["phase"] = phase
+                while progress["batches"] < self.settings.max_batches_per_run and not self._stop_event.is_set():
+                    batch_started_at = time.perf_counter()
+                    removed = self._delete_batch(phase, now=now, revoked_cutoff=revoked_cutoff)
+                    self._batch_duration.observe(time.perf_counter() - batch_started_at)
+                    progress["batches"] += 1
+                    deleted[phase] += removed
+                    if removed < self.settings.batch_size:
+                        break
+        except SQLAlchemyError as exc:
+            error = f"{type(exc).__name__}: {exc}"
+            logger.exception("Refresh session pruning stopped after %s batches", progress["batches"])
+
+        duration = time.perf_counter() - started_at
+        self._run_duration.observe(duration)
+        with self._lock:
+            self._runs += 1
+            if error:
+                self._failures += 1
+                self._last_error = error
+            for phase, count in deleted.items():
+                self._total_deleted[phase] += count
+            self._current_run = None
+            self._last_run = {
+                "startedAt": progress["startedAt"],
+                "durationMs": round(duration * 1000.0, 3),
+                "batches": progress["batches"],
+                "deleted": dict(deleted),
+                "error": error,
+            }
+        if any(deleted.values()):
+            logger.info(
+                "Pruned %s expired and %s revoked refresh sessions in %.1f ms",
+                deleted["expired"],
+                deleted["revoked"],
+                duration * 1000.0,
+            )
+        return deleted
+
+    def _delete_batch(self, phase: str, *, now: datetime, revoked_cutoff: datetime) -> int:
+        with self.session_factory() as db:
+            repo = RefreshSessionRepository(db)
+            try:
+                if phase == "expired":
+                    removed = repo.delete_expired_batch(now=now, limit=self.settings.batch_size)
+                else:
+                    removed = repo.delete_revoked_before_batch(cutoff=revoked_cutoff, limit=self.settings.batch_size)
+                db.commit()
+            except SQLAlchemyError:
+                db.rollback()
+                raise
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            current = None
+            if self._current_run is not None:
+                current = {**self._current_run, "deleted": dict(self._current_run["deleted"])}
+            return {
+                "enabled": self.settings.enabled,
+                "intervalSeconds": self.settings.interval_seconds,
+                "batchSize": self.settings.batch_size,
+                "runs": self._runs,
+                "failures": self._failures,
+                "totalDeleted": dict(self._total_deleted),
+                "currentRun": current,
+                "lastRun": dict(self._last_run) if self._last_run else None,
+                "lastError": self._last_error,
+                "runDuration": self._run_duration.snapshot(),
+                "batchDuration": self._batch_duration.snapshot(),
+            }
+
+
+def load_session_prune_settings() -> SessionPruneSettings:
+    return SessionPruneSettings(
+        enabled=os.getenv("REFRESH_SESSION_PRUNE_ENABLED", "true").lower() in {"1", "true", "yes"},
+        interval_seconds=max(5.0, float(os.getenv("REFRESH_SESSION_PRUNE_INTERVAL_SECONDS", "900"))),
+        batch_size=max(1, int(os.getenv("REFRESH_SESSION_PRUNE_BATCH_SIZE", "1000"))),
+        max_batches_per_run=max(1, int(os.getenv("REFRESH_SESSION_PRUNE_MAX_BATCHES", "50"))),
+        revoked_retention_hours=max(0, int(os.getenv("REFRESH_SESSION_REVOKED_RETENTION_HOURS", "24"))),
+    )
@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import logging
+import os
+import re
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from metrics import LatencyHistogram
+
+logger = logging.getLogger("survey_backend.sql")
+
+STARTED_AT_ATTRIBUTE = "_sql_instrumentation_started_at"
+MAX_LOGGED_STATEMENT_CHARS = 300
+_WHITESPACE = re.compile(r"\s+")
+# Expanding IN lists and multi-row VALUES render one placeholder per element, so
+# the same query over 3 and over 30 ids would look like different statements.
+_PLACEHOLDER = r"(?:\?|%\(\w+\)s|%s|:\w+|\$\d+)"
+_PLACEHOLDER_LIST = re.compile(rf"\(\s*{_PLACEHOLDER}(?:\s*,\s*{_PLACEHOLDER})+\s*\)")
+
+# The tally of the request being served; None outside instrumented requests, so
+# statements from background jobs cost one ContextVar lookup and nothing else.
+_current_queries: ContextVar[Optional["RequestQueries"]] = ContextVar("sql_request_queries", default=None)
+
+
+@dataclass(frozen=True)
+class SqlInstrumentationSettings:
+    enabled: bool
+    n_plus_one_threshold: int
+
+
+def statement_shape(statement: str) -> str:
+    """The statement with whitespace and placeholder lists normalized."""
+    return _PLACEHOLDER_LIST.sub("(?)", _WHITESPACE.sub(" ", statement).strip())
+
+
+class RequestQueries:
+    """Statements one request sent to the database and the time spent in them."""
+
+    __slots__ = ("count", "seconds", "statements")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.seconds = 0.0
+        self.statements: Counter = Counter()
+
+    def record(self, statement: str, seconds: float) -> None:
+        self.count += 1
+        self.seconds += seconds
+        # Keyed by the raw text (whose hash Python caches); shapes are only
+        # computed when the request is done.
+        self.statements[statement] += 1
+
+    def repeated_shapes(self, threshold: int) -> List[Tuple[str, int]]:
+        shapes: Counter = Counter()
+        for statement, count in self.statements.items():
+            shapes[statement_shape(statement)] += count
+        return [(shape, count) for shape, count in shapes.most_common() if count > threshold]
+
+    def server_timing(self) -> str:
+        return f'db;dur={self.seconds * 1000:.3f};desc="SQL statements: {self.count}"'
+
+
+class SqlInstrumentation:
+    """Per-request statement counts, DB time and N+1 warnings.
+
+    ``instrument`` hooks cursor execution on an engine (pass ``sync_engine`` for an
+    async one); ``SqlInstrumentationMiddleware`` opens a tally per request. Neither
+    is installed when the feature is disabled, so it then costs nothing at all.
+    """
+
+    def __init__(self, settings: SqlInstrumentationSettings) -> None:
+        self.settings = settings
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._statements = 0
+        self._n_plus_one_warnings = 0
+        self._db_time = LatencyHistogram()
+
+    def instrument(self, engine: Engine) -> None:
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+    def finish(self, method: str, path: str, queries: RequestQueries) -> None:
+        repeated = queries.repeated_shapes(self.settings.n_plus_one_threshold)
+        for shape, count in repeated:
+            logger.warning(
+                "Possible N+1 in %s %s: statement ran %s times (%s total statements, %.1f ms in DB): %s",
+                method,
+                path,
+                count,
+                queries.count,
+                queries.seconds * 1000,
+                shape[:MAX_LOGGED_STATEMENT_CHARS],
+            )
+        self._db_time.observe(queries.seconds)
+        with self._lock:
+            self._requests += 1
+            self._statements += queries.count
+            self._n_plus_one_warnings += len(repeated)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            requests, statements, warnings = self._requests, self._statements, self._n_plus_one_warnings
+        return {
+            "enabled": self.settings.enabled,
+            "nPlusOneThreshold": self.settings.n_plus_one_threshold,
+            "requests": requests,
+            "statements": statements,
+            "avgStatementsPerRequest": round(statements / requests, 2) if requests else 0.0,
+            "nPlusOneWarnings": warnings,
+            "dbTimePerRequest": self._db_time.snapshot(),
+        }
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    if context is not None and _current_queries.get() is not None:
+        setattr(context, STARTED_AT_ATTRIBUTE, time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    started_at = getattr(context, STARTED_AT_ATTRIBUTE, None)
+    if started_at is None:
+        return
+    queries = _current_queries.get()
+    if queries is not None:
+        queries.record(statement, time.perf_counter() - started_at)
+
+
+class SqlInstrumentationMiddleware:
+    """Tallies the statements of each HTTP request and reports them in ``Server-Timing``.
+
+    The header goes out with the response start, so statements a streaming
+    response runs afterwards are only counted in the log and the metrics.
+    """
+
+    def __init__(self, app, instrumentation: SqlInstrumentation) -> None:
+        self.app = app
+        self.instrumentation = instrumentation
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        queries = RequestQueries()
+
+        async def send_wrapper(message) -> None:
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", ()))
+                headers.append((b"server-timing", queries.server_timing().encode("latin-1")))
+                message["headers"] = headers
+            await send(message)
+
+        token = _current_queries.set(queries)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current_queries.reset(token)
+            self.instrumentation.finish(scope["method"], scope["path"], queries)
+
+
+def load_sql_instrumentation_settings() -> SqlInstrumentationSettings:
+    return SqlInstrumentationSettings(
+        enabled=os.getenv("SQL_INSTRUMENTATION_ENABLED", "false").lower() in {"1", "true", "yes"},
+        n_plus_one_threshold=max(1, int(os.getenv("SQL_N_PLUS_ONE_THRESHOLD", "10"))),
+    )
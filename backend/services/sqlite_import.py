@@ -0,0 +1,282 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import sqlite3
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import Table, insert, select
+from sqlalchemy.orm import Session
+
+from models import Poll, PollVariant, User, Vote, uuid_key
+from repositories.settings_repository import RuntimeSettingRepository
+from services.bulk_load import copy_cursor, copy_records, insert_records
+
+logger = logging.getLogger("survey_backend.sqlite_import")
+
+CHECKPOINT_SETTING = "bootstrap.sqlite_import.checkpoint"
+DEFAULT_PASSWORD = "changeme"
+
+
+@dataclass(frozen=True)
+class SqliteImportSettings:
+    batch_size: int
+    use_copy: bool
+
+
+@dataclass(frozen=True)
+class ImportProgress:
+    table: str
+    read: int
+    total: int
+    inserted: int
+    elapsed_seconds: float
+
+
+@dataclass(frozen=True)
+class _TableSpec:
+    table: Table
+    required: Tuple[str, ...]
+    optional: Tuple[str, ...]
+    transform: Callable[[sqlite3.Row, "SqliteImporter"], Dict[str, Any]]
+
+
+def _to_datetime(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        if parsed.tzinfo is not None:
+            return parsed.astimezone(timezone.utc).replace(tzinfo=None)
+        return parsed
+    except ValueError:
+        return None
+
+
+def _key(value: Optional[str]) -> Optional[str]:
+    return None if value is None else str(uuid_key(value))
+
+
+def _user_row(row: sqlite3.Row, importer: "SqliteImporter") -> Dict[str, Any]:
+    return {
+        "id": _key(row["id"]),
+        "username": row["username"] or f"user-{row['id'][:8]}",
+        "email": row["email"] or f"{row['id']}@example.local",
+        "name": row["name"] or row["username"] or "Пользователь",
+        "role": row["role"] or "user",
+        "password_hash": row["password_hash"] or importer.default_password_hash(),
+        "created_at": _to_datetime(row["created_at"]) or importer.started_at,
+        "avatar_url": row["avatar_url"],
+    }
+
+
+def _poll_row(row: sqlite3.Row, importer: "SqliteImporter") -> Dict[str, Any]:
+    return {
+        "id": _key(row["id"]),
+        "title": row["title"],
+        "description": row["description"],
+        "deadline_iso": _to_datetime(row["deadline_iso"]),
+        "type": row["type"],
+        "max_selections": row["max_selections"] or 1,
+        "is_anonymous": bool(row["is_anonymous"]),
+        "created_at": _to_datetime(row["created_at"]) or importer.started_at,
+        "owner_user_id": _key(row["owner_user_id"]),
+    }
+
+
+def _variant_row(row: sqlite3.Row, importer: "SqliteImporter") -> Dict[str, Any]:
+    return {
+        "id": _key(row["id"]),
+        "poll_id": _key(row["poll_id"]),
+        "label": row["label"],
+        "created_at": _to_datetime(row["created_at"]) or importer.started_at,
+    }
+
+
+def _vote_row(row: sqlite3.Row, importer: "SqliteImporter") -> Dict[str, Any]:
+    return {
+        "id": _key(row["id"]),
+        "poll_id": _key(row["poll_id"]),
+        "variant_id": _key(row["variant_id"]),
+        "user_id": _key(row["user_id"]),
+        "created_at": _to_datetime(row["created_at"]) or importer.started_at,
+    }
+
+
+# Parents before children, so every chunk only references rows already loaded.
+TABLE_SPECS: Tuple[_TableSpec, ...] = (
+    _TableSpec(
+        User.__table__,
+        ("id", "username", "email", "name", "role", "password_hash"),
+        ("created_at", "avatar_url"),
+        _user_row,
+    ),
+    _TableSpec(
+        Poll.__table__,
+        ("id", "title", "description", "type"),
+        ("deadline_iso", "max_selections", "is_anonymous", "created_at", "owner_user_id"),
+        _poll_row,
+    ),
+    _TableSpec(PollVariant.__table__, ("id", "poll_id", "label"), ("created_at",), _variant_row),
+    _TableSpec(Vote.__table__, ("id", "poll_id", "variant_id", "user_id"), ("created_at",), _vote_row),
+)
+
+
+class SqliteImporter:
+    """Streams a legacy SQLite database into the target database in chunks.
+
+    Source rows are read in ``rowid`` order, ``batch_size`` at a time. Ids already
+    present in the target are dropped with one set-based query per chunk, the rest
+    go in with a single ``executemany`` (or ``COPY`` into a staging table plus an
+    anti-join ``INSERT ... SELECT`` on Postgres). Each chunk commits together with
+    the checkpoint of how far it got, so an interrupted import resumes where it
+    stopped instead of starting over.
+    """
+
+    def __init__(
+        self,
+        db: Session,
+        source_path: Path,
+        settings: SqliteImportSettings,
+        hash_password: Callable[[str], str],
+        *,
+        progress: Optional[Callable[[ImportProgress], None]] = None,
+    ) -> None:
+        self.db = db
+        self.source_path = source_path
+        self.settings = settings
+        self.hash_password = hash_password
+        self.progress = progress or _log_progress
+        self.started_at = datetime.now(timezone.utc).replace(tzinfo=None)
+        self._default_password_hash: Optional[str] = None
+        self._settings_repository = RuntimeSettingRepository(db)
+
+    def default_password_hash(self) -> str:
+        # Hashing is deliberately slow; every user without a hash gets the same
+        # placeholder password anyway, so hash it once per import.
+        if self._default_password_hash is None:
+            self._default_password_hash = self.hash_password(DEFAULT_PASSWORD)
+        return self._default_password_hash
+
+    def load_checkpoint(self) -> Optional[Dict[str, Any]]:
+        stored = self._settings_repository.get(CHECKPOINT_SETTING)
+        if not stored:
+            return None
+        checkpoint = json.loads(stored)
+        return checkpoint if checkpoint.get("source") == str(self.source_path) else None
+
+    def has_unfinished_checkpoint(self) -> bool:
+        checkpoint = self.load_checkpoint()
+        return checkpoint is not None and not checkpoint.get("done")
+
+    def run(self) -> Dict[str, int]:
+        """Import every table; returns the number of rows inserted per table."""
+        checkpoint = self.load_checkpoint() or {}
+        if checkpoint.get("done"):
+            logger.info("SQLite import from %s already completed", self.source_path)
+            return {spec.table.name: 0 for spec in TABLE_SPECS}
+        positions: Dict[str, int] = dict(checkpoint.get("positions", {}))
+
+        source = sqlite3.connect(f"file:{self.source_path.as_posix()}?mode=ro", uri=True)
+        source.row_factory = sqlite3.Row
+        try:
+            tables = {row["name"] for row in source.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+            inserted = {}
+            for spec in TABLE_SPECS:
+                if spec.table.name not in tables:
+                    inserted[spec.table.name] = 0
+                    continue
+                inserted[spec.table.name] = self._import_table(source, spec, positions)
+        finally:
+            source.close()
+
+        self._save_checkpoint(positions, done=True)
+        self.db.commit()
+        return inserted
+
+    def _import_table(self, source: sqlite3.Connection, spec: _TableSpec, positions: Dict[str, int]) -> int:
+        name = spec.table.name
+        position = int(positions.get(name, 0))
+        total = source.execute(f"SELECT COUNT(*) FROM {name}").fetchone()[0]
+        read = source.execute(f"SELECT COUNT(*) FROM {name} WHERE rowid <= ?", (position,)).fetchone()[0]
+        inserted = 0
+        started = time.perf_counter()
+        for last_rowid, rows in self._chunks(source, spec, position):
+            records = [spec.transform(row, self) for row in rows]
+            inserted += self._insert(spec.table, records)
+            read += len(rows)
+            positions[name] = last_rowid
+            self._save_checkpoint(positions, done=False)
+            self.db.commit()
+            self.progress(ImportProgress(name, read, total, inserted, time.perf_counter() - started))
+        return inserted
+
+    def _chunks(self, source: sqlite3.Connection, spec: _TableSpec, position: int) -> Iterator[Tuple[int, List[sqlite3.Row]]]:
+        name = spec.table.name
+        present = {row["name"] for row in source.execute(f"PRAGMA table_info({name})")}
+        columns = list(spec.required) + [
+            column if column in present else f"NULL AS {column}" for column in spec.optional
+        ]
+        query = f"SELECT rowid AS source_rowid, {', '.join(columns)} FROM {name} WHERE rowid > ? ORDER BY rowid LIMIT ?"
+        while True:
+            rows = source.execute(query, (position, self.settings.batch_size)).fetchall()
+            if not rows:
+                return
+            position = rows[-1]["source_rowid"]
+            yield position, rows
+
+    def _insert(self, table: Table, records: Sequence[Dict[str, Any]]) -> int:
+        if not records:
+            return 0
+        connection = self.db.connection(bind_arguments={"clause": insert(table)})
+        cursor = copy_cursor(connection) if self.settings.use_copy else None
+        if cursor is not None:
+            return self._copy(connection, cursor, table, records)
+        ids = [record["id"] for record in records]
+        existing = set(connection.execute(select(table.c.id).where(table.c.id.in_(ids))).scalars())
+        fresh = [record for record in records if record["id"] not in existing]
+        insert_records(connection, table, fresh, use_copy=False)
+        return len(fresh)
+
+    def _copy(self, connection, cursor, table: Table, records: Sequence[Dict[str, Any]]) -> int:
+        stage = f"import_stage_{table.name}"
+        column_list = ", ".join(records[0])
+        connection.exec_driver_sql(
+            f"CREATE TEMP TABLE IF NOT EXISTS {stage} (LIKE {table.name} INCLUDING DEFAULTS) ON COMMIT DELETE ROWS"
+        )
+        copy_records(cursor, stage, table, records)
+        result = connection.exec_driver_sql(
+            f"INSERT INTO {table.name} ({column_list}) SELECT {column_list} FROM {stage} AS staged "
+            f"WHERE NOT EXISTS (SELECT 1 FROM {table.name} AS target WHERE target.id = staged.id)"
+        )
+        return result.rowcount
+
+    def _save_checkpoint(self, positions: Dict[str, int], *, done: bool) -> None:
+        value = json.dumps({"source": str(self.source_path), "positions": positions, "done": done}, sort_keys=True)
+        self._settings_repository.set(CHECKPOINT_SETTING, value)
+        self.db.flush()
+
+
+def _log_progress(progress: ImportProgress) -> None:
+    percent = 100.0 * progress.read / progress.total if progress.total else 100.0
+    logger.info(
+        "SQLite import %s: %s/%s rows (%.1f%%), %s inserted in %.1fs",
+        progress.table,
+        progress.read,
+        progress.total,
+        percent,
+        progress.inserted,
+        progress.elapsed_seconds,
+    )
+
+
+def load_sqlite_import_settings() -> SqliteImportSettings:
+    return SqliteImportSettings(
+        batch_size=max(1, int(os.getenv("IMPORT_BATCH_SIZE", "5000"))),
+        use_copy=os.getenv("IMPORT_USE_COPY", "true").lower() in {"1", "true", "yes"},
+    )
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+from typing import List, Type
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.dml import UpdateBase
+
+SQLITE_JOURNAL_MODES = ("wal", "delete", "truncate", "persist", "memory")
+SQLITE_SYNCHRONOUS_LEVELS = ("off", "normal", "full", "extra")
+WRITER_PINNED_KEY = "sqlite_writer_pinned"
+
+
+@dataclass(frozen=True)
+class SqliteSettings:
+    enabled: bool
+    journal_mode: str
+    synchronous: str
+    busy_timeout_ms: int
+    mmap_size_bytes: int
+    cache_size_kib: int
+    single_writer: bool
+
+    @property
+    def routes_writes(self) -> bool:
+        # A rollback journal blocks the writer's commit while any reader holds a
+        # transaction, and a session keeps its reader open until it commits; only WAL
+        # lets the two sides proceed independently.
+        return self.enabled and self.single_writer and self.journal_mode == "wal"
+
+    def pragmas(self) -> List[str]:
+        return [
+            f"PRAGMA journal_mode={self.journal_mode.upper()}",
+            f"PRAGMA synchronous={self.synchronous.upper()}",
+            f"PRAGMA busy_timeout={self.busy_timeout_ms}",
+            f"PRAGMA mmap_size={self.mmap_size_bytes}",
+            # Negative values are KiB rather than pages, independent of page_size.
+            f"PRAGMA cache_size=-{self.cache_size_kib}",
+        ]
+
+
+def apply_sqlite_profile(engine: Engine, settings: SqliteSettings, *, writer: bool = False) -> None:
+    """Run the profile PRAGMAs on every new connection of ``engine``.
+
+    For async engines pass ``async_engine.sync_engine``. With ``writer=True`` the
+    driver's implicit transactions are turned off and every transaction starts with
+    ``BEGIN IMMEDIATE``: the write lock is taken up front, so a transaction that
+    read first cannot fail with SQLITE_BUSY when it later tries to write.
+    """
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record) -> None:
+        if writer:
+            dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in settings.pragmas():
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+    if writer:
+
+        @event.listens_for(engine, "begin")
+        def _on_begin(connection) -> None:
+            connection.exec_driver_sql("BEGIN IMMEDIATE")
+
+
+def writer_routing_session_class(writer: Engine, base: Type[Session] = Session) -> Type[Session]:
+    """Session subclass that sends flushes and DML to ``writer``.
+
+    Reads use the session's own bind (the reader pool) until the transaction first
+    touches the writer; from then on the whole transaction stays on the writer so it
+    reads its own uncommitted rows. The pin is dropped when the transaction ends.
+    """
+
+    class WriterRoutingSession(base):
+        def get_bind(self, mapper=None, clause=None, **kw):
+            if self._flushing or isinstance(clause, UpdateBase) or self.info.get(WRITER_PINNED_KEY):
+                return writer
+            return super().get_bind(mapper=mapper, clause=clause, **kw)
+
+    @event.listens_for(WriterRoutingSession, "after_begin")
+    def _pin_writer(session, transaction, connection) -> None:
+        if connection.engine is writer:
+            session.info[WRITER_PINNED_KEY] = True
+
+    @event.listens_for(WriterRoutingSession, "after_transaction_end")
+    def _unpin_writer(session, transaction) -> None:
+        if transaction.parent is None:
+            session.info.pop(WRITER_PINNED_KEY, None)
+
+    return WriterRoutingSession
+
+
+def load_sqlite_settings() -> SqliteSettings:
+    journal_mode = os.getenv("SQLITE_JOURNAL_MODE", "wal").strip().lower()
+    if journal_mode not in SQLITE_JOURNAL_MODES:
+        raise ValueError(f"SQLITE_JOURNAL_MODE must be one of {SQLITE_JOURNAL_MODES}, got {journal_mode!r}")
+    synchronous = os.getenv("SQLITE_SYNCHRONOUS", "normal").strip().lower()
+    if synchronous not in SQLITE_SYNCHRONOUS_LEVELS:
+        raise ValueError(f"SQLITE_SYNCHRONOUS must be one of {SQLITE_SYNCHRONOUS_LEVELS}, got {synchronous!r}")
+    return SqliteSettings(
+        enabled=os.getenv("SQLITE_PROFILE_ENABLED", "true").lower() in {"1", "true", "yes"},
+        journal_mode=journal_mode,
+        synchronous=synchronous,
+        busy_timeout_ms=max(0, int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))),
+        mmap_size_bytes=max(0, int(os.getenv("SQLITE_MMAP_SIZE_BYTES", str(256 * 1024 * 1024)))),
+        cache_size_kib=max(0, int(os.getenv("SQLITE_CACHE_SIZE_KIB", str(64 * 1024)))),
+        single_writer=os.getenv("SQLITE_SINGLE_WRITER", "true").lower() in {"1", "true", "yes"},
+    )
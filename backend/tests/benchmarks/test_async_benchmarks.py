@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+from fastapi import Depends, FastAPI, HTTPException
+from sqlalchemy.orm import Session, selectinload
+
+import app as backend_app
+from database import SQLITE_SINGLE_WRITER, async_engine, dispose_async_engines, get_db
+from dependencies import token_service
+from models import Poll as PollModel
+from models import PollVariant, User as UserModel
+from models import Vote as VoteModel
+
+pytestmark = pytest.mark.benchmark
+
+CONCURRENT_CLIENTS = 500
+VOTERS = 500
+
+
+def _sync_reference_app() -> FastAPI:
+    """The pre-async ``GET /polls/{id}``: same query, run on the threadpool."""
+    reference = FastAPI()
+
+    @reference.get("/polls/{poll_id}")
+    def get_poll(poll_id: str, db: Session = Depends(get_db)):
+        poll = db.query(PollModel).options(selectinload(PollModel.variants)).filter(PollModel.id == poll_id).first()
+        if not poll:
+            raise HTTPException(status_code=404, detail="Poll not found")
+        return {"id": poll.id, "variants": [{"id": v.id, "label": v.label} for v in poll.variants]}
+
+    return reference
+
+
+def _seed(db_session, admin_user) -> PollModel:
+    poll = PollModel(
+        title="Нагрузка",
+        deadline_iso=datetime.now(timezone.utc) + timedelta(days=1),
+        type="single",
+        max_selections=1,
+        is_anonymous=False,
+        owner_user_id=admin_user.id,
+    )
+    db_session.add(poll)
+    db_session.flush()
+    db_session.add_all([PollVariant(poll_id=poll.id, label=f"Вариант {index}") for index in range(4)])
+    db_session.add_all(
+        [
+            UserModel(username=f"voter{index}", email=f"voter{index}@example.com", name=f"Voter {index}", role="user", password_hash="x")
+            for index in range(VOTERS)
+        ]
+    )
+    db_session.commit()
+    db_session.refresh(poll)
+    return poll
+
+
+async def _fire(app: FastAPI, requests) -> tuple[float, list[int]]:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+        started_at = time.perf_counter()
+        responses = await asyncio.gather(*(request(client) for request in requests))
+        elapsed = time.perf_counter() - started_at
+    return elapsed, [response.status_code for response in responses]
+
+
+def _report(label: str, elapsed: float, count: int) -> None:
+    print(f"\n{label}: {count} requests / {CONCURRENT_CLIENTS} concurrent in {elapsed:.2f}s ({count / elapsed:.0f} req/s)")
+
+
+def test_async_read_endpoints_at_500_concurrent_clients(db_session, admin_user):
+    poll_id = _seed(db_session, admin_user).id
+
+    async def run():
+        try:
+            reads = [lambda client: client.get(f"/polls/{poll_id}")] * CONCURRENT_CLIENTS
+            sync_elapsed, sync_statuses = await _fire(_sync_reference_app(), reads)
+            async_elapsed, async_statuses = await _fire(backend_app.app, reads)
+            results = [lambda client: client.get(f"/polls/{poll_id}/results")] * CONCURRENT_CLIENTS
+            results_elapsed, results_statuses = await _fire(backend_app.app, results)
+            listing = [lambda client: client.get("/polls", params={"limit": 20})] * CONCURRENT_CLIENTS
+            list_elapsed, list_statuses = await _fire(backend_app.app, listing)
+        finally:
+            await dispose_async_engines()
+        return (
+            (sync_elapsed, sync_statuses),
+            (async_elapsed, async_statuses),
+            (results_elapsed, results_statuses),
+            (list_elapsed, list_statuses),
+        )
+
+    sync_run, async_run, results_run, list_run = asyncio.run(run())
+    _report("GET /polls/{id} sync threadpool reference", sync_run[0], len(sync_run[1]))
+    _report("GET /polls/{id} async", async_run[0], len(async_run[1]))
+    _report("GET /polls/{id}/results async", results_run[0], len(results_run[1]))
+    _report("GET /polls async", list_run[0], len(list_run[1]))
+    for _, statuses in (sync_run, async_run, results_run, list_run):
+        assert set(statuses) == {200}
+
+
+@pytest.mark.skipif(
+    async_engine.dialect.name == "sqlite" and not SQLITE_SINGLE_WRITER,
+    reason="without the single-writer profile, concurrent SQLite writers fail with 'database is locked'",
+)
+def test_async_vote_at_500_concurrent_clients(db_session, admin_user):
+    poll = _seed(db_session, admin_user)
+    poll_id = poll.id
+    choice = poll.variants[0].id
+    voters = db_session.query(UserModel).filter(UserModel.username.like("voter%")).all()
+    headers = [
+        {"Authorization": f"Bearer {token_service.issue_access_token(user_id=user.id, role=user.role)[0]}"}
+        for user in voters
+    ]
+
+    def cast(header):
+        return lambda client: client.post(f"/polls/{poll_id}/vote", json={"choices": [choice]}, headers=header)
+
+    async def run():
+        try:
+            return await _fire(backend_app.app, [cast(header) for header in headers])
+        finally:
+            await dispose_async_engines()
+
+    elapsed, statuses = asyncio.run(run())
+    _report("POST /polls/{id}/vote async", elapsed, len(statuses))
+    assert set(statuses) == {200}
+    db_session.expire_all()
+    assert db_session.query(VoteModel).filter(VoteModel.poll_id == poll_id).count() == VOTERS
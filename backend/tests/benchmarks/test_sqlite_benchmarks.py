@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from models import Base, Poll as PollModel
+from models import PollVariant, User as UserModel
+from models import Vote as VoteModel
+from services.sqlite_profile import SqliteSettings, apply_sqlite_profile, writer_routing_session_class
+
+pytestmark = pytest.mark.benchmark
+
+VOTERS = 500
+WORKERS = 32
+PROFILE = SqliteSettings(
+    enabled=True,
+    journal_mode="wal",
+    synchronous="normal",
+    busy_timeout_ms=5000,
+    mmap_size_bytes=256 * 1024 * 1024,
+    cache_size_kib=64 * 1024,
+    single_writer=True,
+)
+
+
+def _engine(path, **pool):
+    return create_engine(f"sqlite:///{path.as_posix()}", connect_args={"check_same_thread": False}, **pool)
+
+
+def _seed(engine) -> tuple[str, str, list[str]]:
+    Base.metadata.create_all(bind=engine)
+    with sessionmaker(bind=engine)() as db:
+        poll = PollModel(
+            title="Нагрузка",
+            deadline_iso=datetime.now(timezone.utc) + timedelta(days=1),
+            type="single",
+            max_selections=1,
+            is_anonymous=True,
+        )
+        db.add(poll)
+        db.flush()
+        variant = PollVariant(poll_id=poll.id, label="Да")
+        db.add(variant)
+        users = [
+            UserModel(id=str(uuid.uuid4()), username=f"voter{index}", email=f"voter{index}@example.com", name="v", role="user", password_hash="x")
+            for index in range(VOTERS)
+        ]
+        db.add_all(users)
+        db.commit()
+        return poll.id, variant.id, [user.id for user in users]
+
+
+def _cast_votes(session_factory, poll_id: str, variant_id: str, user_ids: list[str]) -> tuple[float, int, int]:
+    """Same statements as POST /polls/{id}/vote: read the poll, replace the user's votes."""
+
+    def vote(user_id: str) -> bool:
+        try:
+            with session_factory() as db:
+                db.query(PollModel).filter(PollModel.id == poll_id).first()
+                db.query(VoteModel).filter(VoteModel.poll_id == poll_id, VoteModel.user_id == user_id).delete()
+                db.add(VoteModel(poll_id=poll_id, variant_id=variant_id, user_id=user_id))
+                db.commit()
+            return True
+        except OperationalError:
+            return False
+
+    started_at = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=WORKERS) as pool:
+        outcomes = list(pool.map(vote, user_ids))
+    elapsed = time.perf_counter() - started_at
+    return elapsed, outcomes.count(True), outcomes.count(False)
+
+
+def test_concurrent_vote_throughput_before_and_after_the_sqlite_profile(tmp_path):
+    baseline = _engine(tmp_path / "baseline.db", pool_size=WORKERS)
+    poll_id, variant_id, user_ids = _seed(baseline)
+    before = _cast_votes(sessionmaker(bind=baseline, autoflush=False), poll_id, variant_id, user_ids)
+
+    reader = _engine(tmp_path / "profiled.db", pool_size=WORKERS)
+    writer = _engine(tmp_path / "profiled.db", pool_size=1, max_overflow=0, pool_timeout=60)
+    apply_sqlite_profile(reader, PROFILE)
+    apply_sqlite_profile(writer, PROFILE, writer=True)
+    poll_id, variant_id, user_ids = _seed(reader)
+    routed = sessionmaker(bind=reader, autoflush=False, class_=writer_routing_session_class(writer))
+    after = _cast_votes(routed, poll_id, variant_id, user_ids)
+
+    for label, (elapsed, ok, failed) in (("default SQLite", before), ("WAL + single writer", after)):
+        print(f"\n{label}: {ok} votes ok, {failed} failed, {WORKERS} threads, {elapsed:.2f}s ({ok / elapsed:.0f} votes/s)")
+    with writer.connect() as connection:
+        stored = connection.exec_driver_sql("SELECT COUNT(*) FROM votes").scalar()
+    assert after[1] == VOTERS and after[2] == 0
+    assert stored == VOTERS
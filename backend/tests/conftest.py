@@ -8,11 +8,13 @@ from typing import Callable
 
 import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy import text
 
 os.environ.setdefault("USE_SQLITE", "1")
 os.environ.setdefault("SQLALCHEMY_ECHO", "false")
 os.environ.setdefault("JWT_SECRET", "test-secret")
 os.environ.setdefault("ADMIN_SECRET", "test-admin-secret")
+os.environ.setdefault("REFRESH_SESSION_PRUNE_ENABLED", "false")
 
 _DB_DIR = Path(tempfile.mkdtemp(prefix="survey-backend-tests-"))
 os.environ.setdefault("DATABASE_URL", f"sqlite:///{(_DB_DIR / 'test.db').as_posix()}")
@@ -22,36 +24,51 @@ if str(BACKEND_DIR) not in sys.path:
     sys.path.insert(0, str(BACKEND_DIR))
 
 import app as backend_app
+import dependencies
 import runtime
 import routers.external as external_router
 import routers.polls as polls_router
 import routers.users as users_router
 from dependencies import token_service
 from models import Base, User as UserModel
-from runtime import ensure_runtime_schema, hash_password
+from runtime import SCHEMA_VERSION, hash_password
 from schemas import ExternalWeatherSnapshot
+from services.login_throttle import MemoryThrottleStore
 from services.weather_service import ExternalWeatherError
 from tests.support.fakes import FakeMinioClient, StubWeatherAdapter
 from database import SessionLocal, engine
 
 
+def pytest_collection_modifyitems(config: pytest.Config, items: list[pytest.Item]) -> None:
+    if os.getenv("RUN_BENCHMARKS", "").lower() in {"1", "true", "yes"}:
+        return
+    skip_benchmark = pytest.mark.skip(reason="set RUN_BENCHMARKS=1 to run benchmarks")
+    for item in items:
+        if "benchmark" in item.keywords:
+            item.add_marker(skip_benchmark)
+
+
 @pytest.fixture(autouse=True)
 def reset_state(monkeypatch: pytest.MonkeyPatch) -> None:
+    # Building from metadata and stamping is much faster than replaying the migration
+    # chain per test; test_migrations covers the chain itself.
     Base.metadata.drop_all(bind=engine)
     Base.metadata.create_all(bind=engine)
-    with SessionLocal() as db:
-        ensure_runtime_schema(db, include_vote_constraints=False)
+    with engine.begin() as connection:
+        connection.execute(text("DROP TABLE IF EXISTS alembic_version"))
+        connection.execute(text("CREATE TABLE alembic_version (version_num VARCHAR(32) NOT NULL PRIMARY KEY)"))
+        connection.execute(text("INSERT INTO alembic_version (version_num) VALUES (:head)"), {"head": SCHEMA_VERSION})
+
+    monkeypatch.setattr(dependencies.login_throttle, "store", MemoryThrottleStore(max_keys=1000))
 
     fake_minio = FakeMinioClient()
     fake_minio.make_bucket("test-bucket")
 
-    monkeypatch.setattr(runtime, "MINIO_CLIENT", fake_minio)
-    monkeypatch.setattr(runtime, "MINIO_BUCKET", "test-bucket")
+    monkeypatch.setattr(runtime.object_storage, "client", fake_minio)
+    monkeypatch.setattr(runtime.object_storage, "bucket", "test-bucket")
     monkeypatch.setattr(runtime, "MINIO_PUBLIC_URL", "https://files.example")
-    monkeypatch.setattr(polls_router, "MINIO_CLIENT", fake_minio)
-    monkeypatch.setattr(polls_router, "MINIO_BUCKET", "test-bucket")
-    monkeypatch.setattr(users_router, "MINIO_CLIENT", fake_minio)
-    monkeypatch.setattr(users_router, "MINIO_BUCKET", "test-bucket")
+    monkeypatch.setattr(polls_router, "MINIO_PRESIGN_CLIENT", fake_minio)
+    monkeypatch.setattr(users_router, "MINIO_PRESIGN_CLIENT", fake_minio)
     monkeypatch.setattr(users_router, "MINIO_PUBLIC_URL", "https://files.example")
 
     weather_payload = ExternalWeatherSnapshot(
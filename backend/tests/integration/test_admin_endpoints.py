@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import pytest
+
+pytestmark = pytest.mark.integration
+
+
+def test_admin_metrics_report_access_token_cache(client, admin_user, auth_headers_for):
+    headers = auth_headers_for(admin_user)
+    assert client.get("/auth/me", headers=headers).status_code == 200
+
+    response = client.get("/admin/metrics", headers=headers)
+
+    assert response.status_code == 200
+    cache_stats = response.json()["accessTokenCache"]
+    assert cache_stats["hits"] >= 1
+    assert 0.0 <= cache_stats["hitRatio"] <= 1.0
+
+
+def test_regular_user_cannot_read_metrics(client, regular_user, auth_headers_for):
+    response = client.get("/admin/metrics", headers=auth_headers_for(regular_user))
+    pool_response = client.get("/admin/db/pool", headers=auth_headers_for(regular_user))
+
+    assert response.status_code == 403
+    assert pool_response.status_code == 403
+
+
+def test_admin_can_read_connection_pool_stats(client, admin_user, auth_headers_for):
+    response = client.get("/admin/db/pool", headers=auth_headers_for(admin_user))
+
+    assert response.status_code == 200
+    stats = response.json()
+    assert stats["poolClass"] == "MonitoredQueuePool"
+    assert stats["checkouts"] >= 1
+    assert stats["timeouts"] == 0
+    assert {"checkedOut", "overflow", "checkoutWait"} <= set(stats)
+
+
+def test_admin_can_read_replica_status(client, admin_user, regular_user, auth_headers_for):
+    response = client.get("/admin/db/replicas", headers=auth_headers_for(admin_user))
+    forbidden = client.get("/admin/db/replicas", headers=auth_headers_for(regular_user))
+
+    assert response.status_code == 200
+    assert response.json()["enabled"] is False
+    assert response.json()["replicas"] == []
+    assert forbidden.status_code == 403
+
+
+def test_auth_endpoints_skip_schema_work_once_stamped(client, monkeypatch):
+    import runtime
+
+    def fail_schema_alignment(*args, **kwargs):
+        raise AssertionError("schema alignment must not run on the auth hot path")
+
+    monkeypatch.setattr(runtime, "_schema_ready", True)
+    monkeypatch.setattr(runtime, "upgrade_schema", fail_schema_alignment)
+
+    register_response = client.post(
+        "/auth/register",
+        json={
+            "username": "student",
+            "email": "student@example.com",
+            "name": "Студент",
+            "password": "Student123!",
+        },
+    )
+    login_response = client.post("/auth/login", json={"username": "student", "password": "Student123!"})
+
+    assert register_response.status_code == 201
+    assert login_response.status_code == 200
+
+
+def test_admin_can_force_schema_recheck(client, admin_user, auth_headers_for, db_session, monkeypatch):
+    import runtime
+
+    calls: list[str] = []
+    original = runtime.upgrade_schema
+
+    def tracking_upgrade(db):
+        calls.append("upgrade")
+        original(db)
+
+    monkeypatch.setattr(runtime, "upgrade_schema", tracking_upgrade)
+
+    response = client.post("/admin/schema/recheck", headers=auth_headers_for(admin_user))
+
+    assert response.status_code == 200
+    assert response.json()["schemaVersion"] == runtime.SCHEMA_VERSION
+    assert calls == ["upgrade"]
+    assert runtime.read_schema_version(db_session) == runtime.SCHEMA_VERSION
+
+
+def test_regular_user_cannot_recheck_schema(client, regular_user, auth_headers_for):
+    response = client.post("/admin/schema/recheck", headers=auth_headers_for(regular_user))
+
+    assert response.status_code == 403
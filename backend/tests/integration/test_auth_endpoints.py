@@ -93,3 +93,73 @@ def test_duplicate_registration_returns_conflict(client):
     second = client.post("/auth/register", json=payload)
 
     assert second.status_code == 409
+
+
+def test_login_is_shed_with_retry_after_when_hashing_queue_is_full(client, regular_user, monkeypatch):
+    import runtime
+    from services.password_service import PasswordHashingBusyError
+
+    _ = regular_user
+
+    class SaturatedHasher:
+        def verify(self, plain: str, hashed: str) -> bool:
+            raise PasswordHashingBusyError(retry_after_seconds=7)
+
+        def hash(self, password: str) -> str:
+            raise PasswordHashingBusyError(retry_after_seconds=7)
+
+    monkeypatch.setattr(runtime, "password_hasher", SaturatedHasher())
+
+    login_response = client.post("/auth/login", json={"username": "student", "password": "Student123!"})
+    register_response = client.post(
+        "/auth/register",
+        json={
+            "username": "newcomer",
+            "email": "newcomer@example.com",
+            "name": "Новичок",
+            "password": "Newcomer123!",
+        },
+    )
+
+    for response in (login_response, register_response):
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "7"
+
+
+def test_login_rehashes_password_with_calibrated_cost(client, regular_user, db_session):
+    import runtime
+    from repositories.settings_repository import RuntimeSettingRepository
+
+    assert regular_user.password_hash.startswith("$pbkdf2-sha256$29000$")
+    RuntimeSettingRepository(db_session).set(runtime.PASSWORD_HASH_ROUNDS_SETTING, "12000")
+    db_session.commit()
+    try:
+        assert runtime.load_password_hash_rounds(db_session) == 12000
+
+        response = client.post("/auth/login", json={"username": "student", "password": "Student123!"})
+
+        assert response.status_code == 200
+        db_session.expire_all()
+        db_session.refresh(regular_user)
+        assert regular_user.password_hash.startswith("$pbkdf2-sha256$12000$")
+        assert client.post("/auth/login", json={"username": "student", "password": "Student123!"}).status_code == 200
+    finally:
+        runtime.configure_password_hash_rounds(None)
+
+
+def test_repeated_failed_logins_are_throttled_before_hashing(client, regular_user, monkeypatch):
+    import runtime
+
+    _ = regular_user
+    for _attempt in range(5):
+        response = client.post("/auth/login", json={"username": "student", "password": "wrong-password"})
+        assert response.status_code == 401
+
+    def fail_verify(plain: str, hashed: str) -> bool:
+        raise AssertionError("throttled login must not hash the password")
+
+    monkeypatch.setattr(runtime.password_hasher, "verify", fail_verify)
+    throttled = client.post("/auth/login", json={"username": "student", "password": "Student123!"})
+
+    assert throttled.status_code == 429
+    assert int(throttled.headers["Retry-After"]) >= 1
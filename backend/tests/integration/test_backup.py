@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import gzip
+import json
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.orm import Session
+
+import runtime
+from database import engine
+from models import Base, PollAttachment, RefreshTokenSession
+from services.backup import BackupError, BackupSettings, export_tables, restore_levels, restore_tables
+from services.dataset_generator import DatasetGenerator, DatasetSpec
+
+pytestmark = pytest.mark.integration
+
+SETTINGS = BackupSettings(batch_size=50, workers=4, compress_level=1, use_copy=True)
+
+
+def dump(bind) -> dict:
+    with bind.connect() as connection:
+        return {
+            name: sorted(tuple(row) for row in connection.execute(select(Base.metadata.tables[name])))
+            for name in ("users", "polls", "poll_variants", "votes", "poll_attachments")
+        }
+
+
+def migrated_engine(path):
+    target = create_engine(f"sqlite:///{path.as_posix()}", connect_args={"check_same_thread": False})
+    with Session(target) as db:
+        runtime.upgrade_schema(db)
+    return target
+
+
+@pytest.fixture
+def populated(db_session):
+    spec = DatasetSpec(users=40, polls=6, ballots=300, seed=3, batch_size=100, anchor=datetime(2026, 10, 1))
+    DatasetGenerator(db_session, spec, "hash", progress=lambda progress: None).run()
+    poll_id, owner_id = db_session.execute(select(Base.metadata.tables["polls"].c.id, Base.metadata.tables["polls"].c.owner_user_id)).first()
+    db_session.add(
+        PollAttachment(
+            poll_id=poll_id,
+            uploader_user_id=owner_id,
+            original_name="план.pdf",
+            content_type="application/pdf",
+            size_bytes=10,
+            object_name="attachments/plan.pdf",
+        )
+    )
+    db_session.commit()
+
+
+def test_export_then_restore_round_trips_every_table(populated, tmp_path):
+    manifest = export_tables(engine, tmp_path / "backup", SETTINGS)
+
+    assert manifest["schemaVersion"] == runtime.SCHEMA_VERSION
+    assert manifest["tables"]["users"]["rows"] == 40
+    with gzip.open(tmp_path / "backup" / "poll_attachments.jsonl.gz", "rt", encoding="utf-8") as stream:
+        [attachment] = [json.loads(line) for line in stream]
+    assert attachment["original_name"] == "план.pdf"
+
+    target = migrated_engine(tmp_path / "restored.db")
+    restored = restore_tables(target, tmp_path / "backup", SETTINGS)
+
+    assert restored == {name: table["rows"] for name, table in manifest["tables"].items()}
+    assert dump(target) == dump(engine)
+
+
+def test_restore_refuses_a_non_empty_target_unless_replacing(populated, tmp_path):
+    export_tables(engine, tmp_path / "backup", SETTINGS)
+    target = migrated_engine(tmp_path / "restored.db")
+    restore_tables(target, tmp_path / "backup", SETTINGS)
+
+    with pytest.raises(BackupError, match="not empty"):
+        restore_tables(target, tmp_path / "backup", SETTINGS)
+
+    # Sessions are not backed up but reference users; enforce FKs like Postgres does.
+    event.listen(target, "connect", lambda connection, _: connection.execute("PRAGMA foreign_keys = ON"))
+    target.dispose()
+    with Session(target) as db:
+        user_id = db.execute(select(Base.metadata.tables["users"].c.id)).scalars().first()
+        db.add(RefreshTokenSession(user_id=user_id, token_hash="digest", expires_at=datetime(2030, 1, 1)))
+        db.commit()
+
+    restore_tables(target, tmp_path / "backup", SETTINGS, replace=True)
+    assert dump(target) == dump(engine)
+    with Session(target) as db:
+        assert db.query(RefreshTokenSession).count() == 0
+
+
+def test_restore_rejects_an_unfinished_export(tmp_path):
+    (tmp_path / "backup").mkdir()
+    with pytest.raises(BackupError, match="manifest.json not found"):
+        restore_tables(engine, tmp_path / "backup", SETTINGS)
+
+
+def test_restore_levels_follow_foreign_keys():
+    assert restore_levels() == [["users"], ["polls"], ["poll_attachments", "poll_variants"], ["votes"]]
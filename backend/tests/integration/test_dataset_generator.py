@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+from collections import Counter
+from datetime import datetime
+
+import pytest
+from sqlalchemy import func, select
+
+from models import Poll as PollModel
+from models import PollVariant, User as UserModel
+from models import Vote as VoteModel
+from services.dataset_generator import DatasetGenerator, DatasetSpec
+
+pytestmark = pytest.mark.integration
+
+ANCHOR = datetime(2026, 10, 1, 12, 0, 0)
+
+
+def generate(db_session, **overrides) -> dict:
+    spec = DatasetSpec(**{"users": 200, "polls": 40, "ballots": 3000, "seed": 7, "batch_size": 500, "anchor": ANCHOR, **overrides})
+    return DatasetGenerator(db_session, spec, "hash", progress=lambda progress: None).run()
+
+
+def snapshot(db_session) -> list:
+    votes = db_session.execute(
+        select(VoteModel.id, VoteModel.poll_id, VoteModel.variant_id, VoteModel.user_id, VoteModel.created_at).order_by(VoteModel.id)
+    ).all()
+    polls = db_session.execute(select(PollModel.id, PollModel.type, PollModel.deadline_iso).order_by(PollModel.id)).all()
+    return [tuple(row) for row in polls + votes]
+
+
+def test_generated_dataset_is_consistent_and_skewed(db_session):
+    written = generate(db_session)
+
+    assert written["users"] == 200 and written["polls"] == 40
+    assert db_session.query(UserModel).count() == 200
+    assert db_session.query(VoteModel).count() == written["votes"]
+    # Every vote points at a variant of its own poll, and no user votes twice for one variant.
+    mismatched = (
+        db_session.query(VoteModel)
+        .join(PollVariant, PollVariant.id == VoteModel.variant_id)
+        .filter(PollVariant.poll_id != VoteModel.poll_id)
+        .count()
+    )
+    assert mismatched == 0
+    ballots = Counter(
+        dict(db_session.execute(select(VoteModel.poll_id, func.count(func.distinct(VoteModel.user_id))).group_by(VoteModel.poll_id)).all())
+    )
+    [(_, hottest)] = ballots.most_common(1)
+    median = sorted(ballots.values())[len(ballots) // 2]
+    assert hottest == 200  # the Zipf head saturates at every user
+    assert hottest >= 5 * median
+    single_poll_voters = db_session.execute(
+        select(func.count())
+        .select_from(VoteModel)
+        .join(PollModel, PollModel.id == VoteModel.poll_id)
+        .where(PollModel.type == "single")
+        .group_by(VoteModel.poll_id, VoteModel.user_id)
+        .having(func.count() > 1)
+    ).all()
+    assert single_poll_voters == []
+
+
+def test_same_seed_reproduces_the_dataset(db_session):
+    generate(db_session)
+    first = snapshot(db_session)
+    for table in (VoteModel, PollVariant, PollModel, UserModel):
+        db_session.query(table).delete()
+    db_session.commit()
+
+    generate(db_session)
+    assert snapshot(db_session) == first
+
+    for table in (VoteModel, PollVariant, PollModel, UserModel):
+        db_session.query(table).delete()
+    db_session.commit()
+    generate(db_session, seed=8)
+    assert snapshot(db_session) != first
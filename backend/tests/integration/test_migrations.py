@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import hashlib
+import uuid
+
+import pytest
+from alembic import command
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.orm import Session
+
+import runtime
+from models import Base, Poll as PollModel
+
+pytestmark = [
+    pytest.mark.integration,
+    # Migrations must not leak SQLAlchemy warnings (e.g. SQLite reflection noise).
+    pytest.mark.filterwarnings("error::sqlalchemy.exc.SAWarning"),
+]
+
+LEGACY_SCHEMA = (
+    "CREATE TABLE users (id VARCHAR PRIMARY KEY, email VARCHAR, name VARCHAR NOT NULL, role VARCHAR NOT NULL)",
+    """
+    CREATE TABLE polls (
+        id VARCHAR PRIMARY KEY, title VARCHAR NOT NULL, description TEXT, deadline_iso DATETIME,
+        type VARCHAR NOT NULL, max_selections INTEGER, is_anonymous BOOLEAN, created_at DATETIME
+    )
+    """,
+    "CREATE TABLE poll_variants (id VARCHAR PRIMARY KEY, poll_id VARCHAR NOT NULL, label VARCHAR NOT NULL, created_at DATETIME)",
+    """
+    CREATE TABLE votes (
+        id VARCHAR PRIMARY KEY, poll_id VARCHAR NOT NULL, variant_id VARCHAR NOT NULL, user_id VARCHAR NOT NULL,
+        created_at DATETIME, CONSTRAINT unique_user_poll_vote UNIQUE (poll_id, user_id)
+    )
+    """,
+)
+
+
+def _upgrade(engine) -> None:
+    with Session(engine) as db:
+        runtime.upgrade_schema(db)
+
+
+def test_migrations_repair_legacy_database(tmp_path):
+    engine = create_engine(f"sqlite:///{(tmp_path / 'legacy.db').as_posix()}")
+    with engine.begin() as connection:
+        for statement in LEGACY_SCHEMA:
+            connection.execute(text(statement))
+        connection.execute(
+            text("INSERT INTO users (id, email, name, role) VALUES (:id, :email, :name, :role)"),
+            [
+                {"id": "u1", "email": "Anna@example.com", "name": "Анна", "role": "owner"},
+                {"id": "u2", "email": "anna@example.org", "name": "Анна 2", "role": "user"},
+            ],
+        )
+
+    _upgrade(engine)
+
+    inspector = inspect(engine)
+    assert {"username", "password_hash", "created_at", "avatar_url"} <= {col["name"] for col in inspector.get_columns("users")}
+    assert "owner_user_id" in {col["name"] for col in inspector.get_columns("polls")}
+    assert {uc["name"] for uc in inspector.get_unique_constraints("votes")} == {"unique_user_poll_variant"}
+    assert {"refresh_token_sessions", "poll_attachments", "runtime_settings"} <= set(inspector.get_table_names())
+    with engine.connect() as connection:
+        rows = connection.execute(
+            text("SELECT hex(id) AS id, username, role, password_hash FROM users ORDER BY username")
+        ).fetchall()
+        index_names = set(connection.execute(text("SELECT name FROM sqlite_master WHERE type = 'index'")).scalars())
+    assert [(row.username, row.role) for row in rows] == [("anna", "admin"), ("anna1", "user")]
+    # Legacy non-UUID ids become md5(id), the same mapping models.uuid_key applies.
+    assert [row.id for row in rows] == [hashlib.md5(b"u1").hexdigest().upper(), hashlib.md5(b"u2").hexdigest().upper()]
+    assert all(row.password_hash for row in rows)
+    assert {
+        "uq_users_username",
+        "ix_users_username_lower",
+        "ix_users_role_username",
+        "ix_refresh_token_sessions_user_active",
+        "ix_refresh_token_sessions_expires_at",
+    } <= index_names
+    with Session(engine) as db:
+        assert runtime.read_schema_version(db) == runtime.SCHEMA_VERSION
+
+
+def test_fresh_database_migrates_to_head_and_downgrades(tmp_path):
+    engine = create_engine(f"sqlite:///{(tmp_path / 'fresh.db').as_posix()}")
+
+    _upgrade(engine)
+
+    with Session(engine) as db:
+        assert runtime.read_schema_version(db) == runtime.SCHEMA_VERSION
+    # The chain must build everything the models declare, or metadata-built test
+    # databases would drift from migrated production ones.
+    inspector = inspect(engine)
+    assert set(Base.metadata.tables) <= set(inspector.get_table_names())
+    with engine.connect() as connection:
+        index_names = set(connection.execute(text("SELECT name FROM sqlite_master WHERE type = 'index'")).scalars())
+    declared = {index.name for table in Base.metadata.tables.values() for index in table.indexes}
+    assert declared <= index_names
+
+    config = runtime.alembic_config()
+    with engine.connect() as connection:
+        config.attributes["connection"] = connection
+        command.downgrade(config, "base")
+        connection.commit()
+    assert inspect(engine).get_table_names() == ["alembic_version"]
+
+
+def test_username_backfill_resolves_duplicates_and_suffix_collisions(tmp_path):
+    engine = create_engine(f"sqlite:///{(tmp_path / 'duplicates.db').as_posix()}")
+    with engine.begin() as connection:
+        connection.execute(
+            text(
+                "CREATE TABLE users (id VARCHAR PRIMARY KEY, username VARCHAR, email VARCHAR, "
+                "name VARCHAR NOT NULL, role VARCHAR NOT NULL, password_hash VARCHAR)"
+            )
+        )
+        connection.execute(
+            text("INSERT INTO users (id, username, email, name, role) VALUES (:id, :username, :email, 'n', 'user')"),
+            [
+                {"id": "u1", "username": "anna1", "email": "first@example.com"},
+                {"id": "u2", "username": None, "email": "Anna@example.com"},
+                {"id": "u3", "username": "", "email": "anna@example.org"},
+                {"id": "u4", "username": "bob", "email": "bob@example.com"},
+                {"id": "u5", "username": "bob", "email": "bob@example.org"},
+                {"id": "u6", "username": None, "email": "@example.org"},
+            ],
+        )
+
+    _upgrade(engine)
+
+    with engine.connect() as connection:
+        usernames = dict(connection.execute(text("SELECT email, username FROM users")).fetchall())
+    assert usernames == {
+        "first@example.com": "anna1",
+        "Anna@example.com": "anna",
+        "anna@example.org": "anna11",
+        "bob@example.com": "bob",
+        "bob@example.org": "bob1",
+        "@example.org": "user_u6",
+    }
+
+
+def test_uuid_keys_become_compact_and_keep_their_api_value(tmp_path):
+    engine = create_engine(f"sqlite:///{(tmp_path / 'uuid.db').as_posix()}")
+    owner_id, poll_id, variant_id, vote_id = (str(uuid.uuid4()) for _ in range(4))
+    with engine.begin() as connection:
+        for statement in LEGACY_SCHEMA:
+            connection.execute(text(statement))
+        connection.execute(
+            text("INSERT INTO users (id, email, name, role) VALUES (:id, 'owner@example.com', 'Owner', 'admin')"),
+            {"id": owner_id},
+        )
+        connection.execute(
+            text("INSERT INTO polls (id, title, type, max_selections) VALUES (:id, 'Обед', 'single', 1)"), {"id": poll_id}
+        )
+        connection.execute(
+            text("INSERT INTO poll_variants (id, poll_id, label) VALUES (:id, :poll_id, 'Суп')"),
+            {"id": variant_id, "poll_id": poll_id},
+        )
+        connection.execute(
+            text("INSERT INTO votes (id, poll_id, variant_id, user_id) VALUES (:id, :poll_id, :variant_id, :user_id)"),
+            {"id": vote_id, "poll_id": poll_id, "variant_id": variant_id, "user_id": owner_id},
+        )
+
+    _upgrade(engine)
+
+    with engine.connect() as connection:
+        stored = connection.execute(
+            text("SELECT typeof(id), length(id), typeof(poll_id), typeof(user_id) FROM votes")
+        ).one()
+    assert tuple(stored) == ("blob", 16, "blob", "blob")
+    with Session(engine) as db:
+        poll = db.get(PollModel, poll_id)
+        assert poll is not None and poll.id == poll_id
+        assert [(variant.id, variant.label) for variant in poll.variants] == [(variant_id, "Суп")]
+        assert db.get(PollModel, poll_id.upper()) is poll
+
+    config = runtime.alembic_config()
+    with engine.connect() as connection:
+        config.attributes["connection"] = connection
+        command.downgrade(config, "0007")
+        connection.commit()
+    with engine.connect() as connection:
+        assert connection.execute(text("SELECT id, user_id FROM votes")).one() == (vote_id, owner_id)
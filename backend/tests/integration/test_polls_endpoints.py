@@ -1,11 +1,17 @@
 from __future__ import annotations
 
+import hashlib
 from datetime import datetime, timedelta, timezone
 
 import pytest
 
+import routers.polls as polls_router
+import runtime
 from models import Poll as PollModel
+from models import PollAttachment as PollAttachmentModel
 from models import PollVariant, Vote as VoteModel
+from services.presigned_storage import PresignSettings
+from tests.support.images import image_bytes
 
 pytestmark = pytest.mark.integration
 
@@ -106,6 +112,50 @@ def test_vote_and_results_include_public_voters(client, db_session, admin_user,
     assert csv_response.headers["content-type"].startswith("text/csv")
 
 
+def test_results_can_ask_for_small_avatar_variants(client, db_session, admin_user, regular_user, auth_headers_for):
+    poll = create_poll_record(db_session, admin_user.id, is_anonymous=False)
+    avatar = client.post(
+        "/me/avatar",
+        headers=auth_headers_for(regular_user),
+        files={"file": ("a.jpg", image_bytes("JPEG"), "image/jpeg")},
+    ).json()["avatarUrl"]
+    client.post(f"/polls/{poll.id}/vote", json={"choices": [poll.variants[0].id]}, headers=auth_headers_for(regular_user))
+
+    response = client.get(f"/polls/{poll.id}/results", params={"avatarSize": 64})
+    assert response.status_code == 200
+    [voter] = response.json()["results"][0]["voters"]
+    assert voter["avatarUrl"] == avatar.replace("/256.jpg", "/64.jpg")
+    assert client.get(f"/polls/{poll.id}/results", params={"avatarSize": 65}).status_code == 400
+
+
+def test_vote_accepts_legacy_and_uppercase_choice_ids(client, db_session, admin_user, regular_user, auth_headers_for):
+    poll = PollModel(
+        id="legacy-poll",
+        title="Старый опрос",
+        description="Описание",
+        deadline_iso=datetime.now(timezone.utc) + timedelta(days=1),
+        type="multi",
+        max_selections=2,
+        is_anonymous=False,
+        owner_user_id=admin_user.id,
+    )
+    db_session.add(poll)
+    db_session.add_all([PollVariant(id="legacy-v1", poll_id="legacy-poll", label="Да"), PollVariant(id="legacy-v2", poll_id="legacy-poll", label="Нет")])
+    db_session.commit()
+    headers = auth_headers_for(regular_user)
+    variant_v2 = db_session.get(PollVariant, "legacy-v2").id
+
+    response = client.post(
+        "/polls/legacy-poll/vote",
+        headers=headers,
+        json={"choices": ["legacy-v1", variant_v2.upper()], "userId": regular_user.id.upper()},
+    )
+
+    assert response.status_code == 200
+    votes = db_session.query(VoteModel).filter(VoteModel.user_id == regular_user.id).all()
+    assert sorted(vote.variant_id for vote in votes) == sorted([db_session.get(PollVariant, "legacy-v1").id, variant_v2])
+
+
 def test_vote_rejects_invalid_choice_and_closed_poll(client, db_session, regular_user, auth_headers_for):
     poll = create_poll_record(db_session, regular_user.id, poll_type="single", max_selections=1)
     poll.deadline_iso = datetime.now(timezone.utc) - timedelta(minutes=5)
@@ -132,6 +182,8 @@ def test_poll_attachment_crud_uses_object_storage(client, db_session, admin_user
     assert upload_response.status_code == 201
     attachment = upload_response.json()
     assert attachment["originalName"] == "report.txt"
+    assert attachment["sizeBytes"] == 5
+    assert attachment["checksumSha256"] == hashlib.sha256(b"hello").hexdigest()
     assert attachment["downloadUrl"].endswith(f"/polls/{poll.id}/attachments/{attachment['id']}/download")
 
     list_response = client.get(
@@ -156,6 +208,182 @@ def test_poll_attachment_crud_uses_object_storage(client, db_session, admin_user
     assert delete_response.json()["status"] == "ok"
 
 
+def test_poll_attachment_upload_enforces_the_size_limit(client, db_session, admin_user, auth_headers_for, monkeypatch):
+    monkeypatch.setattr(polls_router, "ATTACHMENT_MAX_SIZE_BYTES", 1024)
+    poll = create_poll_record(db_session, admin_user.id)
+
+    too_large = client.post(
+        f"/polls/{poll.id}/attachments",
+        headers=auth_headers_for(admin_user),
+        files={"file": ("big.txt", b"x" * 1025, "text/plain")},
+    )
+    empty = client.post(
+        f"/polls/{poll.id}/attachments",
+        headers=auth_headers_for(admin_user),
+        files={"file": ("empty.txt", b"", "text/plain")},
+    )
+
+    assert too_large.status_code == 400
+    assert too_large.json()["detail"].startswith("File is too large")
+    assert empty.status_code == 400
+    assert empty.json()["detail"] == "Empty file"
+    assert runtime.object_storage.client.objects == {}
+    assert db_session.query(PollAttachmentModel).count() == 0
+
+
+def test_presigned_confirm_refuses_an_upload_replaced_after_the_check(client, db_session, admin_user, auth_headers_for, monkeypatch):
+    monkeypatch.setattr(polls_router, "PRESIGN_SETTINGS", PresignSettings(enabled=True, ttl_seconds=300))
+    poll = create_poll_record(db_session, admin_user.id)
+    headers = auth_headers_for(admin_user)
+    storage = runtime.object_storage.client
+    upload = client.post(
+        f"/polls/{poll.id}/attachments/presign",
+        headers=headers,
+        json={"fileName": "notes.txt", "contentType": "text/plain", "sizeBytes": 5},
+    ).json()
+    key = ("test-bucket", upload["objectName"])
+    storage.objects[key] = b"notes"
+    storage.content_types[key] = "text/plain"
+
+    stat_object = storage.stat_object
+
+    def stat_then_overwrite(bucket_name, object_name):
+        stat = stat_object(bucket_name, object_name)
+        storage.objects[key] = b"x" * (11 * 1024 * 1024)
+        return stat
+
+    monkeypatch.setattr(storage, "stat_object", stat_then_overwrite)
+    response = client.post(f"/polls/{poll.id}/attachments/confirm", headers=headers, json={"objectName": upload["objectName"]})
+
+    assert response.status_code == 409
+    assert list(storage.objects) == [key]
+    assert db_session.query(PollAttachmentModel).count() == 0
+
+
+def test_poll_attachment_download_supports_ranges(client, db_session, admin_user, auth_headers_for):
+    poll = create_poll_record(db_session, admin_user.id)
+    payload = bytes(range(256)) * 4
+    headers = auth_headers_for(admin_user)
+    attachment = client.post(
+        f"/polls/{poll.id}/attachments",
+        headers=headers,
+        files={"file": ("scan.pdf", payload, "application/pdf")},
+    ).json()
+    url = attachment["downloadUrl"]
+
+    full = client.get(url, headers=headers)
+    assert full.status_code == 200
+    assert full.headers["accept-ranges"] == "bytes"
+    # Never gzipped: offsets of a resumed download address the stored bytes.
+    assert "content-encoding" not in full.headers
+    assert full.headers["content-length"] == "1024"
+    etag = full.headers["etag"]
+    assert etag == f'"{attachment["checksumSha256"]}"'
+
+    tail = client.get(url, headers={**headers, "Range": "bytes=1000-", "If-Range": etag})
+    assert tail.status_code == 206
+    assert tail.headers["content-range"] == "bytes 1000-1023/1024"
+    assert tail.content == payload[1000:]
+    assert runtime.object_storage.client.reads[-1][1:] == (1000, 24)
+
+    stale = client.get(url, headers={**headers, "Range": "bytes=1000-", "If-Range": '"stale"'})
+    assert stale.status_code == 200
+    assert stale.content == payload
+
+    unsatisfiable = client.get(url, headers={**headers, "Range": "bytes=4096-"})
+    assert unsatisfiable.status_code == 416
+    assert unsatisfiable.headers["content-range"] == "bytes */1024"
+
+    multi = client.get(url, headers={**headers, "Range": "bytes=0-9,-6"})
+    assert multi.status_code == 206
+    content_type = multi.headers["content-type"]
+    assert content_type.startswith("multipart/byteranges; boundary=")
+    boundary = content_type.split("boundary=")[1]
+    assert int(multi.headers["content-length"]) == len(multi.content)
+    sections = multi.content.split(f"--{boundary}".encode())
+    assert sections[-1] == b"--\r\n"
+    bodies = [section.split(b"\r\n\r\n", 1) for section in sections[1:-1]]
+    assert [head.decode().split("Content-Range: ")[1] for head, _ in bodies] == ["bytes 0-9/1024", "bytes 1018-1023/1024"]
+    assert [body[:-2] for _, body in bodies] == [payload[:10], payload[1018:]]
+
+
+def test_presigned_attachment_upload_and_download(client, db_session, admin_user, auth_headers_for, monkeypatch):
+    poll = create_poll_record(db_session, admin_user.id)
+    headers = auth_headers_for(admin_user)
+    storage = runtime.object_storage.client
+    request = {"fileName": "отчёт final.pdf", "contentType": "application/pdf", "sizeBytes": 2048}
+
+    disabled = client.post(f"/polls/{poll.id}/attachments/presign", headers=headers, json=request)
+    assert disabled.status_code == 404
+
+    monkeypatch.setattr(polls_router, "PRESIGN_SETTINGS", PresignSettings(enabled=True, ttl_seconds=300))
+    too_large = client.post(f"/polls/{poll.id}/attachments/presign", headers=headers, json={**request, "sizeBytes": 11 * 1024 * 1024})
+    assert too_large.status_code == 400
+
+    presigned = client.post(f"/polls/{poll.id}/attachments/presign", headers=headers, json=request)
+    assert presigned.status_code == 200
+    upload = presigned.json()
+    assert upload["method"] == "PUT"
+    assert upload["headers"] == {"Content-Type": "application/pdf"}
+    assert upload["objectName"].startswith(f"uploads/attachments/{poll.id}/")
+    assert upload["uploadUrl"].startswith(f"https://files.example/test-bucket/{upload['objectName']}?")
+
+    confirm_url = f"/polls/{poll.id}/attachments/confirm"
+    missing = client.post(confirm_url, headers=headers, json={"objectName": upload["objectName"]})
+    assert missing.status_code == 404
+    forged = client.post(confirm_url, headers=headers, json={"objectName": f"uploads/attachments/{poll.id}/../avatars/x.pdf"})
+    assert forged.status_code == 400
+
+    # The browser PUTs the file straight to storage.
+    storage.objects[("test-bucket", upload["objectName"])] = b"%PDF" * 512
+    storage.content_types[("test-bucket", upload["objectName"])] = "application/pdf"
+    confirmed = client.post(confirm_url, headers=headers, json={"objectName": upload["objectName"]})
+    assert confirmed.status_code == 201
+    attachment = confirmed.json()
+    assert attachment["sizeBytes"] == 2048
+    assert attachment["originalName"] == "отчётfinal.pdf"
+    # The checked file now lives under a name no presigned URL points to.
+    stored_name = db_session.get(PollAttachmentModel, attachment["id"]).object_name
+    assert stored_name.startswith(f"attachments/{poll.id}/") and stored_name.endswith("-отчётfinal.pdf")
+    assert [name for _, name in storage.objects] == [stored_name]
+    assert client.post(confirm_url, headers=headers, json={"objectName": upload["objectName"]}).status_code == 404
+
+    # Reusing the PUT URL afterwards cannot touch the recorded attachment.
+    storage.objects[("test-bucket", upload["objectName"])] = b"<html>" * 4096
+    storage.content_types[("test-bucket", upload["objectName"])] = "text/html"
+    assert storage.objects[("test-bucket", stored_name)] == b"%PDF" * 512
+
+    download = client.get(
+        f"/polls/{poll.id}/attachments/{attachment['id']}/presigned-download",
+        headers=headers,
+    )
+    assert download.status_code == 200
+    assert download.json()["url"].startswith(f"https://files.example/test-bucket/{stored_name}?")
+    assert "response-content-disposition=attachment" in download.json()["url"]
+
+
+def test_presigned_confirm_removes_rejected_objects(client, db_session, admin_user, auth_headers_for, monkeypatch):
+    monkeypatch.setattr(polls_router, "PRESIGN_SETTINGS", PresignSettings(enabled=True, ttl_seconds=300))
+    poll = create_poll_record(db_session, admin_user.id)
+    headers = auth_headers_for(admin_user)
+    storage = runtime.object_storage.client
+    upload = client.post(
+        f"/polls/{poll.id}/attachments/presign",
+        headers=headers,
+        json={"fileName": "notes.txt", "contentType": "text/plain", "sizeBytes": 10},
+    ).json()
+
+    # A presigned PUT cannot stop the client sending another type or size.
+    storage.objects[("test-bucket", upload["objectName"])] = b"<html></html>"
+    storage.content_types[("test-bucket", upload["objectName"])] = "text/html"
+    response = client.post(f"/polls/{poll.id}/attachments/confirm", headers=headers, json={"objectName": upload["objectName"]})
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Unsupported file type"
+    assert storage.objects == {}
+    assert db_session.query(PollAttachmentModel).count() == 0
+
+
 def test_user_cannot_delete_foreign_poll(client, db_session, admin_user, regular_user, auth_headers_for):
     poll = create_poll_record(db_session, admin_user.id)
     response = client.delete(f"/polls/{poll.id}", headers=auth_headers_for(regular_user))
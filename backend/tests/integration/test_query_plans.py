@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from database import async_engine, async_writer_engine, engine, writer_engine
+from models import Poll as PollModel
+from models import PollVariant, Vote as VoteModel
+from tests.support.query_plans import QueryRecorder, assert_index_lookup, assert_no_full_scans
+
+pytestmark = [pytest.mark.integration, pytest.mark.query_plan]
+
+POLL_TABLES = ("poll_variants", "votes", "users")
+
+
+def seed_poll(db_session, owner_user_id: str, *, title: str, is_anonymous: bool = False) -> PollModel:
+    poll = PollModel(
+        title=title,
+        description="Описание",
+        deadline_iso=datetime.now(timezone.utc) + timedelta(days=1),
+        type="multi",
+        max_selections=2,
+        is_anonymous=is_anonymous,
+        owner_user_id=owner_user_id,
+    )
+    db_session.add(poll)
+    db_session.flush()
+    db_session.add_all([PollVariant(poll_id=poll.id, label=f"Вариант {index}") for index in range(3)])
+    db_session.commit()
+    db_session.refresh(poll)
+    return poll
+
+
+@pytest.fixture
+def capture_queries():
+    def factory() -> QueryRecorder:
+        return QueryRecorder(engine, async_engine.sync_engine, writer_engine, async_writer_engine.sync_engine)
+
+    return factory
+
+
+def test_list_polls_loads_variants_in_one_indexed_query(client, db_session, admin_user, capture_queries):
+    for index in range(6):
+        seed_poll(db_session, admin_user.id, title=f"Опрос {index}")
+
+    with capture_queries() as recorder:
+        response = client.get("/polls", params={"limit": 5})
+
+    assert response.status_code == 200
+    assert len(response.json()["items"]) == 5
+    # count + page + one batched variants load, however many polls are on the page.
+    assert recorder.count <= 3
+    plans = recorder.explain()
+    assert_index_lookup(plans, "poll_variants", "poll_id")
+    assert_no_full_scans(plans, ["poll_variants"])
+
+
+def test_get_results_reads_votes_through_indexes(client, db_session, admin_user, regular_user, capture_queries):
+    poll = seed_poll(db_session, admin_user.id, title="Публичный")
+    for user in (admin_user, regular_user):
+        db_session.add(VoteModel(poll_id=poll.id, variant_id=poll.variants[0].id, user_id=user.id))
+    poll_id = poll.id
+    db_session.commit()
+
+    with capture_queries() as recorder:
+        response = client.get(f"/polls/{poll_id}/results")
+
+    assert response.status_code == 200
+    assert response.json()["total"] == 2
+    assert recorder.count <= 5
+    plans = recorder.explain()
+    assert_index_lookup(plans, "votes", "poll_id")
+    assert_no_full_scans(plans, ("polls",) + POLL_TABLES)
+
+
+def test_vote_issues_a_bounded_number_of_indexed_statements(client, db_session, admin_user, regular_user, auth_headers_for, capture_queries):
+    poll = seed_poll(db_session, admin_user.id, title="Голосование")
+    poll_id = poll.id
+    choices = [variant.id for variant in poll.variants[:2]]
+    headers = auth_headers_for(regular_user)
+
+    with capture_queries() as recorder:
+        response = client.post(f"/polls/{poll_id}/vote", json={"choices": choices}, headers=headers)
+
+    assert response.status_code == 200
+    # user, poll, variants, delete previous votes, one batched insert.
+    assert recorder.count <= 5
+    plans = recorder.explain()
+    assert_index_lookup(plans, "votes", "poll_id")
+    assert_no_full_scans(plans, ("polls",) + POLL_TABLES)
+
+
+def test_get_current_user_is_a_single_primary_key_lookup(client, regular_user, auth_headers_for, capture_queries):
+    headers = auth_headers_for(regular_user)
+
+    with capture_queries() as recorder:
+        response = client.get("/auth/me", headers=headers)
+
+    assert response.status_code == 200
+    assert recorder.count == 1
+    assert_no_full_scans(recorder.explain(), ["users"])
+
+
+def test_refresh_flow_uses_session_and_user_indexes(client, regular_user, capture_queries):
+    login = client.post("/auth/login", json={"username": "student", "password": "Student123!"})
+    refresh_token = login.json()["tokens"]["refreshToken"]
+
+    with capture_queries() as recorder:
+        response = client.post("/auth/refresh", json={"refreshToken": refresh_token})
+
+    assert response.status_code == 200
+    # session lookup, user lookup, revoke old session, insert new session.
+    assert recorder.count <= 4
+    assert_no_full_scans(recorder.explain(), ["refresh_token_sessions", "users"])
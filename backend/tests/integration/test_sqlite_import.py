@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import sqlite3
+import uuid
+
+import pytest
+
+from models import Poll as PollModel
+from models import PollVariant, User as UserModel
+from models import Vote as VoteModel
+from models import uuid_key
+from services.sqlite_import import ImportProgress, SqliteImporter, SqliteImportSettings
+
+pytestmark = pytest.mark.integration
+
+SETTINGS = SqliteImportSettings(batch_size=4, use_copy=True)
+VOTERS = 10
+
+
+class ImportInterrupted(Exception):
+    pass
+
+
+def build_source(path) -> dict:
+    poll_id, variant_ids = str(uuid.uuid4()), [str(uuid.uuid4()), str(uuid.uuid4())]
+    connection = sqlite3.connect(path)
+    connection.executescript(
+        """
+        CREATE TABLE users (id VARCHAR PRIMARY KEY, username VARCHAR, email VARCHAR, name VARCHAR, role VARCHAR, password_hash VARCHAR);
+        CREATE TABLE polls (id VARCHAR PRIMARY KEY, title VARCHAR, description TEXT, type VARCHAR, created_at VARCHAR);
+        CREATE TABLE poll_variants (id VARCHAR PRIMARY KEY, poll_id VARCHAR, label VARCHAR);
+        CREATE TABLE votes (id VARCHAR PRIMARY KEY, poll_id VARCHAR, variant_id VARCHAR, user_id VARCHAR, created_at VARCHAR);
+        """
+    )
+    # Legacy ids need not be UUIDs; they are mapped the same way everywhere.
+    users = [(f"legacy-{index}", f"voter{index}", f"voter{index}@example.com", "Voter", None, None) for index in range(VOTERS)]
+    connection.executemany("INSERT INTO users VALUES (?, ?, ?, ?, ?, ?)", users)
+    connection.execute(
+        "INSERT INTO polls VALUES (?, 'Импорт', NULL, 'single', '2026-01-02T03:04:05Z')", (poll_id,)
+    )
+    connection.executemany(
+        "INSERT INTO poll_variants VALUES (?, ?, ?)", [(variant_ids[0], poll_id, "Да"), (variant_ids[1], poll_id, "Нет")]
+    )
+    connection.executemany(
+        "INSERT INTO votes VALUES (?, ?, ?, ?, NULL)",
+        [(str(uuid.uuid4()), poll_id, variant_ids[index % 2], f"legacy-{index}") for index in range(VOTERS)],
+    )
+    connection.commit()
+    connection.close()
+    return {"poll_id": poll_id, "variant_ids": variant_ids}
+
+
+def build_importer(db_session, source_path, progress=None) -> SqliteImporter:
+    return SqliteImporter(db_session, source_path, SETTINGS, lambda password: f"hashed:{password}", progress=progress)
+
+
+def test_import_streams_all_tables_in_chunks_and_is_idempotent(db_session, tmp_path):
+    source_path = tmp_path / "legacy.db"
+    source = build_source(source_path)
+    progress: list[ImportProgress] = []
+
+    inserted = build_importer(db_session, source_path, progress.append).run()
+
+    assert inserted == {"users": VOTERS, "polls": 1, "poll_variants": 2, "votes": VOTERS}
+    assert [(item.table, item.read, item.total) for item in progress if item.table == "votes"] == [
+        ("votes", 4, VOTERS),
+        ("votes", 8, VOTERS),
+        ("votes", 10, VOTERS),
+    ]
+    db_session.expire_all()
+    poll = db_session.get(PollModel, source["poll_id"])
+    assert poll.created_at.isoformat() == "2026-01-02T03:04:05"
+    assert sorted(variant.id for variant in poll.variants) == sorted(source["variant_ids"])
+    voter = db_session.get(UserModel, "legacy-3")
+    assert voter.id == str(uuid_key("legacy-3")) and voter.role == "user"
+    assert voter.password_hash == "hashed:changeme"
+    assert db_session.query(VoteModel).filter(VoteModel.user_id == "legacy-3").count() == 1
+
+    # A finished import is recorded; running it again inserts nothing.
+    assert build_importer(db_session, source_path).run() == {"users": 0, "polls": 0, "poll_variants": 0, "votes": 0}
+
+
+def test_interrupted_import_resumes_from_the_checkpoint(db_session, tmp_path):
+    source_path = tmp_path / "legacy.db"
+    build_source(source_path)
+
+    def crash_after_first_vote_chunk(progress: ImportProgress) -> None:
+        if progress.table == "votes":
+            raise ImportInterrupted()
+
+    with pytest.raises(ImportInterrupted):
+        build_importer(db_session, source_path, crash_after_first_vote_chunk).run()
+    db_session.rollback()
+    assert db_session.query(VoteModel).count() == 4
+    assert build_importer(db_session, source_path).has_unfinished_checkpoint()
+
+    resumed: list[ImportProgress] = []
+    inserted = build_importer(db_session, source_path, resumed.append).run()
+
+    assert inserted == {"users": 0, "polls": 0, "poll_variants": 0, "votes": VOTERS - 4}
+    assert [(item.table, item.read) for item in resumed] == [("votes", 8), ("votes", 10)]
+    assert db_session.query(UserModel).count() == VOTERS
+    assert db_session.query(PollVariant).count() == 2
+    assert db_session.query(VoteModel).count() == VOTERS
+    assert not build_importer(db_session, source_path).has_unfinished_checkpoint()
@@ -1,6 +1,16 @@
 from __future__ import annotations
 
+import io
+import json
+
 import pytest
+from PIL import Image
+
+import routers.users as users_router
+import runtime
+from models import User as UserModel
+from services.presigned_storage import PresignSettings
+from tests.support.images import image_bytes
 
 pytestmark = pytest.mark.integration
 
@@ -8,7 +18,7 @@ pytestmark = pytest.mark.integration
 def test_admin_can_list_users_and_change_role(client, admin_user, regular_user, auth_headers_for):
     list_response = client.get("/users", headers=auth_headers_for(admin_user))
     assert list_response.status_code == 200
-    assert {item["username"] for item in list_response.json()} == {"admin", "student"}
+    assert {item["username"] for item in list_response.json()["items"]} == {"admin", "student"}
 
     update_response = client.patch(
         f"/admin/users/{regular_user.id}/role",
@@ -19,11 +29,58 @@ def test_admin_can_list_users_and_change_role(client, admin_user, regular_user,
     assert update_response.json()["role"] == "admin"
 
 
+def test_admin_user_listing_uses_keyset_pagination_and_filters(client, admin_user, create_user, auth_headers_for):
+    for index in range(5):
+        create_user(username=f"user{index}", email=f"user{index}@example.com", name=f"Студент {index}")
+    headers = auth_headers_for(admin_user)
+
+    first_page = client.get("/users", params={"limit": 4}, headers=headers)
+    assert first_page.status_code == 200
+    first_payload = first_page.json()
+    assert [item["username"] for item in first_payload["items"]] == ["admin", "user0", "user1", "user2"]
+    assert first_payload["nextCursor"]
+
+    second_page = client.get("/users", params={"limit": 4, "cursor": first_payload["nextCursor"]}, headers=headers)
+    second_payload = second_page.json()
+    assert [item["username"] for item in second_payload["items"]] == ["user3", "user4"]
+    assert second_payload["nextCursor"] is None
+
+    search_response = client.get("/users", params={"search": "USER3@"}, headers=headers)
+    assert [item["username"] for item in search_response.json()["items"]] == ["user3"]
+
+    role_response = client.get("/users", params={"role": "admin"}, headers=headers)
+    assert [item["username"] for item in role_response.json()["items"]] == ["admin"]
+
+    invalid_cursor = client.get("/users", params={"cursor": "%%%"}, headers=headers)
+    assert invalid_cursor.status_code == 400
+
+
+def test_admin_can_stream_user_export(client, admin_user, regular_user, auth_headers_for):
+    _ = regular_user
+    headers = auth_headers_for(admin_user)
+
+    jsonl_response = client.get("/users/export", headers=headers)
+    assert jsonl_response.status_code == 200
+    assert jsonl_response.headers["content-type"].startswith("application/x-ndjson")
+    records = [json.loads(line) for line in jsonl_response.text.splitlines()]
+    assert [record["username"] for record in records] == ["admin", "student"]
+    assert "password_hash" not in records[0]
+
+    csv_response = client.get("/users/export", params={"format": "csv", "role": "user"}, headers=headers)
+    assert csv_response.status_code == 200
+    lines = csv_response.text.strip().splitlines()
+    assert lines[0] == "id,username,email,name,role,created_at"
+    assert len(lines) == 2
+    assert ",student,student@example.com," in lines[1]
+
+
 def test_regular_user_cannot_list_all_users(client, regular_user, auth_headers_for):
     response = client.get("/users", headers=auth_headers_for(regular_user))
+    export_response = client.get("/users/export", headers=auth_headers_for(regular_user))
 
     assert response.status_code == 403
     assert response.json()["detail"] == "Forbidden"
+    assert export_response.status_code == 403
 
 
 def test_last_admin_cannot_be_demoted(client, admin_user, auth_headers_for):
@@ -57,7 +114,159 @@ def test_profile_read_update_and_avatar_upload(client, regular_user, auth_header
     avatar_response = client.post(
         "/me/avatar",
         headers=auth_headers_for(regular_user),
-        files={"file": ("avatar.png", b"avatar-bytes", "image/png")},
+        files={"file": ("avatar.png", image_bytes("PNG", (1200, 800), (10, 20, 30, 128)), "image/png")},
     )
     assert avatar_response.status_code == 200
-    assert avatar_response.json()["avatarUrl"].startswith("https://files.example/")
+    avatar_url = avatar_response.json()["avatarUrl"]
+    assert avatar_url.startswith(f"https://files.example/test-bucket/{regular_user.id}/")
+    assert avatar_url.endswith("/256.jpg")
+    storage = runtime.object_storage.client
+    stored = {name: payload for (_, name), payload in storage.objects.items()}
+    assert len(stored) == 6
+    for name, payload in stored.items():
+        size, _, extension = name.rsplit("/", 1)[1].partition(".")
+        with Image.open(io.BytesIO(payload)) as variant:
+            assert variant.size == (int(size), int(size))
+            assert variant.format == {"jpg": "JPEG", "webp": "WEBP"}[extension]
+        assert storage.metadata[("test-bucket", name)]["Cache-Control"].endswith("immutable")
+
+    not_an_image = client.post(
+        "/me/avatar",
+        headers=auth_headers_for(regular_user),
+        files={"file": ("avatar.png", b"avatar-bytes", "image/png")},
+    )
+    assert not_an_image.status_code == 400
+    assert len(storage.objects) == 6
+
+
+def test_presigned_avatar_upload_replaces_the_previous_avatar(client, regular_user, auth_headers_for, monkeypatch):
+    monkeypatch.setattr(users_router, "PRESIGN_SETTINGS", PresignSettings(enabled=True, ttl_seconds=300))
+    headers = auth_headers_for(regular_user)
+    storage = runtime.object_storage.client
+    old_avatar = client.post("/me/avatar", headers=headers, files={"file": ("a.png", image_bytes(), "image/png")}).json()["avatarUrl"]
+
+    upload = client.post("/me/avatar/presign", headers=headers, json={"contentType": "image/jpeg", "sizeBytes": 3}).json()
+    assert upload["objectName"].startswith(f"uploads/avatars/{regular_user.id}/") and upload["objectName"].endswith(".jpg")
+    foreign = client.post("/me/avatar/confirm", headers=headers, json={"objectName": f"uploads/avatars/someone-else/{'0' * 32}.jpg"})
+    assert foreign.status_code == 400
+
+    storage.objects[("test-bucket", upload["objectName"])] = image_bytes("JPEG", color=(0, 90, 200))
+    storage.content_types[("test-bucket", upload["objectName"])] = "image/jpeg"
+    confirmed = client.post("/me/avatar/confirm", headers=headers, json={"objectName": upload["objectName"]})
+
+    assert confirmed.status_code == 200
+    new_avatar = confirmed.json()["avatarUrl"]
+    assert new_avatar != old_avatar and new_avatar.endswith("/256.jpg")
+    # Only the new variants are left: the raw upload and the old variants are gone.
+    base = new_avatar.split("/test-bucket/", 1)[1].rsplit("/", 1)[0]
+    assert sorted(name for _, name in storage.objects) == sorted(
+        f"{base}/{size}.{extension}" for size in (64, 128, 256) for extension in ("jpg", "webp")
+    )
+
+
+def test_presigned_avatar_confirm_rereads_within_the_size_limit(client, regular_user, auth_headers_for, monkeypatch):
+    monkeypatch.setattr(users_router, "PRESIGN_SETTINGS", PresignSettings(enabled=True, ttl_seconds=300))
+    headers = auth_headers_for(regular_user)
+    storage = runtime.object_storage.client
+    upload = client.post("/me/avatar/presign", headers=headers, json={"contentType": "image/png", "sizeBytes": 3}).json()
+    key = ("test-bucket", upload["objectName"])
+    storage.objects[key] = image_bytes()
+    storage.content_types[key] = "image/png"
+
+    stat_object = storage.stat_object
+
+    def stat_then_overwrite(bucket_name, object_name):
+        stat = stat_object(bucket_name, object_name)
+        storage.objects[key] = b"x" * (users_router.AVATAR_MAX_SIZE_BYTES + 1)
+        return stat
+
+    monkeypatch.setattr(storage, "stat_object", stat_then_overwrite)
+    response = client.post("/me/avatar/confirm", headers=headers, json={"objectName": upload["objectName"]})
+
+    assert response.status_code == 409
+    assert storage.objects == {}
+
+
+def test_batch_lookup_can_ask_for_small_avatar_variants(client, db_session, admin_user, regular_user, auth_headers_for):
+    avatar = client.post(
+        "/me/avatar",
+        headers=auth_headers_for(regular_user),
+        files={"file": ("a.png", image_bytes(), "image/png")},
+    ).json()["avatarUrl"]
+    admin_user.avatar_url = "/static/avatars/legacy.png"
+    db_session.commit()
+
+    response = client.get(
+        "/users/batch",
+        params={"ids": f"{regular_user.id},{admin_user.id}", "avatarSize": 64, "avatarFormat": "webp"},
+        headers=auth_headers_for(admin_user),
+    )
+    assert response.status_code == 200
+    assert [item["avatarUrl"] for item in response.json()["items"]] == [
+        avatar.replace("/256.jpg", "/64.webp"),
+        "/static/avatars/legacy.png",
+    ]
+    invalid = client.get(
+        "/users/batch",
+        params={"ids": regular_user.id, "avatarSize": 100},
+        headers=auth_headers_for(admin_user),
+    )
+    assert invalid.status_code == 400
+
+
+def test_batch_lookup_returns_compact_records_in_request_order(client, admin_user, regular_user, auth_headers_for):
+    response = client.get(
+        "/users/batch",
+        params={"ids": f"{regular_user.id},missing-user,{admin_user.id}"},
+        headers=auth_headers_for(admin_user),
+    )
+    assert response.status_code == 200
+    items = response.json()["items"]
+    assert [item["id"] for item in items] == [regular_user.id, admin_user.id]
+    assert items[0] == {
+        "id": regular_user.id,
+        "username": "student",
+        "name": regular_user.name,
+        "role": "user",
+        "avatarUrl": None,
+    }
+
+    repeated = client.get(
+        "/users/batch",
+        params=[("ids", admin_user.id), ("ids", admin_user.id)],
+        headers=auth_headers_for(admin_user),
+    )
+    assert [item["id"] for item in repeated.json()["items"]] == [admin_user.id]
+
+
+def test_batch_lookup_and_self_check_accept_legacy_and_uppercase_ids(client, db_session, admin_user, regular_user, auth_headers_for):
+    legacy = UserModel(id="legacy-3", username="legacy", email="legacy@example.com", name="Legacy", role="user", password_hash="x")
+    db_session.add(legacy)
+    db_session.commit()
+    admin_headers = auth_headers_for(admin_user)
+
+    assert client.get("/users/legacy-3", headers=admin_headers).status_code == 200
+    response = client.get("/users/batch", params={"ids": f"legacy-3,{regular_user.id.upper()}"}, headers=admin_headers)
+    assert response.status_code == 200
+    assert [item["id"] for item in response.json()["items"]] == [legacy.id, regular_user.id]
+
+    # A user's own id in another spelling is still their own id.
+    headers = auth_headers_for(regular_user)
+    assert client.get(f"/users/{regular_user.id.upper()}", headers=headers).status_code == 200
+    own = client.get("/users/batch", params={"ids": regular_user.id.upper()}, headers=headers)
+    assert own.status_code == 200
+    assert [item["id"] for item in own.json()["items"]] == [regular_user.id]
+
+
+def test_batch_lookup_keeps_get_user_permissions(client, admin_user, regular_user, auth_headers_for):
+    headers = auth_headers_for(regular_user)
+
+    own = client.get("/users/batch", params={"ids": regular_user.id}, headers=headers)
+    assert own.status_code == 200
+    assert [item["id"] for item in own.json()["items"]] == [regular_user.id]
+
+    others = client.get("/users/batch", params={"ids": f"{regular_user.id},{admin_user.id}"}, headers=headers)
+    assert others.status_code == 403
+
+    empty = client.get("/users/batch", params={"ids": " , "}, headers=headers)
+    assert empty.status_code == 400
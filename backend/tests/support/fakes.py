@@ -1,13 +1,24 @@
 from __future__ import annotations
 
+import hashlib
 import io
 from datetime import timedelta
+from types import SimpleNamespace
 from typing import Any, Dict, Optional
 
+from minio.error import S3Error
+
 
 class FakeMinioObjectResponse:
     def __init__(self, payload: bytes) -> None:
         self._payload = payload
+        self._position = 0
+
+    def read(self, amt: Optional[int] = None) -> bytes:
+        end = len(self._payload) if amt is None else self._position + amt
+        chunk = self._payload[self._position: end]
+        self._position += len(chunk)
+        return chunk
 
     def stream(self, amt: int = 8192):
         for offset in range(0, len(self._payload), amt):
@@ -25,6 +36,9 @@ class FakeMinioClient:
         self.buckets: set[str] = set()
         self.objects: Dict[tuple[str, str], bytes] = {}
         self.content_types: Dict[tuple[str, str], Optional[str]] = {}
+        self.metadata: Dict[tuple[str, str], Dict[str, str]] = {}
+        self.largest_read = 0
+        self.reads: list[tuple[str, int, int]] = []
 
     def bucket_exists(self, bucket_name: str) -> bool:
         return bucket_name in self.buckets
@@ -39,26 +53,73 @@ class FakeMinioClient:
         data: io.BytesIO,
         length: int,
         content_type: Optional[str] = None,
+        part_size: int = 0,
+        metadata: Optional[Dict[str, str]] = None,
     ) -> None:
+        if length >= 0:
+            payload = data.read(length)
+        else:
+            # Like the real client: pull one part at a time until the stream ends;
+            # an exception from read() aborts the upload and stores nothing.
+            parts = []
+            while True:
+                part = data.read(part_size)
+                if not part:
+                    break
+                self.largest_read = max(self.largest_read, len(part))
+                parts.append(part)
+            payload = b"".join(parts)
         self.buckets.add(bucket_name)
-        self.objects[(bucket_name, object_name)] = data.read(length)
+        self.objects[(bucket_name, object_name)] = payload
         self.content_types[(bucket_name, object_name)] = content_type
+        self.metadata[(bucket_name, object_name)] = metadata or {}
 
     def remove_object(self, bucket_name: str, object_name: str) -> None:
         self.objects.pop((bucket_name, object_name), None)
         self.content_types.pop((bucket_name, object_name), None)
 
-    def presigned_get_object(self, bucket_name: str, object_name: str, expires: timedelta) -> str:
+    def presigned_get_object(
+        self,
+        bucket_name: str,
+        object_name: str,
+        expires: timedelta,
+        response_headers: Optional[Dict[str, str]] = None,
+    ) -> str:
         _ = expires
         if (bucket_name, object_name) not in self.objects:
             raise KeyError(object_name)
-        return f"https://files.example/{bucket_name}/{object_name}"
+        query = "&".join(f"{name}={value}" for name, value in (response_headers or {}).items())
+        return f"https://files.example/{bucket_name}/{object_name}" + (f"?{query}" if query else "")
+
+    def presigned_put_object(self, bucket_name: str, object_name: str, expires: timedelta) -> str:
+        _ = expires
+        return f"https://files.example/{bucket_name}/{object_name}?X-Amz-Signature=fake"
+
+    def stat_object(self, bucket_name: str, object_name: str) -> SimpleNamespace:
+        payload = self.objects.get((bucket_name, object_name))
+        if payload is None:
+            raise S3Error("NoSuchKey", "Object does not exist", object_name, None, None, None)
+        return SimpleNamespace(
+            size=len(payload),
+            content_type=self.content_types.get((bucket_name, object_name)),
+            etag=hashlib.md5(payload).hexdigest(),
+        )
+
+    def copy_object(self, bucket_name: str, object_name: str, source: Any) -> None:
+        payload = self.objects.get((source.bucket_name, source.object_name))
+        if payload is None:
+            raise S3Error("NoSuchKey", "Object does not exist", source.object_name, None, None, None)
+        if source.match_etag is not None and source.match_etag != hashlib.md5(payload).hexdigest():
+            raise S3Error("PreconditionFailed", "ETag does not match", source.object_name, None, None, None)
+        self.objects[(bucket_name, object_name)] = payload
+        self.content_types[(bucket_name, object_name)] = self.content_types.get((source.bucket_name, source.object_name))
 
-    def get_object(self, bucket_name: str, object_name: str) -> FakeMinioObjectResponse:
+    def get_object(self, bucket_name: str, object_name: str, offset: int = 0, length: int = 0) -> FakeMinioObjectResponse:
         payload = self.objects.get((bucket_name, object_name))
         if payload is None:
             raise KeyError(object_name)
-        return FakeMinioObjectResponse(payload)
+        self.reads.append((object_name, offset, length))
+        return FakeMinioObjectResponse(payload[offset: offset + length] if length else payload[offset:])
 
 
 class StubWeatherAdapter:
@@ -0,0 +1,13 @@
+from __future__ import annotations
+
+import io
+from typing import Tuple
+
+from PIL import Image
+
+
+def image_bytes(image_format: str = "PNG", size: Tuple[int, int] = (640, 480), color=(200, 40, 40)) -> bytes:
+    mode = "RGBA" if len(color) == 4 else "RGB"
+    buffer = io.BytesIO()
+    Image.new(mode, size, color).save(buffer, image_format)
+    return buffer.getvalue()
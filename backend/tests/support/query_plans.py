@@ -0,0 +1,176 @@
+"""Capture the SQL an endpoint issues and EXPLAIN every statement.
+
+Works on SQLite (``EXPLAIN QUERY PLAN``) and Postgres (``EXPLAIN (FORMAT JSON)``),
+so the query-plan tests can run against whichever database ``DATABASE_URL``
+points at.
+"""
+from __future__ import annotations
+
+import json
+import re
+from dataclasses import dataclass, field
+from typing import Any, Iterable, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+EXPLAINABLE_PREFIXES = ("select", "update", "delete", "with")
+# Transaction control is not part of an endpoint's query budget (the SQLite writer
+# issues an explicit BEGIN IMMEDIATE, Postgres does not).
+TRANSACTION_CONTROL_PREFIXES = ("begin", "commit", "rollback", "savepoint", "release")
+_SQLITE_STEP = re.compile(
+    r"^(?P<kind>SCAN|SEARCH) (?P<table>\S+)(?: AS \S+)?"
+    r"(?: USING (?:COVERING )?INDEX (?P<index>\S+)| USING (?:INTEGER )?(?P<pk>PRIMARY KEY))?"
+)
+
+
+@dataclass(frozen=True)
+class CapturedStatement:
+    sql: str
+    parameters: Any
+    executemany: bool
+
+    @property
+    def explainable(self) -> bool:
+        return self.sql.lstrip().lower().startswith(EXPLAINABLE_PREFIXES)
+
+
+@dataclass(frozen=True)
+class PlanStep:
+    table: str
+    index: Optional[str]
+    detail: str
+
+    @property
+    def full_scan(self) -> bool:
+        return self.index is None
+
+
+@dataclass
+class QueryPlan:
+    statement: CapturedStatement
+    steps: List[PlanStep] = field(default_factory=list)
+
+    def full_scans(self) -> List[str]:
+        return [step.table for step in self.steps if step.full_scan]
+
+    def uses_index(self, name: str) -> bool:
+        return any(step.index == name for step in self.steps)
+
+    def index_lookup(self, table: str, column: str) -> bool:
+        return any(step.table == table and step.index and column in step.detail for step in self.steps)
+
+    def describe(self) -> str:
+        lines = [self.statement.sql.strip()]
+        lines.extend(f"  -> {step.detail}" for step in self.steps)
+        return "\n".join(lines)
+
+
+class QueryRecorder:
+    """Records every statement sent to the DBAPI cursor while the context is open.
+
+    Pass the ``sync_engine`` of an async engine or a dedicated writer engine as
+    extra engines to record those routes too; statements are explained through the
+    first engine.
+    """
+
+    def __init__(self, engine: Engine, *extra_engines: Engine) -> None:
+        self.engine = engine
+        self.engines = tuple({id(item): item for item in (engine, *extra_engines)}.values())
+        self.statements: List[CapturedStatement] = []
+
+    def __enter__(self) -> "QueryRecorder":
+        for engine in self.engines:
+            event.listen(engine, "before_cursor_execute", self._capture)
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        for engine in self.engines:
+            event.remove(engine, "before_cursor_execute", self._capture)
+
+    def _capture(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        if statement.lstrip().lower().startswith(TRANSACTION_CONTROL_PREFIXES):
+            return
+        self.statements.append(CapturedStatement(statement, parameters, executemany))
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def explain(self) -> List[QueryPlan]:
+        return explain_statements(self.engine, [stmt for stmt in self.statements if stmt.explainable])
+
+
+def explain_statements(engine: Engine, statements: Iterable[CapturedStatement]) -> List[QueryPlan]:
+    dialect = engine.dialect.name
+    connection = engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        if dialect == "postgresql":
+            # Test tables are tiny, so the planner would pick sequential scans even when a
+            # usable index exists; forbid them to see which index a real table would get.
+            cursor.execute("SET enable_seqscan = off")
+        plans = []
+        for statement in statements:
+            parameters = statement.parameters
+            if statement.executemany:
+                parameters = parameters[0]
+            if dialect == "postgresql":
+                cursor.execute(f"EXPLAIN (FORMAT JSON) {statement.sql}", parameters)
+                plans.append(QueryPlan(statement, _postgres_steps(cursor.fetchone()[0])))
+            else:
+                cursor.execute(f"EXPLAIN QUERY PLAN {statement.sql}", parameters)
+                plans.append(QueryPlan(statement, _sqlite_steps(row[-1] for row in cursor.fetchall())))
+        cursor.close()
+        connection.rollback()
+        return plans
+    finally:
+        connection.close()
+
+
+def _sqlite_steps(details: Iterable[str]) -> List[PlanStep]:
+    steps = []
+    for detail in details:
+        match = _SQLITE_STEP.match(detail)
+        if not match or match.group("table").startswith("("):
+            # Temp B-trees, subquery and CTE markers do not touch a table directly.
+            continue
+        steps.append(PlanStep(match.group("table"), match.group("index") or match.group("pk"), detail))
+    return steps
+
+
+def _postgres_steps(document: Any) -> List[PlanStep]:
+    if isinstance(document, str):
+        document = json.loads(document)
+    steps: List[PlanStep] = []
+
+    def walk(node: dict) -> None:
+        table = node.get("Relation Name")
+        node_type = node.get("Node Type", "")
+        if table and node_type == "Seq Scan":
+            steps.append(PlanStep(table, None, f"Seq Scan on {table}"))
+        elif table and node.get("Index Name"):
+            steps.append(PlanStep(table, node["Index Name"], f"{node_type} on {table} using {node['Index Name']} {node.get('Index Cond', '')}"))
+        elif table and node_type == "Bitmap Heap Scan":
+            for child in node.get("Plans", []):
+                if child.get("Index Name"):
+                    steps.append(PlanStep(table, child["Index Name"], f"Bitmap scan on {table} using {child['Index Name']} {child.get('Index Cond', '')}"))
+        for child in node.get("Plans", []):
+            walk(child)
+
+    for entry in document:
+        walk(entry["Plan"])
+    return steps
+
+
+def assert_no_full_scans(plans: Iterable[QueryPlan], tables: Iterable[str]) -> None:
+    watched = set(tables)
+    offenders = [plan for plan in plans if watched.intersection(plan.full_scans())]
+    assert not offenders, "Full table scans:\n" + "\n\n".join(plan.describe() for plan in offenders)
+
+
+def assert_index_lookup(plans: Iterable[QueryPlan], table: str, column: str) -> None:
+    plans = list(plans)
+    assert any(plan.index_lookup(table, column) for plan in plans), (
+        f"No statement reached {table}.{column} through an index:\n" + "\n\n".join(plan.describe() for plan in plans)
+    )
@@ -2,11 +2,12 @@ from __future__ import annotations
 
 from datetime import datetime, timedelta, timezone
 
+import jwt
 import pytest
 
 from repositories.auth_repository import RefreshSessionRepository, UserRepository
 from runtime import verify_password
-from services.auth_service import AuthError, AuthService, AuthSettings, TokenService
+from services.auth_service import AuthError, AuthService, AuthSettings, TokenService, VerifiedTokenCache
 from models import RefreshTokenSession
 
 pytestmark = pytest.mark.unit
@@ -162,3 +163,78 @@ def test_expired_refresh_session_is_rejected(db_session, create_user):
             user_agent="pytest",
             ip_address="127.0.0.1",
         )
+
+
+def build_cached_token_service(cache_size: int = 8) -> TokenService:
+    return TokenService(
+        AuthSettings(
+            secret_key="unit-test-secret",
+            algorithm="HS256",
+            issuer="survey-app-tests",
+            access_token_ttl_minutes=15,
+            refresh_token_ttl_days=7,
+            access_token_cache_size=cache_size,
+        )
+    )
+
+
+def test_access_token_cache_skips_repeated_verification(monkeypatch: pytest.MonkeyPatch):
+    token_service = build_cached_token_service()
+    access_token, _ = token_service.issue_access_token(user_id="user-1", role="user")
+
+    first = token_service.decode_access_token(access_token)
+
+    def fail_decode(*args, **kwargs):
+        raise AssertionError("cached token must not be decoded again")
+
+    monkeypatch.setattr(jwt, "decode", fail_decode)
+    second = token_service.decode_access_token(access_token)
+
+    assert second == first
+    stats = token_service.access_token_cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["hitRatio"] == 0.5
+
+
+def test_access_token_cache_rejects_expired_and_malformed_tokens():
+    token_service = build_cached_token_service()
+    expired_payload = token_service._base_payload(
+        subject="user-1",
+        token_type="access",
+        expires_at=datetime.now(timezone.utc) - timedelta(seconds=1),
+    )
+    expired_token = jwt.encode(expired_payload, "unit-test-secret", algorithm="HS256")
+    # An entry verified while still valid must not outlive its exp claim.
+    token_service.access_token_cache.put(
+        expired_token,
+        {"sub": "user-1", "type": "access", "exp": int(expired_payload["exp"].timestamp())},
+    )
+
+    with pytest.raises(AuthError, match="Token expired"):
+        token_service.decode_access_token(expired_token)
+    with pytest.raises(AuthError, match="Invalid token"):
+        token_service.decode_access_token("not-a-jwt")
+    assert token_service.access_token_cache.stats()["size"] == 0
+
+    refresh_token, _ = token_service.issue_refresh_token(
+        user_id="user-1",
+        role="user",
+        session_id="session-1",
+        expires_at=datetime.now(timezone.utc) + timedelta(days=1),
+    )
+    with pytest.raises(AuthError, match="Invalid token type"):
+        token_service.decode_access_token(refresh_token)
+
+
+def test_access_token_cache_evicts_least_recently_used_entries():
+    cache = VerifiedTokenCache(max_entries=2)
+    exp = datetime.now(timezone.utc).timestamp() + 60
+    cache.put("token-a", {"sub": "a", "exp": exp})
+    cache.put("token-b", {"sub": "b", "exp": exp})
+    assert cache.get("token-a") is not None
+    cache.put("token-c", {"sub": "c", "exp": exp})
+
+    assert cache.get("token-b") is None
+    assert cache.get("token-a")["sub"] == "a"
+    assert cache.stats()["evictions"] == 1
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import io
+
+import pytest
+from PIL import Image
+
+from services.avatar_images import AvatarImageError, avatar_variant_url, render_avatar_variants, sibling_variant_names
+from tests.support.images import image_bytes
+
+pytestmark = pytest.mark.unit
+
+
+def test_variants_are_square_content_hashed_and_deterministic():
+    source = image_bytes("JPEG", (3000, 2000))
+
+    default_name, variants = render_avatar_variants(source, "user-1")
+    again, _ = render_avatar_variants(source, "user-1")
+
+    assert default_name == again
+    assert default_name.startswith("user-1/") and default_name.endswith("/256.jpg")
+    assert {(variant.size, variant.format) for variant in variants} == {
+        (size, image_format) for size in (64, 128, 256) for image_format in ("jpeg", "webp")
+    }
+    for variant in variants:
+        with Image.open(io.BytesIO(variant.payload)) as image:
+            assert image.size == (variant.size, variant.size)
+    assert sorted(sibling_variant_names(default_name)) == sorted(variant.object_name for variant in variants)
+    assert max(len(variant.payload) for variant in variants) < len(source)
+    other_name, _ = render_avatar_variants(image_bytes("JPEG", (3000, 2000), (1, 2, 3)), "user-1")
+    assert other_name != default_name
+
+
+def test_transparent_png_keeps_alpha_in_webp_only():
+    _, variants = render_avatar_variants(image_bytes("PNG", (300, 300), (0, 0, 0, 0)), "user-1")
+    modes = {}
+    for variant in variants:
+        with Image.open(io.BytesIO(variant.payload)) as image:
+            modes[variant.format] = image.mode
+    assert modes == {"jpeg": "RGB", "webp": "RGBA"}
+
+
+@pytest.mark.parametrize("source", [b"not an image", image_bytes("GIF"), image_bytes("PNG", (8000, 6000))])
+def test_rejects_non_images_other_formats_and_huge_dimensions(source):
+    with pytest.raises(AvatarImageError):
+        render_avatar_variants(source, "user-1")
+
+
+def test_avatar_variant_url_rewrites_processed_avatars_only():
+    url = "https://files.example/avatars/u1/0123456789abcdef/256.jpg"
+
+    assert avatar_variant_url(url, 64, "webp") == "https://files.example/avatars/u1/0123456789abcdef/64.webp"
+    assert avatar_variant_url(url, None, "webp") == "https://files.example/avatars/u1/0123456789abcdef/256.webp"
+    assert avatar_variant_url(url, None) == url
+    assert avatar_variant_url("https://files.example/avatars/u1/legacy.png", 64) == "https://files.example/avatars/u1/legacy.png"
+    assert avatar_variant_url(None, 64) is None
+    assert sibling_variant_names("u1/legacy.png") == []
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+import pytest
+
+from services.byte_ranges import RangeNotSatisfiable, http_date, if_range_matches, parse_range_header
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.mark.parametrize(
+    ("header", "expected"),
+    [
+        (None, None),
+        ("bytes=0-99", [(0, 99)]),
+        ("bytes=900-", [(900, 999)]),
+        ("bytes=-100", [(900, 999)]),
+        ("bytes=-5000", [(0, 999)]),
+        ("bytes=990-2000", [(990, 999)]),
+        ("bytes=0-9, 20-29", [(0, 9), (20, 29)]),
+        ("bytes=20-29,0-9,5-12,13-14", [(0, 14), (20, 29)]),
+        ("bytes=0-9,2000-3000", [(0, 9)]),
+        ("items=0-9", None),
+        ("bytes=9-0", None),
+        ("bytes=abc", None),
+        ("bytes=-", None),
+        ("bytes=" + ",".join(f"{n}-{n}" for n in range(0, 40, 2)), None),
+    ],
+)
+def test_parse_range_header(header, expected):
+    assert parse_range_header(header, 1000) == expected
+
+
+@pytest.mark.parametrize("header", ["bytes=1000-", "bytes=-0", "bytes=5000-6000,2000-"])
+def test_unsatisfiable_ranges(header):
+    with pytest.raises(RangeNotSatisfiable):
+        parse_range_header(header, 1000)
+
+
+def test_if_range_requires_a_strong_etag_or_the_exact_date():
+    modified = datetime(2026, 10, 1, 12, 30, 15, 250000)
+
+    assert if_range_matches(None, '"abc"', modified)
+    assert if_range_matches('"abc"', '"abc"', modified)
+    assert not if_range_matches('W/"abc"', '"abc"', modified)
+    assert not if_range_matches('"other"', '"abc"', modified)
+    assert http_date(modified) == "Thu, 01 Oct 2026 12:30:15 GMT"
+    assert if_range_matches("Thu, 01 Oct 2026 12:30:15 GMT", '"abc"', modified)
+    assert not if_range_matches("Thu, 01 Oct 2026 12:30:16 GMT", '"abc"', modified)
+    assert not if_range_matches("yesterday", '"abc"', modified)
@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+import hashlib
+import uuid
+
+import pytest
+from sqlalchemy import text
+
+from models import PollVariant, uuid_key
+
+pytestmark = pytest.mark.unit
+
+
+def test_uuid_key_maps_canonical_text_bytes_and_legacy_ids():
+    value = uuid.uuid4()
+
+    assert uuid_key(str(value)) == value
+    assert uuid_key(str(value).upper()) == value
+    assert uuid_key(value.bytes) == value
+    assert uuid_key(value) is value
+    # The migration maps legacy ids to md5(id), like Postgres md5(id)::uuid.
+    assert uuid_key("expired-session") == uuid.UUID(hashlib.md5(b"expired-session").hexdigest())
+
+
+def test_ids_are_stored_as_16_bytes_and_read_back_as_canonical_text(db_session, create_user):
+    user = create_user(username="student", email="student@example.com", name="Студент")
+
+    stored = db_session.execute(text("SELECT typeof(id), length(id) FROM users")).one()
+
+    assert tuple(stored) == ("blob", 16)
+    assert str(uuid.UUID(user.id)) == user.id
+    assert db_session.get(type(user), user.id.upper()).id == user.id
+    assert db_session.get(PollVariant, "not-a-uuid") is None
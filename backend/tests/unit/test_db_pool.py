@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from database import async_database_url
+from services.db_pool import PoolMonitor, PoolSettings, load_pool_settings, monitored_pool_class
+
+pytestmark = pytest.mark.unit
+
+
+def build_engine(tmp_path, settings: PoolSettings):
+    monitor = PoolMonitor(settings)
+    engine = create_engine(
+        f"sqlite:///{(tmp_path / 'pool.db').as_posix()}",
+        poolclass=monitored_pool_class(monitor),
+        **settings.engine_kwargs(),
+    )
+    monitor.attach(engine.pool)
+    return engine, monitor
+
+
+def test_monitor_reports_checkouts_saturation_and_timeouts(tmp_path):
+    settings = PoolSettings(size=1, max_overflow=0, timeout_seconds=0.1, recycle_seconds=-1, liveness="pre_ping")
+    engine, monitor = build_engine(tmp_path, settings)
+
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+        busy = monitor.stats()
+        with pytest.raises(PoolTimeoutError):
+            engine.connect()
+
+    stats = monitor.stats()
+    assert busy["checkedOut"] == 1
+    assert stats["checkedOut"] == 0
+    assert stats["checkouts"] == 1
+    assert stats["timeouts"] == 1
+    assert stats["connectionsOpened"] == 1
+    assert stats["checkoutWait"]["count"] == 2
+    assert stats["checkoutWait"]["maxMs"] >= 100
+
+
+def test_monitor_follows_the_pool_across_dispose(tmp_path):
+    settings = PoolSettings(size=2, max_overflow=1, timeout_seconds=1, recycle_seconds=-1, liveness="recycle")
+    engine, monitor = build_engine(tmp_path, settings)
+
+    engine.dispose()
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+        assert monitor.stats()["checkedOut"] == 1
+
+    stats = monitor.stats()
+    assert stats["checkouts"] == 1
+    assert stats["recycleSeconds"] == 300
+    assert engine.pool._pre_ping is False
+
+
+def test_pool_settings_from_environment(monkeypatch):
+    monkeypatch.setenv("DB_POOL_SIZE", "12")
+    monkeypatch.setenv("DB_MAX_OVERFLOW", "0")
+    monkeypatch.setenv("DB_POOL_TIMEOUT_SECONDS", "2.5")
+    monkeypatch.setenv("DB_POOL_RECYCLE_SECONDS", "900")
+    monkeypatch.setenv("DB_POOL_LIVENESS", "recycle")
+
+    settings = load_pool_settings()
+
+    assert settings.engine_kwargs() == {
+        "pool_size": 12,
+        "max_overflow": 0,
+        "pool_timeout": 2.5,
+        "pool_recycle": 900,
+        "pool_pre_ping": False,
+    }
+
+    monkeypatch.setenv("DB_POOL_LIVENESS", "sometimes")
+    with pytest.raises(ValueError):
+        load_pool_settings()
+
+
+def test_async_database_url_keeps_the_database_and_swaps_the_driver():
+    assert async_database_url("sqlite:////tmp/app.db") == "sqlite+aiosqlite:////tmp/app.db"
+    assert (
+        async_database_url("postgresql://survey:s3cret@db:5432/survey")
+        == "postgresql+psycopg://survey:s3cret@db:5432/survey"
+    )
+    assert async_database_url("postgresql+psycopg://u:p@db/survey") == "postgresql+psycopg://u:p@db/survey"
+    with pytest.raises(ValueError):
+        async_database_url("mysql://u:p@db/survey")
@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import pytest
+
+import services.login_throttle as login_throttle_module
+from services.login_throttle import (
+    LoginThrottle,
+    LoginThrottledError,
+    LoginThrottleSettings,
+    MemoryThrottleStore,
+    SqliteThrottleStore,
+)
+
+pytestmark = pytest.mark.unit
+
+
+class FakeClock:
+    def __init__(self, now: float = 1_000_000.0) -> None:
+        self.now = now
+
+    def time(self) -> float:
+        return self.now
+
+
+def build_settings(**overrides) -> LoginThrottleSettings:
+    values = dict(
+        enabled=True,
+        window_seconds=60,
+        max_failures_per_ip=10,
+        max_failures_per_identifier=3,
+        base_lockout_seconds=30,
+        max_lockout_seconds=100,
+        max_tracked_keys=100,
+    )
+    values.update(overrides)
+    return LoginThrottleSettings(**values)
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> FakeClock:
+    fake = FakeClock()
+    monkeypatch.setattr(login_throttle_module.time, "time", fake.time)
+    return fake
+
+
+def test_identifier_is_locked_out_with_exponential_backoff(clock):
+    throttle = LoginThrottle(build_settings(), MemoryThrottleStore(max_keys=100))
+
+    for _ in range(3):
+        throttle.check("10.0.0.1", "student")
+        throttle.record_failure("10.0.0.1", "Student")
+    with pytest.raises(LoginThrottledError) as first_lockout:
+        throttle.check("10.0.0.2", "student")
+    assert first_lockout.value.retry_after_seconds == 30
+    assert first_lockout.value.status_code == 429
+
+    clock.now += 31
+    for _ in range(3):
+        throttle.record_failure("10.0.0.1", "student")
+    with pytest.raises(LoginThrottledError) as second_lockout:
+        throttle.check("10.0.0.1", "student")
+    assert second_lockout.value.retry_after_seconds == 60
+
+    clock.now += 61
+    for _ in range(3):
+        throttle.record_failure("10.0.0.1", "student")
+    with pytest.raises(LoginThrottledError) as capped_lockout:
+        throttle.check("10.0.0.1", "student")
+    assert capped_lockout.value.retry_after_seconds == 100
+    assert throttle.stats()["lockouts"] == 3
+    assert throttle.stats()["rejected"] == 3
+
+
+def test_failures_outside_the_window_do_not_count(clock):
+    throttle = LoginThrottle(build_settings(), MemoryThrottleStore(max_keys=100))
+
+    throttle.record_failure("10.0.0.1", "student")
+    throttle.record_failure("10.0.0.1", "student")
+    clock.now += 61
+    throttle.record_failure("10.0.0.1", "student")
+
+    throttle.check("10.0.0.1", "student")
+
+
+def test_ip_is_locked_out_across_identifiers(clock):
+    throttle = LoginThrottle(build_settings(max_failures_per_ip=4), MemoryThrottleStore(max_keys=100))
+
+    for index in range(4):
+        throttle.record_failure("10.0.0.9", f"victim-{index}")
+
+    with pytest.raises(LoginThrottledError):
+        throttle.check("10.0.0.9", "someone-else")
+    throttle.check("10.0.0.10", "someone-else")
+
+
+def test_success_resets_identifier_but_not_ip(clock):
+    throttle = LoginThrottle(build_settings(max_failures_per_ip=3), MemoryThrottleStore(max_keys=100))
+    throttle.record_failure("10.0.0.1", "student")
+    throttle.record_failure("10.0.0.1", "student")
+
+    throttle.record_success("10.0.0.1", "student")
+    throttle.record_failure("10.0.0.1", "other")
+
+    with pytest.raises(LoginThrottledError):
+        throttle.check("10.0.0.1", "student")
+    assert throttle.store.get("id:student") is None
+
+
+def test_memory_store_is_bounded(clock):
+    store = MemoryThrottleStore(max_keys=5)
+    throttle = LoginThrottle(build_settings(), store)
+
+    for index in range(20):
+        throttle.record_failure(None, f"user-{index}")
+
+    assert store.size() == 5
+    assert store.get("id:user-19") is not None
+    assert store.get("id:user-0") is None
+
+
+def test_sqlite_store_is_shared_between_throttles(clock, tmp_path):
+    path = str(tmp_path / "throttle.db")
+    first_worker = LoginThrottle(build_settings(), SqliteThrottleStore(path, max_keys=100, retention_seconds=60))
+    second_worker = LoginThrottle(build_settings(), SqliteThrottleStore(path, max_keys=100, retention_seconds=60))
+
+    first_worker.record_failure("10.0.0.1", "student")
+    second_worker.record_failure("10.0.0.1", "student")
+    first_worker.record_failure("10.0.0.1", "student")
+
+    with pytest.raises(LoginThrottledError):
+        second_worker.check("10.0.0.1", "student")
+    assert second_worker.stats()["backend"] == "sqlite"
+    assert second_worker.stats()["trackedKeys"] == 2
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import asyncio
+import io
+import threading
+import time
+
+import pytest
+
+from services.object_storage import ObjectStorage, ObjectStorageSettings
+from tests.support.fakes import FakeMinioClient
+
+pytestmark = pytest.mark.unit
+
+
+class SlowMinioClient(FakeMinioClient):
+    def __init__(self, delay: float) -> None:
+        super().__init__()
+        self.delay = delay
+        self.threads: set[str] = set()
+
+    def put_object(self, *args, **kwargs) -> None:
+        self.threads.add(threading.current_thread().name)
+        time.sleep(self.delay)
+        super().put_object(*args, **kwargs)
+
+
+def test_async_calls_leave_the_event_loop_free():
+    client = SlowMinioClient(delay=0.2)
+    storage = ObjectStorage(client, "bucket", ObjectStorageSettings(max_workers=2))
+
+    async def scenario():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        stored = await asyncio.gather(
+            *(storage.aput_stream(f"obj-{n}", io.BytesIO(b"payload"), max_size=100) for n in range(2))
+        )
+        task.cancel()
+        return stored, ticks
+
+    try:
+        stored, ticks = asyncio.run(scenario())
+    finally:
+        storage.shutdown()
+
+    assert [upload.size for upload in stored] == [7, 7]
+    assert ticks >= 10
+    assert client.threads and all(name.startswith("object-storage") for name in client.threads)
+    stats = storage.stats()
+    assert stats["latency"]["put"]["count"] == 2
+    assert stats["latency"]["put"]["avgMs"] >= 200
+    assert stats["queueDepth"] == 0 and stats["running"] == 0
+
+
+def test_failures_are_counted_per_operation():
+    storage = ObjectStorage(FakeMinioClient(), "bucket", ObjectStorageSettings(max_workers=1))
+    try:
+        assert storage.stat("missing") is None
+        with pytest.raises(KeyError):
+            asyncio.run(storage.aget("missing"))
+    finally:
+        storage.shutdown()
+
+    stats = storage.stats()
+    assert stats["errors"]["get"] == 1
+    assert stats["errors"]["stat"] == 0
+    assert stats["latency"]["stat"]["count"] == 1
@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import hashlib
+import io
+
+import pytest
+
+from services.object_upload import EmptyUploadError, UploadTooLargeError, stream_to_storage
+from tests.support.fakes import FakeMinioClient
+
+pytestmark = pytest.mark.unit
+
+
+def test_stream_to_storage_hashes_and_uploads_in_parts():
+    client = FakeMinioClient()
+    payload = bytes(range(256)) * 400
+
+    stored = stream_to_storage(client, "bucket", "obj", io.BytesIO(payload), max_size=len(payload), part_size=4096)
+
+    assert stored.size == len(payload)
+    assert stored.sha256 == hashlib.sha256(payload).hexdigest()
+    assert client.objects[("bucket", "obj")] == payload
+    assert client.largest_read == 4096
+
+
+def test_stream_to_storage_aborts_once_the_limit_is_crossed():
+    client = FakeMinioClient()
+
+    class CountingSource(io.BytesIO):
+        consumed = 0
+
+        def read(self, size=-1):
+            chunk = super().read(size)
+            CountingSource.consumed += len(chunk)
+            return chunk
+
+    with pytest.raises(UploadTooLargeError):
+        stream_to_storage(client, "bucket", "obj", CountingSource(b"x" * 100_000), max_size=10_000, part_size=1024)
+
+    assert client.objects == {}
+    # The source is not drained past the limit.
+    assert CountingSource.consumed == 10_001
+
+
+def test_stream_to_storage_rejects_an_empty_source():
+    client = FakeMinioClient()
+
+    with pytest.raises(EmptyUploadError):
+        stream_to_storage(client, "bucket", "obj", io.BytesIO(b""), max_size=10)
+    assert client.objects == {}
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+import pytest
+
+import services.online_indexes as online_indexes
+
+pytestmark = pytest.mark.unit
+
+
+class FakeOp:
+    def __init__(self, dialect: str, invalid: bool = False) -> None:
+        self.statements: list[str] = []
+        self.autocommit = False
+        self._invalid = invalid
+        self._bind = SimpleNamespace(dialect=SimpleNamespace(name=dialect), execute=self._query)
+
+    def _query(self, statement, params):
+        assert self.autocommit, "pg_index must be checked inside the autocommit block"
+        return SimpleNamespace(scalar=lambda: 1 if self._invalid else None)
+
+    def get_bind(self):
+        return self._bind
+
+    def get_context(self):
+        @contextmanager
+        def autocommit_block():
+            self.autocommit = True
+            try:
+                yield
+            finally:
+                self.autocommit = False
+
+        return SimpleNamespace(autocommit_block=autocommit_block)
+
+    def execute(self, statement: str) -> None:
+        self.statements.append(f"{'autocommit: ' if self.autocommit else ''}{statement}")
+
+
+def test_postgres_rebuilds_an_invalid_leftover_concurrently(monkeypatch):
+    fake = FakeOp("postgresql", invalid=True)
+    monkeypatch.setattr(online_indexes, "op", fake)
+
+    online_indexes.create_index("uq_users_email", "users (email)", unique=True)
+
+    assert fake.statements == [
+        "autocommit: DROP INDEX CONCURRENTLY IF EXISTS uq_users_email",
+        "autocommit: CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS uq_users_email ON users (email)",
+    ]
+
+
+def test_other_dialects_get_plain_ddl(monkeypatch):
+    fake = FakeOp("sqlite")
+    monkeypatch.setattr(online_indexes, "op", fake)
+
+    online_indexes.create_index("ix_poll_variants_poll_id", "poll_variants (poll_id)")
+    online_indexes.drop_index("ix_poll_variants_poll_id")
+
+    assert fake.statements == [
+        "CREATE INDEX IF NOT EXISTS ix_poll_variants_poll_id ON poll_variants (poll_id)",
+        "DROP INDEX IF EXISTS ix_poll_variants_poll_id",
+    ]
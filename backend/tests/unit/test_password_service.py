@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import threading
+
+import pytest
+from passlib.context import CryptContext
+
+from services.password_service import (
+    PBKDF2_MIN_ROUNDS,
+    PasswordHasher,
+    PasswordHashingBusyError,
+    PasswordHashingSettings,
+    calibrate_pbkdf2_rounds,
+    pbkdf2_context_config,
+)
+
+pytestmark = pytest.mark.unit
+
+
+class BlockingContext:
+    def __init__(self) -> None:
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def hash(self, password: str) -> str:
+        self.started.set()
+        self.release.wait(timeout=5)
+        return f"hashed:{password}"
+
+    def verify(self, plain: str, hashed: str) -> bool:
+        return hashed == f"hashed:{plain}"
+
+
+def test_hasher_runs_jobs_on_dedicated_pool_and_records_latency():
+    context = BlockingContext()
+    context.release.set()
+    hasher = PasswordHasher(context, PasswordHashingSettings(max_workers=1, max_queue=0, retry_after_seconds=3))
+
+    hashed = hasher.hash("secret")
+
+    assert hashed == "hashed:secret"
+    assert hasher.verify("secret", hashed) is True
+    stats = hasher.stats()
+    assert stats["hashLatency"]["count"] == 1
+    assert stats["verifyLatency"]["count"] == 1
+    assert stats["queueDepth"] == 0
+    hasher.shutdown()
+
+
+def test_hasher_rejects_jobs_when_queue_is_full():
+    context = BlockingContext()
+    hasher = PasswordHasher(context, PasswordHashingSettings(max_workers=1, max_queue=0, retry_after_seconds=3))
+    worker = threading.Thread(target=hasher.hash, args=("first",))
+    worker.start()
+    assert context.started.wait(timeout=5)
+
+    with pytest.raises(PasswordHashingBusyError) as exc_info:
+        hasher.hash("second")
+
+    context.release.set()
+    worker.join(timeout=5)
+    assert exc_info.value.retry_after_seconds == 3
+    assert hasher.stats()["rejected"] == 1
+    hasher.shutdown()
+
+
+def test_calibration_scales_probe_measurement_to_target_latency():
+    rounds = calibrate_pbkdf2_rounds(250, probe_rounds=20_000, measure=lambda probe_rounds: 50.0)
+
+    assert rounds == 100_000
+
+
+def test_calibration_clamps_to_minimum_rounds():
+    rounds = calibrate_pbkdf2_rounds(1, probe_rounds=20_000, measure=lambda probe_rounds: 500.0)
+
+    assert rounds == PBKDF2_MIN_ROUNDS
+
+
+def test_pinned_rounds_flag_hashes_with_other_cost_for_update():
+    legacy_hash = CryptContext(**pbkdf2_context_config(12_000)).hash("secret")
+    calibrated = CryptContext(**pbkdf2_context_config(15_000))
+
+    assert calibrated.needs_update(legacy_hash) is True
+    assert calibrated.needs_update(calibrated.hash("secret")) is False
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from services.read_replicas import (
+    ReplicaRoutingMiddleware,
+    ReplicaSet,
+    ReplicaSettings,
+    load_replica_settings,
+    replica_routing_session_class,
+)
+
+pytestmark = pytest.mark.unit
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def build_database(path, marker: str):
+    engine = create_engine(f"sqlite:///{path.as_posix()}", connect_args={"check_same_thread": False})
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TABLE marker (name VARCHAR NOT NULL)"))
+        connection.execute(text("INSERT INTO marker (name) VALUES (:name)"), {"name": marker})
+    return engine
+
+
+@pytest.fixture
+def routed(tmp_path):
+    primary = build_database(tmp_path / "primary.db", "primary")
+    replica = build_database(tmp_path / "replica.db", "replica")
+    clock = FakeClock()
+    settings = ReplicaSettings(urls=("replica",), read_your_writes_seconds=5, max_lag_seconds=10, lag_check_interval_seconds=5)
+    replicas = ReplicaSet(settings, [replica], clock=clock)
+    session_factory = sessionmaker(bind=primary, class_=replica_routing_session_class(replicas, [replica]))
+
+    def get_session():
+        with session_factory() as db:
+            yield db
+
+    app = FastAPI()
+
+    @app.get("/marker")
+    def read_marker(db=Depends(get_session)):
+        return {"source": db.execute(text("SELECT name FROM marker")).scalar()}
+
+    @app.post("/marker")
+    def write_marker(db=Depends(get_session)):
+        db.execute(text("UPDATE marker SET name = name"))
+        db.commit()
+        return {"status": "ok"}
+
+    app.add_middleware(ReplicaRoutingMiddleware, replicas=replicas, identify=lambda token: token)
+    with TestClient(app) as client:
+        yield client, replicas, clock, replica
+
+
+def test_reads_go_to_the_replica_until_the_caller_writes(routed):
+    client, replicas, clock, _ = routed
+    alice = {"Authorization": "Bearer alice"}
+
+    assert client.get("/marker", headers=alice).json() == {"source": "replica"}
+    assert client.post("/marker", headers=alice).status_code == 200
+    # Within the read-your-writes window the writer reads from the primary...
+    assert client.get("/marker", headers=alice).json() == {"source": "primary"}
+    clock.now += 6
+    # ...and goes back to the replica once it expires.
+    assert client.get("/marker", headers=alice).json() == {"source": "replica"}
+    stats = replicas.stats()
+    assert stats["replicaReads"] == 2
+    assert stats["readYourWritesReads"] == 1
+
+
+def test_unhealthy_or_lagging_replica_falls_back_to_the_primary(routed, tmp_path):
+    client, replicas, _, replica = routed
+
+    assert replicas.measure_lag() == [0.0]
+    replica.dispose()
+    (tmp_path / "replica.db").unlink()
+    (tmp_path / "replica.db").mkdir()  # a directory cannot be opened as a database
+
+    assert replicas.measure_lag() == [None]
+    assert client.get("/marker").json() == {"source": "primary"}
+    stats = replicas.stats()
+    assert stats["replicas"][0]["healthy"] is False
+    assert stats["replicas"][0]["lastError"]
+    assert stats["primaryFallbackReads"] == 1
+
+
+def test_replica_settings_from_environment(monkeypatch):
+    monkeypatch.setenv("DATABASE_REPLICA_URLS", " postgresql://r1/db, ,postgresql://r2/db ")
+    monkeypatch.setenv("DB_READ_YOUR_WRITES_SECONDS", "2.5")
+    settings = load_replica_settings()
+    assert settings.urls == ("postgresql://r1/db", "postgresql://r2/db")
+    assert settings.read_your_writes_seconds == 2.5
+    assert settings.enabled
+
+    monkeypatch.setenv("DATABASE_REPLICA_URLS", "")
+    assert not load_replica_settings().enabled
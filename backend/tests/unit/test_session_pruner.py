@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import inspect
+
+from database import SessionLocal, engine
+from models import RefreshTokenSession
+from services.session_pruner import RefreshSessionPruner, SessionPruneSettings
+
+pytestmark = pytest.mark.unit
+
+
+def build_pruner(*, batch_size: int = 1, max_batches_per_run: int = 50) -> RefreshSessionPruner:
+    settings = SessionPruneSettings(
+        enabled=False,
+        interval_seconds=60,
+        batch_size=batch_size,
+        max_batches_per_run=max_batches_per_run,
+        revoked_retention_hours=24,
+    )
+    return RefreshSessionPruner(settings, SessionLocal)
+
+
+def add_session(db_session, user_id: str, session_id: str, *, expires_in: timedelta, revoked_ago=None) -> None:
+    now = datetime.now(timezone.utc)
+    db_session.add(
+        RefreshTokenSession(
+            id=session_id,
+            user_id=user_id,
+            token_hash=f"hash-{session_id}",
+            expires_at=now + expires_in,
+            revoked_at=(now - revoked_ago) if revoked_ago is not None else None,
+        )
+    )
+
+
+def test_pruner_deletes_expired_and_long_revoked_sessions_in_batches(db_session, create_user):
+    user = create_user(username="student", email="student@example.com", name="Студент")
+    add_session(db_session, user.id, "active", expires_in=timedelta(days=7))
+    add_session(db_session, user.id, "recently-revoked", expires_in=timedelta(days=7), revoked_ago=timedelta(hours=1))
+    add_session(db_session, user.id, "expired-1", expires_in=-timedelta(days=1))
+    add_session(db_session, user.id, "expired-2", expires_in=-timedelta(minutes=5))
+    add_session(db_session, user.id, "long-revoked", expires_in=timedelta(days=3), revoked_ago=timedelta(days=2))
+    db_session.commit()
+    pruner = build_pruner(batch_size=1)
+
+    deleted = pruner.run_once()
+
+    remaining = {row.token_hash for row in db_session.query(RefreshTokenSession).all()}
+    assert deleted == {"expired": 2, "revoked": 1}
+    assert remaining == {"hash-active", "hash-recently-revoked"}
+    stats = pruner.stats()
+    assert stats["runs"] == 1
+    assert stats["totalDeleted"] == {"expired": 2, "revoked": 1}
+    assert stats["lastRun"]["batches"] == 5
+    assert stats["batchDuration"]["count"] == 5
+    assert stats["currentRun"] is None
+
+
+def test_pruner_caps_batches_per_run(db_session, create_user):
+    user = create_user(username="student", email="student@example.com", name="Студент")
+    for index in range(3):
+        add_session(db_session, user.id, f"expired-{index}", expires_in=-timedelta(days=1))
+    db_session.commit()
+    pruner = build_pruner(batch_size=1, max_batches_per_run=2)
+
+    assert pruner.run_once() == {"expired": 2, "revoked": 0}
+    assert pruner.run_once() == {"expired": 1, "revoked": 0}
+
+
+def test_refresh_session_table_has_pruning_indexes():
+    index_names = {index["name"] for index in inspect(engine).get_indexes("refresh_token_sessions")}
+
+    assert "ix_refresh_token_sessions_user_active" in index_names
+    assert "ix_refresh_token_sessions_expires_at" in index_names
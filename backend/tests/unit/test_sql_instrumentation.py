@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import logging
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from services.sql_instrumentation import (
+    SqlInstrumentation,
+    SqlInstrumentationMiddleware,
+    SqlInstrumentationSettings,
+    load_sql_instrumentation_settings,
+    statement_shape,
+)
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture
+def instrumented(tmp_path):
+    url = f"sqlite:///{(tmp_path / 'instrumented.db').as_posix()}"
+    engine = create_engine(url, connect_args={"check_same_thread": False})
+    async_engine = create_async_engine(url.replace("sqlite://", "sqlite+aiosqlite://"))
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TABLE items (id INTEGER PRIMARY KEY, name VARCHAR NOT NULL)"))
+        connection.execute(text("INSERT INTO items (name) VALUES ('a'), ('b'), ('c'), ('d')"))
+    instrumentation = SqlInstrumentation(SqlInstrumentationSettings(enabled=True, n_plus_one_threshold=3))
+    instrumentation.instrument(engine)
+    instrumentation.instrument(async_engine.sync_engine)
+
+    app = FastAPI()
+
+    @app.get("/items")
+    def list_items():
+        with engine.connect() as connection:
+            return {"names": connection.execute(text("SELECT name FROM items ORDER BY id")).scalars().all()}
+
+    @app.get("/items/one-by-one")
+    def list_items_one_by_one():
+        with engine.connect() as connection:
+            ids = connection.execute(text("SELECT id FROM items ORDER BY id")).scalars().all()
+            names = [connection.execute(text("SELECT name FROM items WHERE id = :id"), {"id": item}).scalar() for item in ids]
+        return {"names": names}
+
+    @app.get("/items/async")
+    async def list_items_async():
+        async with async_engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+            result = await connection.execute(text("SELECT name FROM items ORDER BY id"))
+            return {"names": result.scalars().all()}
+
+    app.add_middleware(SqlInstrumentationMiddleware, instrumentation=instrumentation)
+    with TestClient(app) as client:
+        yield client, instrumentation
+    engine.dispose()
+
+
+def _server_timing(response) -> tuple[float, str]:
+    metric, duration, description = response.headers["server-timing"].split(";")
+    assert metric == "db"
+    return float(duration.removeprefix("dur=")), description
+
+
+def test_requests_report_statement_count_and_db_time(instrumented, caplog):
+    client, instrumentation = instrumented
+
+    with caplog.at_level(logging.WARNING, logger="survey_backend.sql"):
+        response = client.get("/items")
+        async_response = client.get("/items/async")
+
+    duration, description = _server_timing(response)
+    assert response.json() == {"names": ["a", "b", "c", "d"]}
+    assert duration > 0 and description == 'desc="SQL statements: 1"'
+    assert _server_timing(async_response)[1] == 'desc="SQL statements: 2"'
+    assert not caplog.records
+    stats = instrumentation.stats()
+    assert stats["requests"] == 2 and stats["statements"] == 3
+    assert stats["dbTimePerRequest"]["count"] == 2
+
+
+def test_repeated_statement_shapes_are_flagged_as_n_plus_one(instrumented, caplog):
+    client, instrumentation = instrumented
+
+    with caplog.at_level(logging.WARNING, logger="survey_backend.sql"):
+        response = client.get("/items/one-by-one")
+
+    assert _server_timing(response)[1] == 'desc="SQL statements: 5"'
+    [warning] = caplog.records
+    assert "GET /items/one-by-one" in warning.getMessage()
+    assert "ran 4 times" in warning.getMessage()
+    assert "SELECT name FROM items WHERE id = ?" in warning.getMessage()
+    assert instrumentation.stats()["nPlusOneWarnings"] == 1
+
+
+def test_statement_shape_collapses_placeholder_lists_and_whitespace():
+    assert statement_shape("SELECT *\n  FROM users WHERE id IN (?, ?, ?)") == "SELECT * FROM users WHERE id IN (?)"
+    assert statement_shape("SELECT * FROM users WHERE id IN (%(id_1_1)s, %(id_1_2)s)") == "SELECT * FROM users WHERE id IN (?)"
+    assert statement_shape("SELECT * FROM users WHERE id = ?") == "SELECT * FROM users WHERE id = ?"
+
+
+def test_sql_instrumentation_settings_from_environment(monkeypatch):
+    monkeypatch.delenv("SQL_INSTRUMENTATION_ENABLED", raising=False)
+    assert load_sql_instrumentation_settings().enabled is False
+
+    monkeypatch.setenv("SQL_INSTRUMENTATION_ENABLED", "true")
+    monkeypatch.setenv("SQL_N_PLUS_ONE_THRESHOLD", "0")
+    settings = load_sql_instrumentation_settings()
+    assert settings.enabled is True
+    assert settings.n_plus_one_threshold == 1
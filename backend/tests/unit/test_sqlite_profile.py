@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from models import Base, User as UserModel
+from services.sqlite_profile import SqliteSettings, apply_sqlite_profile, load_sqlite_settings, writer_routing_session_class
+
+pytestmark = pytest.mark.unit
+
+PROFILE = SqliteSettings(
+    enabled=True,
+    journal_mode="wal",
+    synchronous="normal",
+    busy_timeout_ms=2500,
+    mmap_size_bytes=1024 * 1024,
+    cache_size_kib=2048,
+    single_writer=True,
+)
+
+
+def build_engines(tmp_path):
+    url = f"sqlite:///{(tmp_path / 'profile.db').as_posix()}"
+    reader = create_engine(url, connect_args={"check_same_thread": False})
+    writer = create_engine(url, connect_args={"check_same_thread": False}, pool_size=1, max_overflow=0)
+    apply_sqlite_profile(reader, PROFILE)
+    apply_sqlite_profile(writer, PROFILE, writer=True)
+    Base.metadata.create_all(bind=writer)
+    return reader, writer
+
+
+def record(engine, sink):
+    event.listen(engine, "before_cursor_execute", lambda conn, cursor, statement, *args: sink.append(statement))
+
+
+def test_profile_pragmas_are_applied_on_connect(tmp_path):
+    reader, _ = build_engines(tmp_path)
+    with reader.connect() as connection:
+        assert connection.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+        assert connection.exec_driver_sql("PRAGMA synchronous").scalar() == 1  # NORMAL
+        assert connection.exec_driver_sql("PRAGMA busy_timeout").scalar() == 2500
+        assert connection.exec_driver_sql("PRAGMA mmap_size").scalar() == 1024 * 1024
+        assert connection.exec_driver_sql("PRAGMA cache_size").scalar() == -2048
+
+
+def test_routing_session_sends_writes_to_the_writer_and_pins_the_transaction(tmp_path):
+    reader, writer = build_engines(tmp_path)
+    reader_statements: list[str] = []
+    writer_statements: list[str] = []
+    record(reader, reader_statements)
+    record(writer, writer_statements)
+    session_factory = sessionmaker(bind=reader, autoflush=False, class_=writer_routing_session_class(writer))
+
+    with session_factory() as db:
+        assert db.query(UserModel).count() == 0
+        db.add(UserModel(username="anna", email="anna@example.com", name="Анна", role="user", password_hash="x"))
+        db.flush()
+        # Pinned to the writer, so the transaction reads its own uncommitted row.
+        assert db.query(UserModel).count() == 1
+        db.commit()
+        assert db.query(UserModel.username).scalar() == "anna"
+
+    assert writer_statements[0] == "BEGIN IMMEDIATE"
+    assert any(statement.startswith("INSERT INTO users") for statement in writer_statements)
+    assert sum("count(*)" in statement for statement in writer_statements) == 1
+    assert sum("count(*)" in statement for statement in reader_statements) == 1
+    assert reader_statements[-1].startswith("SELECT users.username")
+
+
+def test_sqlite_settings_from_environment(monkeypatch):
+    monkeypatch.setenv("SQLITE_JOURNAL_MODE", "DELETE")
+    monkeypatch.setenv("SQLITE_BUSY_TIMEOUT_MS", "100")
+    settings = load_sqlite_settings()
+    assert settings.journal_mode == "delete"
+    assert settings.busy_timeout_ms == 100
+    # A rollback journal cannot run readers and the writer side by side.
+    assert not settings.routes_writes
+
+    monkeypatch.setenv("SQLITE_SYNCHRONOUS", "sometimes")
+    with pytest.raises(ValueError):
+        load_sqlite_settings()
@@ -144,4 +144,24 @@ describe('pollApi', () => {
     expect(second.items[0].title).toBe('Опрос');
     expect(fetchMock).toHaveBeenCalledTimes(1);
   });
+
+  it('lists one page of users per call and forwards the cursor and filters', async () => {
+    localStorage.setItem('auth:session', JSON.stringify(sessionPayload));
+    const fetchMock = vi
+      .fn()
+      .mockResolvedValueOnce(jsonResponse({ items: [authResponse.user], nextCursor: 'c2' }))
+      .mockResolvedValueOnce(jsonResponse({ items: [{ ...authResponse.user, id: 'user-2', username: 'teacher' }], nextCursor: null }));
+    vi.stubGlobal('fetch', fetchMock);
+
+    const { AuthApi } = await import('./pollApi');
+    const first = await AuthApi.listUsers({ search: 'stu', role: 'user' });
+    const second = await AuthApi.listUsers({ search: 'stu', role: 'user', cursor: first.nextCursor });
+
+    expect(first.items.map((user) => user.id)).toEqual(['user-1']);
+    expect(first.nextCursor).toBe('c2');
+    expect(second.items.map((user) => user.id)).toEqual(['user-2']);
+    expect(second.nextCursor).toBeNull();
+    expect(fetchMock.mock.calls[0][0]).toBe('http://localhost:8000/users?limit=50&search=stu&role=user');
+    expect(fetchMock.mock.calls[1][0]).toBe('http://localhost:8000/users?limit=50&search=stu&role=user&cursor=c2');
+  });
 });
@@ -370,7 +370,8 @@ export class PollApiService {
   }
 
   static async getResults(pollId: string): Promise<VoteResult> {
-    const data = await ApiClient.request<VoteResult>(`/polls/${pollId}/results`);
+    // Voter avatars render at 24px, so ask for the smallest (2x-ready) WebP variant.
+    const data = await ApiClient.request<VoteResult>(`/polls/${pollId}/results?avatarSize=64&avatarFormat=webp`);
     if (!data.isAnonymous) {
       data.results = data.results.map((item) => ({
         ...item,
@@ -432,6 +433,18 @@ export interface User {
   avatarUrl?: string | null;
 }
 
+export interface UserListQuery {
+  search?: string;
+  role?: UserRole;
+  cursor?: string | null;
+  limit?: number;
+}
+
+export interface UserListPage {
+  items: User[];
+  nextCursor: string | null;
+}
+
 export interface RegisterOptions {
   role?: UserRole;
   adminToken?: string;
@@ -598,9 +611,17 @@ export class AuthApi {
     return normalized;
   }
 
-  static async listUsers(): Promise<User[]> {
-    const users = await ApiClient.request<User[]>('/users');
-    return users.map((user) => this.normalizeUser(user));
+  static async listUsers(params: UserListQuery = {}): Promise<UserListPage> {
+    // Keyset-paginated: pass the previous page's nextCursor to get the next one.
+    const query = new URLSearchParams({ limit: String(params.limit ?? 50) });
+    if (params.search) query.set('search', params.search);
+    if (params.role) query.set('role', params.role);
+    if (params.cursor) query.set('cursor', params.cursor);
+    const page = await ApiClient.request<{ items: User[]; nextCursor?: string | null }>(`/users?${query.toString()}`);
+    return {
+      items: page.items.map((user) => this.normalizeUser(user)),
+      nextCursor: page.nextCursor ?? null,
+    };
   }
 
   static async updateUserRole(userId: string, role: UserRole): Promise<User> {
@@ -1,4 +1,5 @@
-import { useCallback, useEffect, useState } from 'react';
+import { useCallback, useEffect, useRef, useState } from 'react';
+import { Search } from 'lucide-react';
 import { AuthApi, User, UserRole } from '../api/pollApi';
 import { useAuth } from '../context/AuthContext';
 import { ConfirmDialog } from './ui/ConfirmDialog';
@@ -12,29 +13,62 @@ interface AdminUserRolesPanelProps {
 export function AdminUserRolesPanel({ onBack, onNotify }: AdminUserRolesPanelProps): JSX.Element {
   const { user: currentUser } = useAuth();
   const [users, setUsers] = useState<User[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [searchInput, setSearchInput] = useState('');
+  const [search, setSearch] = useState('');
+  const [roleFilter, setRoleFilter] = useState<UserRole | ''>('');
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [error, setError] = useState<string | null>(null);
   const [savingUserId, setSavingUserId] = useState<string | null>(null);
   const [pendingDeleteUser, setPendingDeleteUser] = useState<User | null>(null);
+  // Responses for an outdated search or filter are dropped.
+  const requestIdRef = useRef(0);
 
-  const loadUsers = useCallback(async () => {
-    try {
-      setLoading(true);
-      const items = await AuthApi.listUsers();
-      setUsers(items);
-      setError(null);
-    } catch (err) {
-      console.error('Failed to load users', err);
-      setError('Не удалось загрузить пользователей');
-    } finally {
-      setLoading(false);
-    }
-  }, []);
+  const loadUsers = useCallback(
+    async (cursor: string | null) => {
+      const requestId = ++requestIdRef.current;
+      try {
+        if (cursor) {
+          setLoadingMore(true);
+        } else {
+          setLoading(true);
+        }
+        const page = await AuthApi.listUsers({ search: search || undefined, role: roleFilter || undefined, cursor });
+        if (requestId !== requestIdRef.current) {
+          return;
+        }
+        setUsers((prev) => (cursor ? [...prev, ...page.items] : page.items));
+        setNextCursor(page.nextCursor);
+        setError(null);
+      } catch (err) {
+        if (requestId !== requestIdRef.current) {
+          return;
+        }
+        console.error('Failed to load users', err);
+        if (cursor) {
+          onNotify?.('Не удалось загрузить пользователей', 'error');
+        } else {
+          setError('Не удалось загрузить пользователей');
+        }
+      } finally {
+        if (requestId === requestIdRef.current) {
+          setLoading(false);
+          setLoadingMore(false);
+        }
+      }
+    },
+    [search, roleFilter, onNotify]
+  );
 
   useEffect(() => {
-    loadUsers();
+    loadUsers(null);
   }, [loadUsers]);
 
+  const applySearch = () => {
+    setSearch(searchInput.trim());
+  };
+
   const updateRole = async (userId: string, role: UserRole) => {
     try {
       setSavingUserId(userId);
@@ -77,6 +111,44 @@ export function AdminUserRolesPanel({ onBack, onNotify }: AdminUserRolesPanelPro
         </div>
       </div>
 
+      <div className="flex flex-wrap gap-2 rounded-2xl border border-gray-200 bg-white p-4 dark:border-gray-700 dark:bg-gray-800">
+        <label htmlFor="user-search" className="sr-only">
+          Поиск пользователей
+        </label>
+        <input
+          id="user-search"
+          value={searchInput}
+          onChange={(event) => setSearchInput(event.target.value)}
+          onKeyDown={(event) => {
+            if (event.key === 'Enter') {
+              applySearch();
+            }
+          }}
+          placeholder="Логин, e-mail или имя"
+          className="min-w-0 flex-1 rounded-xl border border-gray-200 px-3 py-2 text-sm dark:border-gray-700 dark:bg-gray-900"
+        />
+        <label htmlFor="user-role-filter" className="sr-only">
+          Роль
+        </label>
+        <select
+          id="user-role-filter"
+          value={roleFilter}
+          onChange={(event) => setRoleFilter(event.target.value as UserRole | '')}
+          className="rounded-xl border border-gray-200 px-3 py-2 text-sm dark:border-gray-700 dark:bg-gray-900"
+        >
+          <option value="">Все роли</option>
+          <option value="user">user</option>
+          <option value="admin">admin</option>
+        </select>
+        <button
+          type="button"
+          onClick={applySearch}
+          className="inline-flex items-center gap-1 rounded-xl border border-gray-200 px-3 py-2 text-sm hover:bg-gray-50 dark:border-gray-700 dark:hover:bg-gray-700"
+        >
+          <Search className="h-4 w-4" /> Найти
+        </button>
+      </div>
+
       {loading && (
         <div className="text-sm text-gray-500" role="status" aria-live="polite">
           Загрузка пользователей...
@@ -132,6 +204,22 @@ export function AdminUserRolesPanel({ onBack, onNotify }: AdminUserRolesPanelPro
               ))}
             </tbody>
           </table>
+          {users.length === 0 && (
+            <div className="px-4 py-6 text-center text-sm text-gray-500">Пользователи не найдены</div>
+          )}
+        </div>
+      )}
+
+      {!loading && !error && nextCursor && (
+        <div>
+          <button
+            type="button"
+            disabled={loadingMore}
+            onClick={() => loadUsers(nextCursor)}
+            className="rounded-xl border border-gray-200 px-4 py-2 text-sm hover:bg-gray-50 disabled:opacity-50 dark:border-gray-700 dark:hover:bg-gray-800"
+          >
+            {loadingMore ? 'Загрузка...' : 'Показать ещё'}
+          </button>
         </div>
       )}
 